@@ -0,0 +1,485 @@
+"""
+FILE: archive.py
+DESCRIPTION: an append-only archive of many recorded 'snake' games. Every
+game is a fixed-layout header (seed, config, final score, rounds, death
+cause) followed by its variable-length key stream, in a single data file.
+A separate offset index gives random access to any game. Both files are
+memory-mapped by the reader, so games can be filtered, looked up or scanned
+without loading the archive into memory.
+run:
+> python archive.py [optional arguments|--help]
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import os
+import sys
+import mmap
+import struct
+import argparse
+from argparse import Namespace
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, BinaryIO, Callable, Iterator, List, Optional, Tuple
+
+import events
+import game_utils
+import snake_main
+from board import Board
+from bots import BOTS
+from headless_display import HeadlessDisplay, make_game_args
+from replay import CODE_TO_KEY, KEY_TO_CODE
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+# the last byte of the data file's magic is its layout's version
+ARCHIVE_MAGIC = b'PYSNAKE-ARCHIVE\x02'
+INDEX_MAGIC = b'PYSNAKE-AINDEX\x01\x00'
+INDEX_SUFFIX = '.idx'
+
+# data file layout:
+#   MAGIC | HEADER, keys | HEADER, keys | ...
+# index file layout:
+#   MAGIC | OFFSET | OFFSET | ...   (the data file offset of every header)
+# a game's record is written before its offset, so a reader never sees a
+# partially written game (and a writer removes it when it opens the archive)
+SEED_SIZE = 32
+HEADER = struct.Struct(f'<{SEED_SIZE}s5iBBxxI4xqIIBBxxI')
+OFFSET = struct.Struct('<Q')
+
+CAUSES = [None, events.OVER_ROUNDS, events.OVER_OUT_OF_BOUNDS,
+          events.OVER_TANGLED, events.OVER_WALL_HIT_HEAD,
+          events.OVER_CUT_TO_HEAD]
+CAUSE_TO_CODE = {cause: code for code, cause in enumerate(CAUSES)}
+
+GameHeader = namedtuple('GameHeader', [
+    'seed', 'width', 'height', 'apples', 'walls', 'max_rounds', 'debug',
+    'rng_use_numpy', 'rng_block_size', 'score', 'rounds', 'length', 'cause',
+    'fill', 'keys_length'])
+
+SEEDS = 100
+ROUNDS = 2000
+
+
+###############################################################################
+#                           Class & Inner Functions                           #
+###############################################################################
+class ArchiveWriter:
+    """
+    Appends games to an archive (creating it if needed). There should be a
+    single writer per archive
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Opens an archive for appending, removing the game an interrupted
+        writer was appending (if any)
+        :param path: the archive's data file (the index is next to it)
+        """
+        self.path = path
+        self.__data: BinaryIO = open(path, 'ab')
+        self.__index: BinaryIO = open(path + INDEX_SUFFIX, 'ab')
+        if self.__data.tell() == 0:
+            self.__data.write(ARCHIVE_MAGIC)
+        if self.__index.tell() == 0:
+            self.__index.write(INDEX_MAGIC)
+        self.__truncate_torn_game()
+
+    def __truncate_torn_game(self) -> None:
+        """
+        Truncates the index to its last complete offset, and the data file
+        to the end of the last indexed game
+        """
+        self.__data.flush()
+        self.__index.flush()
+        count = (self.__index.tell() - len(INDEX_MAGIC)) // OFFSET.size
+        index_end = len(INDEX_MAGIC) + count * OFFSET.size
+        data_end = len(ARCHIVE_MAGIC)
+        with open(self.path, 'rb') as data_file, \
+                open(self.path + INDEX_SUFFIX, 'rb') as index_file:
+            if data_file.read(len(ARCHIVE_MAGIC)) != ARCHIVE_MAGIC or \
+                    index_file.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                self.close()
+                raise ValueError(f"not an archive: {self.path}")
+            if count > 0:
+                index_file.seek(index_end - OFFSET.size)
+                offset, = OFFSET.unpack(index_file.read(OFFSET.size))
+                data_file.seek(offset)
+                raw_header = data_file.read(HEADER.size)
+                if len(raw_header) < HEADER.size:
+                    self.close()
+                    raise ValueError(f"the index of {self.path} points past "
+                                     f"its data file")
+                data_end = offset + HEADER.size + \
+                    GameHeader(*HEADER.unpack(raw_header)).keys_length
+        # appending writes at the end, but 'append' takes the offset of a
+        # game from the position
+        for file, end in ((self.__index, index_end),
+                          (self.__data, data_end)):
+            if file.tell() > end:
+                file.truncate(end)
+                file.seek(end)
+
+    def __enter__(self) -> 'ArchiveWriter':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def append(self, header: GameHeader, keys: bytes) -> int:
+        """
+        Appends a game
+        :param header: the game's header ('keys_length' is set from 'keys')
+        :param keys: the game's key codes, a byte per round
+        :return: the game's offset in the data file
+        """
+        seed = header.seed.encode()
+        if len(seed) > SEED_SIZE:
+            raise ValueError(f"seed is longer than {SEED_SIZE} bytes: "
+                             f"{header.seed}")
+        header = header._replace(seed=seed, keys_length=len(keys),
+                                 cause=CAUSE_TO_CODE[header.cause])
+        offset = self.__data.tell()
+        self.__data.write(HEADER.pack(*header))
+        self.__data.write(keys)
+        self.__data.flush()
+        self.__index.write(OFFSET.pack(offset))
+        self.__index.flush()
+        return offset
+
+    def close(self) -> None:
+        """
+        Closes the archive
+        """
+        self.__data.close()
+        self.__index.close()
+
+
+class ArchiveRecorder:
+    """
+    A game loop observer which collects a game's keys, and appends the game
+    to an archive when it is over. Can record many games, one after the
+    other, each from its first round
+    """
+
+    def __init__(self, writer: ArchiveWriter, args: Namespace) -> None:
+        """
+        :param writer: the archive to append to
+        :param args: the arguments of the 'snake game'
+        """
+        self.writer = writer
+        self.args = args
+        self.__board: Optional[Board] = None
+        self.__keys = bytearray()
+        self.__cause: Optional[str] = None
+        self.__is_appended = False
+
+    def __call__(self, board: Board) -> None:
+        """
+        Records the round which has just ended
+        :param board: the game's Board
+        :return: None
+        """
+        if board is not self.__board or board.get_rounds() == 0:
+            self.__start_game(board)
+        elif self.__is_appended:
+            raise ValueError(f"the game is over, and was already appended "
+                             f"(round {board.get_rounds()})")
+        if board.get_rounds() > 0:
+            self.__keys.append(KEY_TO_CODE.get(board.get_key_clicked(),
+                                               KEY_TO_CODE[None]))
+        if board.is_over:
+            self.writer.append(make_header(board, self.args, self.__cause),
+                               bytes(self.__keys))
+            self.__is_appended = True
+
+    def __start_game(self, board: Board) -> None:
+        """
+        Starts recording a new game (on a new board, or a board reset to
+        round 0)
+        """
+        if board.get_rounds() != 0:
+            raise ValueError(f"a game can only be recorded from its first "
+                             f"round (its first seen round is "
+                             f"{board.get_rounds()})")
+        if board is not self.__board:
+            if self.__board is not None:
+                self.__board.events.unsubscribe(events.GameOver,
+                                                self.__on_game_over)
+            board.events.subscribe(events.GameOver, self.__on_game_over)
+            self.__board = board
+        self.__keys = bytearray()
+        self.__cause = None
+        self.__is_appended = False
+
+    def __on_game_over(self, event: events.GameOver) -> None:
+        self.__cause = event.cause
+
+
+class ArchiveReader:
+    """
+    Reads an archive through memory maps. Games appended after the reader
+    was opened are seen after 'refresh'
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Opens an archive
+        :param path: the archive's data file (the index is next to it)
+        """
+        self.path = path
+        self.__data: Optional[mmap.mmap] = None
+        self.__index: Optional[mmap.mmap] = None
+        self.__count = 0
+        self.refresh()
+        if self.__data is None or \
+                self.__data[:len(ARCHIVE_MAGIC)] != ARCHIVE_MAGIC or \
+                self.__index is None or \
+                self.__index[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+            self.close()
+            raise ValueError(f"not an archive: {path}")
+
+    def __enter__(self) -> 'ArchiveReader':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.__count
+
+    @staticmethod
+    def __map(path: str) -> Optional[mmap.mmap]:
+        with open(path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return None
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def refresh(self) -> None:
+        """
+        Re-maps the archive, to see the games appended since
+        """
+        self.close()
+        self.__data = self.__map(self.path)
+        self.__index = self.__map(self.path + INDEX_SUFFIX)
+        if self.__index is None:
+            self.__count = 0
+        else:
+            # a trailing partial offset is a game still being appended
+            self.__count = (len(self.__index) - len(INDEX_MAGIC)) // \
+                OFFSET.size
+
+    def close(self) -> None:
+        """
+        Unmaps the archive
+        """
+        for mapped in (self.__data, self.__index):
+            if mapped is not None:
+                mapped.close()
+        self.__data = self.__index = None
+
+    # region get & set methods
+    def get_offset(self, game: int) -> int:
+        """
+        Returns the data file offset of a game
+        """
+        if not (0 <= game < self.__count):
+            raise ValueError(f"game {game} is not in the archive "
+                             f"(0 - {self.__count - 1})")
+        return OFFSET.unpack_from(self.__index,
+                                  len(INDEX_MAGIC) + game * OFFSET.size)[0]
+
+    def get_header(self, game: int) -> GameHeader:
+        """
+        Returns a game's header (without touching its keys)
+        """
+        return self.__unpack_header(self.get_offset(game))
+
+    def get_key_codes(self, game: int) -> memoryview:
+        """
+        Returns a game's key codes (a byte per round), as a zero-copy view
+        into the archive which must be released before 'close'
+        """
+        offset = self.get_offset(game)
+        keys_length = self.__unpack_header(offset).keys_length
+        start = offset + HEADER.size
+        return memoryview(self.__data)[start:start + keys_length]
+
+    def get_keys(self, game: int) -> List[Optional[str]]:
+        """
+        Returns the keys clicked in every round of a game
+        """
+        with self.get_key_codes(game) as codes:
+            return [CODE_TO_KEY[code] for code in codes]
+
+    def __unpack_header(self, offset: int) -> GameHeader:
+        header = GameHeader(*HEADER.unpack_from(self.__data, offset))
+        return header._replace(seed=header.seed.rstrip(b'\0').decode(),
+                               debug=bool(header.debug),
+                               rng_use_numpy=bool(header.rng_use_numpy),
+                               cause=CAUSES[header.cause],
+                               fill=bool(header.fill))
+
+    # endregion get & set methods
+    # region action methods
+    def iter_headers(self) -> Iterator[Tuple[int, GameHeader]]:
+        """
+        Yields (game, header) for every game, at the offsets in the index
+        (without touching the key streams, or a game still being appended)
+        """
+        for game in range(self.__count):
+            yield game, self.get_header(game)
+
+    def filter(self, predicate: Callable[[GameHeader], bool]) -> List[int]:
+        """
+        Returns the games whose header matches a predicate
+        """
+        return [game for game, header in self.iter_headers()
+                if predicate(header)]
+
+    def replay(self, game: int) -> Board:
+        """
+        Replays a game from its seed and keys
+        :return: the Board at the end of the game
+        """
+        header = self.get_header(game)
+        if not header.seed:
+            raise ValueError(f"game {game} was not played with a seed")
+        args = get_header_args(header)
+        rng = game_utils.RandomContext(header.seed,
+                                       block_size=header.rng_block_size,
+                                       use_numpy=header.rng_use_numpy)
+        board = Board(is_debug=args.debug, rng=rng, width=args.width,
+                      height=args.height)
+        keys = iter(self.get_keys(game))
+        return snake_main.main_loop(HeadlessDisplay(lambda: next(keys)),
+                                    args, board=board)
+
+    # endregion action methods
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def make_header(board: Board, args: Namespace,
+                cause: Optional[str]) -> GameHeader:
+    """
+    Creates the header of a game which is over
+    :param board: the game's Board
+    :param args: the arguments of the 'snake game'
+    :param cause: the cause of the game's end (one of 'events.OVER_*')
+    :return: the game's header
+    """
+    seed = board.rng.seed_value
+    return GameHeader(
+        '' if seed is None else str(seed), board.width, board.height,
+        int(args.apples), int(args.walls), int(args.rounds),
+        bool(args.debug), board.rng.use_numpy, board.rng.block_size,
+        board.get_score(), board.get_rounds(), board.snake.get_length(),
+        cause, bool(getattr(args, 'fill', False)), 0)
+
+
+def get_header_args(header: GameHeader) -> Namespace:
+    """
+    Returns the arguments a game was played with
+    """
+    return make_game_args(width=header.width, height=header.height,
+                          apples=header.apples, walls=header.walls,
+                          rounds=header.max_rounds, debug=header.debug,
+                          fill=header.fill)
+
+
+def play_game(game: Tuple[str, str, Namespace]) -> Tuple[GameHeader, bytes]:
+    """
+    Plays a single game of a bot, as 'game_display.py --seed' would
+    :param game: (bot name, seed, the arguments of the 'snake game')
+    :return: the game's header and key codes
+    """
+    bot_name, seed, args = game
+    bot = BOTS[bot_name]()
+    board = Board(is_debug=args.debug, rng=game_utils.RandomContext(seed),
+                  width=args.width, height=args.height)
+    keys = bytearray()
+    cause: List[Optional[str]] = [None]
+    board.events.subscribe(events.GameOver,
+                           lambda event: cause.__setitem__(0, event.cause))
+
+    def next_key() -> Optional[str]:
+        key = bot(board)
+        keys.append(KEY_TO_CODE.get(key, KEY_TO_CODE[None]))
+        return key
+
+    snake_main.main_loop(HeadlessDisplay(next_key), args, board=board)
+    return make_header(board, args, cause[0]), bytes(keys)
+
+
+def record_games(path: str, bot_name: str, seeds: List[str],
+                 args: Namespace, workers: int = 0) -> int:
+    """
+    Plays a bot's games across a process pool, and appends them to an
+    archive (from this process only)
+    :param workers: the number of processes (0 for one per CPU)
+    :return: the number of games appended
+    """
+    games = [(bot_name, seed, args) for seed in seeds]
+    with ArchiveWriter(path) as writer, \
+            ProcessPoolExecutor(max_workers=workers or None) as executor:
+        chunk_size = max(1, len(games) // (8 * (workers or 4)))
+        for header, keys in executor.map(play_game, games,
+                                         chunksize=chunk_size):
+            writer.append(header, keys)
+    return len(games)
+
+
+def parse_args(argv: List[str]) -> Namespace:
+    parser = argparse.ArgumentParser(
+        prog='archive.py',
+        description='Records bot games into an archive, or lists the games '
+                    'of an archive.',
+    )
+    parser.add_argument('path', help='The archive\'s data file')
+    parser.add_argument('--play', choices=sorted(BOTS),
+                        help='Append games of this bot')
+    parser.add_argument('--seeds', type=int, default=SEEDS,
+                        help='Number of seeds to play (with --play)')
+    parser.add_argument('-x', '--width', type=int, default=40)
+    parser.add_argument('-y', '--height', type=int, default=30)
+    parser.add_argument('-a', '--apples', type=int, default=3)
+    parser.add_argument('-w', '--walls', type=int, default=2)
+    parser.add_argument('-r', '--rounds', type=int, default=ROUNDS)
+    parser.add_argument('-j', '--workers', type=int, default=0,
+                        help='Number of processes (default: one per CPU)')
+    parser.add_argument('--min-score', type=int, default=0,
+                        help='List only games with at least this score')
+    parser.add_argument('--cause', choices=[cause for cause in CAUSES
+                                            if cause is not None],
+                        help='List only games which ended this way')
+    parser.add_argument('--limit', type=int, default=20,
+                        help='Maximal number of games to list')
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    run_args = parse_args(sys.argv[1:])
+    if run_args.play:
+        game_args = make_game_args(run_args.width, run_args.height,
+                                   run_args.apples, run_args.walls,
+                                   run_args.rounds)
+        count = record_games(run_args.path, run_args.play,
+                             [str(seed) for seed in range(run_args.seeds)],
+                             game_args, run_args.workers)
+        print(f'appended {count} games to {run_args.path}')
+
+    with ArchiveReader(run_args.path) as reader:
+        matches = reader.filter(
+            lambda game_header: game_header.score >= run_args.min_score and
+            run_args.cause in (None, game_header.cause))
+        print(f'{len(matches)} of {len(reader)} games match')
+        for match in matches[:run_args.limit]:
+            game_header = reader.get_header(match)
+            print(f'#{match:<7} seed={game_header.seed:<8} '
+                  f'score={game_header.score:<6} '
+                  f'rounds={game_header.rounds:<6} '
+                  f'cause={game_header.cause}')
@@ -0,0 +1,92 @@
+"""
+FILE: benchmarks/draw_board.py
+DESCRIPTION: benchmarks the per-round cost of drawing the board against the
+snake's length and the number of walls and apples, with only the changed
+cells sent to the display compared with a full redraw every round (how the
+board used to be drawn).
+run:
+> python benchmarks/draw_board.py
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from board import Board  # noqa: E402
+from headless_display import HeadlessDisplay  # noqa: E402
+from rule_checks import make_board  # noqa: E402
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+SNAKE_LENGTHS = [10, 1000, 20000]
+ENTITY_COUNTS = [10, 300, 1000]
+REPEATS = 200
+FULL_REDRAW_REPEATS = 10
+
+
+###############################################################################
+#                           Class & Inner Functions                           #
+###############################################################################
+class CountingDisplay(HeadlessDisplay):
+    """
+    A display which counts the cells it was sent
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.cells = 0
+
+    def draw_cell(self, x: int, y: int, color: str) -> None:
+        self.cells += 1
+
+    def clear_cell(self, x: int, y: int) -> None:
+        self.cells += 1
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def time_drawing(board: Board, gd: CountingDisplay, redraw: bool,
+                 repeats: int) -> float:
+    """
+    Returns the average time (seconds) of drawing the board, after the snake
+    and the walls moved (which is not timed)
+    """
+    elapsed = 0.0
+    for _ in range(repeats):
+        board.add_round()
+        board.update_moving_objects()
+        start = time.perf_counter()
+        board.draw_board(gd, redraw=redraw)
+        elapsed += time.perf_counter() - start
+    return elapsed / repeats
+
+
+def benchmark() -> None:
+    print(f'{"snake":>7} {"entities":>9} {"changed us":>11} {"cells":>6} '
+          f'{"full us":>9} {"cells":>6}')
+    for snake_length in SNAKE_LENGTHS:
+        for entities in ENTITY_COUNTS:
+            results = []
+            for redraw, repeats in ((False, REPEATS),
+                                    (True, FULL_REDRAW_REPEATS)):
+                board = make_board(snake_length, entities)
+                gd = CountingDisplay()
+                board.draw_board(gd)
+                gd.cells = 0
+                results.append((time_drawing(board, gd, redraw, repeats),
+                                gd.cells // repeats))
+            (changed, changed_cells), (full, full_cells) = results
+            print(f'{snake_length:>7} {entities:>9} {changed * 1e6:>11.1f} '
+                  f'{changed_cells:>6} {full * 1e6:>9.1f} {full_cells:>6}')
+
+
+if __name__ == "__main__":
+    benchmark()
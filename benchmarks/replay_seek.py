@@ -0,0 +1,66 @@
+"""
+FILE: benchmarks/replay_seek.py
+DESCRIPTION: benchmarks replay seeking - seek time against keyframe interval
+and replay file size.
+run:
+> python benchmarks/replay_seek.py [rounds] [seeks]
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import os
+import sys
+import random
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+import game_utils  # noqa: E402
+from headless_display import make_game_args, run_headless_game  # noqa: E402
+from replay import ReplayRecorder, ReplayReader  # noqa: E402
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+ROUNDS = 20000
+SEEKS = 20
+KEYFRAME_INTERVALS = [100, 500, 1000, 5000]
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def benchmark(rounds: int, seeks: int) -> None:
+    """
+    Records the same game with every keyframe interval, and measures the
+    average time of seeking to random rounds
+    """
+    # debug mode keeps the game alive for the requested number of rounds
+    args = make_game_args(width=100, height=100, apples=50, walls=20,
+                          rounds=rounds, debug=True)
+    targets = random.Random(0).sample(range(rounds + 1), seeks)
+
+    print(f'{"interval":>9} {"file KB":>9} {"seek ms":>9}')
+    with tempfile.TemporaryDirectory() as directory:
+        for interval in KEYFRAME_INTERVALS:
+            path = os.path.join(directory, f'{interval}.replay')
+            run_headless_game(
+                args, rng=game_utils.RandomContext(0),
+                observers=[ReplayRecorder(path, args, interval)])
+
+            with ReplayReader(path) as reader:
+                start = time.perf_counter()
+                for target in targets:
+                    reader.seek(target)
+                elapsed = (time.perf_counter() - start) / seeks
+
+            size = os.path.getsize(path) / 1024
+            print(f'{interval:>9} {size:>9.1f} {elapsed * 1000:>9.2f}')
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else ROUNDS,
+              int(sys.argv[2]) if len(sys.argv) > 2 else SEEKS)
@@ -0,0 +1,113 @@
+"""
+FILE: benchmarks/rule_checks.py
+DESCRIPTION: benchmarks the end-of-round rule checks against the snake's
+length and the number of walls and apples, compared with full scans of
+every snake cell, wall and apple (how the rules used to be checked).
+run:
+> python benchmarks/rule_checks.py
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import os
+import sys
+import random
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+import game_utils  # noqa: E402
+import snake_main  # noqa: E402
+from board import Board  # noqa: E402
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+SIZE = 400
+SNAKE_LENGTHS = [10, 1000, 20000]
+ENTITY_COUNTS = [10, 300, 1000]
+REPEATS = 200
+FULL_SCAN_REPEATS = 3
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def make_board(snake_length: int, entities: int) -> Board:
+    """
+    Creates a board with a snake of the given length (winding through the
+    board's bottom rows), and the given number of walls and apples
+    """
+    board = Board(rng=game_utils.RandomContext(0), width=SIZE, height=SIZE)
+    cells = []
+    for index in range(snake_length):
+        row, col = divmod(index, SIZE)
+        cells.append((col if row % 2 == 0 else SIZE - 1 - col, row))
+
+    # walls and apples above the snake, never touching it
+    free_rows = range(snake_length // SIZE + 2, SIZE - 2)
+    generator = random.Random(0)
+    walls = [[col, row, game_utils.RIGHT, [(col - 1, row), (col, row),
+                                           (col + 1, row)]]
+             for col, row in ((generator.randrange(1, SIZE - 1),
+                               generator.choice(free_rows))
+                              for _ in range(entities))]
+    apples = [(generator.randrange(SIZE), generator.choice(free_rows))
+              for _ in range(entities)]
+
+    state = board.get_state()
+    state['snake'] = {'cells': cells, 'direction': game_utils.UP,
+                      'cells_to_be_added': 0}
+    state['walls'] = walls
+    state['apples'] = apples
+    board.set_state(state)
+    return board
+
+
+def incremental_checks(board: Board) -> None:
+    """
+    The end-of-round rule checks, as the game loop runs them
+    """
+    snake_main.interaction_walls_apples(board)
+    snake_main.is_snake_cut_by_wall(board)
+    board.is_snake_out_boundaries()
+    board.get_apple_at(board.snake.get_head_location())
+
+
+def full_scan_checks(board: Board) -> None:
+    """
+    The same rule checks, scanning every snake cell, wall and apple
+    """
+    for apple in board.get_apples():
+        for wall in board.get_walls():
+            if apple.get_location() in wall.get_wall_cells_locations():
+                break
+    for wall in board.get_walls():
+        if board.snake.is_collided(wall.wall_cells)[0]:
+            break
+    for cell in board.snake.get_snake_cells():
+        if not board.is_coord_in_board_boundaries(cell.get_location()):
+            break
+    for apple in board.get_apples():
+        board.snake.compare_to_head(apple.get_location())
+
+
+def benchmark() -> None:
+    print(f'{"snake":>7} {"entities":>9} {"incremental us":>15} '
+          f'{"full scan us":>13}')
+    for snake_length in SNAKE_LENGTHS:
+        for entities in ENTITY_COUNTS:
+            board = make_board(snake_length, entities)
+            incremental = timeit.timeit(lambda: incremental_checks(board),
+                                        number=REPEATS) / REPEATS
+            full_scan = timeit.timeit(lambda: full_scan_checks(board),
+                                      number=FULL_SCAN_REPEATS) / \
+                FULL_SCAN_REPEATS
+            print(f'{snake_length:>7} {entities:>9} '
+                  f'{incremental * 1e6:>15.2f} {full_scan * 1e6:>13.1f}')
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,77 @@
+"""
+FILE: benchmarks/telemetry_overhead.py
+DESCRIPTION: benchmarks the per-round overhead of the telemetry sink (a
+CSV file's conversion, when the sink is closed, is timed separately).
+run:
+> python benchmarks/telemetry_overhead.py [rounds]
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+import game_utils  # noqa: E402
+from headless_display import make_game_args, run_headless_game  # noqa: E402
+from telemetry import TelemetrySink, read_telemetry  # noqa: E402
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+ROUNDS = 5000
+REPEATS = 3
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def time_game(rounds: int, observers: list) -> float:
+    """
+    Returns the average round time (seconds) of a seeded game, the best of
+    a few repeats
+    """
+    # debug mode keeps the game alive for the requested number of rounds
+    args = make_game_args(width=100, height=100, apples=50, walls=20,
+                          rounds=rounds, debug=True)
+    best = float('inf')
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        run_headless_game(args, rng=game_utils.RandomContext(0),
+                          observers=observers)
+        best = min(best, time.perf_counter() - start)
+    return best / rounds
+
+
+def benchmark(rounds: int) -> None:
+    """
+    Compares the round time without telemetry and with both file formats
+    """
+    base = time_game(rounds, [])
+    print(f'{"sink":>10} {"round us":>9} {"overhead":>9} {"close ms":>9} '
+          f'{"dropped":>8}')
+    print(f'{"none":>10} {base * 1e6:>9.1f}')
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ('telemetry.bin', 'telemetry.csv'):
+            sink = TelemetrySink(os.path.join(directory, name))
+            elapsed = time_game(rounds, [sink])
+            start = time.perf_counter()
+            sink.close()
+            closing = time.perf_counter() - start
+            # a dropped batch is reported rather than failing the benchmark
+            print(f'{name.split(".")[1]:>10} {elapsed * 1e6:>9.1f} '
+                  f'{(elapsed - base) / base:>9.1%} {closing * 1e3:>9.1f} '
+                  f'{sink.dropped_batches:>8}')
+        columns = read_telemetry(os.path.join(directory, 'telemetry.bin'))
+        missing = REPEATS * (rounds + 1) - len(columns['round'])
+        if missing:
+            print(f'{missing} rows of the columnar file were dropped')
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else ROUNDS)
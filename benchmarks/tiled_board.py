@@ -0,0 +1,97 @@
+"""
+FILE: benchmarks/tiled_board.py
+DESCRIPTION: benchmarks finding the walls and apples in a viewport of an
+enormous board against their number, with the board's tile index compared
+with scanning every wall and apple, and shows how many tiles the index
+allocated.
+run:
+> python benchmarks/tiled_board.py
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import os
+import sys
+import timeit
+from typing import Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+import game_utils  # noqa: E402
+from board import Board  # noqa: E402
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+SIZE = 100000
+ENTITY_COUNTS = [1000, 10000, 100000]
+# the size of the game window's viewport
+VIEWPORT = (50000, 50000, 50060, 50040)
+REPEATS = 200
+FULL_SCAN_REPEATS = 5
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def make_board(entities: int) -> Board:
+    """
+    Creates a board (with no snake) holding the given number of walls and
+    apples
+    """
+    board = Board(is_debug=True, rng=game_utils.RandomContext(0),
+                  width=SIZE, height=SIZE)
+    board.fill_walls(entities)
+    board.fill_apples(entities)
+    return board
+
+
+def is_in_area(location: Tuple[int, int],
+               area: Tuple[int, int, int, int]) -> bool:
+    return area[0] <= location[0] < area[2] and \
+        area[1] <= location[1] < area[3]
+
+
+def find_tiled(board: Board) -> int:
+    """
+    Returns the number of cells in the viewport, using the tile index
+    """
+    walls = board.get_walls_in_area(VIEWPORT)
+    apples = board.get_apples_in_area(VIEWPORT)
+    return sum(1 for wall in walls for cell in wall.wall_cells
+               if is_in_area(cell.get_location(), VIEWPORT)) + \
+        sum(1 for apple in apples
+            if is_in_area(apple.get_location(), VIEWPORT))
+
+
+def find_full_scan(board: Board) -> int:
+    """
+    Returns the number of cells in the viewport, scanning every wall and
+    apple
+    """
+    return sum(1 for wall in board.get_walls() for cell in wall.wall_cells
+               if is_in_area(cell.get_location(), VIEWPORT)) + \
+        sum(1 for apple in board.get_apples()
+            if is_in_area(apple.get_location(), VIEWPORT))
+
+
+def benchmark() -> None:
+    print(f'{"entities":>9} {"tiles":>7} {"tiled us":>9} '
+          f'{"full scan us":>13}')
+    for entities in ENTITY_COUNTS:
+        board = make_board(entities)
+        assert find_tiled(board) == find_full_scan(board)
+        tiles = board.get_tile_count()
+        tiled = timeit.timeit(lambda: find_tiled(board),
+                              number=REPEATS) / REPEATS
+        full_scan = timeit.timeit(lambda: find_full_scan(board),
+                                  number=FULL_SCAN_REPEATS) / \
+            FULL_SCAN_REPEATS
+        print(f'{entities:>9} {tiles:>7} {tiled * 1e6:>9.1f} '
+              f'{full_scan * 1e6:>13.1f}')
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,74 @@
+"""
+FILE: benchmarks/wall_upkeep.py
+DESCRIPTION: benchmarks the per-round cost of the walls' upkeep (moving them,
+and removing the ones which left the board) against the number of walls,
+with their removal scheduled when they are placed compared with also
+checking every wall every round (how the walls used to be removed).
+run:
+> python benchmarks/wall_upkeep.py
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+import game_utils  # noqa: E402
+from board import Board  # noqa: E402
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+SIZE = 1000
+WALL_COUNTS = [10, 1000, 10000]
+ROUNDS = 200
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def make_board(walls: int) -> Board:
+    """
+    Creates a board (with no snake) holding the given number of walls
+    """
+    board = Board(is_debug=True, rng=game_utils.RandomContext(0),
+                  width=SIZE, height=SIZE)
+    board.fill_walls(walls)
+    return board
+
+
+def time_upkeep(board: Board, walls: int, is_full_scan: bool) -> float:
+    """
+    Returns the average time (seconds) of the walls' upkeep in a round. The
+    removed walls are replaced (which is not timed), as the game loop does
+    """
+    elapsed = 0.0
+    for _ in range(ROUNDS):
+        board.add_round()
+        start = time.perf_counter()
+        board.update_moving_objects()
+        if is_full_scan:
+            for wall in board.get_walls():
+                board.should_remove_wall(wall)
+        elapsed += time.perf_counter() - start
+        board.fill_walls(walls)
+    return elapsed / ROUNDS
+
+
+def benchmark() -> None:
+    print(f'{"walls":>7} {"scheduled us":>13} {"full scan us":>13}')
+    for walls in WALL_COUNTS:
+        # fills the cache of the walls' Zobrist keys
+        time_upkeep(make_board(walls), walls, False)
+        scheduled = time_upkeep(make_board(walls), walls, False)
+        full_scan = time_upkeep(make_board(walls), walls, True)
+        print(f'{walls:>7} {scheduled * 1e6:>13.2f} {full_scan * 1e6:>13.1f}')
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -5,14 +5,32 @@ DESCRIPTION: a 'Board' class used for a 'snake' game.
 ###############################################################################
 #                                   Imports                                   #
 ###############################################################################
+import math
+import heapq
+from itertools import chain
 import game_utils
-from typing import Optional, List, Tuple
-from board_cell import BoardCell
+import events
+import zobrist
+from typing import Any, Dict, Iterator, Optional, List, Set, Tuple
+from board_cell import BoardCell, MOVE_DELTA_MAPPING
+from chunked_grid import ChunkedGrid
 from snake import Snake
-from wall import Wall
+from wall import Wall, WALL_COLOR
 from game_display import GameDisplay
 
 
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+APPLE_COLOR = "green"
+# the maximal number of candidate batches drawn by a bulk fill
+FILL_BATCHES = 16
+# boards with more cells index their apples and walls by tile (smaller ones
+# are drawn whole, and scanning their lists is cheaper than keeping the
+# index up to date)
+TILED_BOARD_AREA = 1 << 16
+
+
 ###############################################################################
 #                           Class & Inner Functions                           #
 ###############################################################################
@@ -21,9 +39,18 @@ class Board:
     A 'SnakeGame' class used for a 'snake' game
     """
 
-    def __init__(self, is_debug: bool = False) -> None:
-        self.width: int = game_utils.size.width
-        self.height: int = game_utils.size.height
+    def __init__(self, is_debug: bool = False,
+                 rng: Optional[game_utils.RandomContext] = None,
+                 width: Optional[int] = None,
+                 height: Optional[int] = None,
+                 event_bus: Optional[events.EventBus] = None) -> None:
+        self.width: int = width if width is not None else \
+            game_utils.size.width
+        self.height: int = height if height is not None else \
+            game_utils.size.height
+        # the game's random stream (the shared module-level one by default)
+        self.rng: game_utils.RandomContext = \
+            rng if rng is not None else game_utils.random_context
         self.__key_clicked: Optional[str] = None
         self.__walls: List[Wall] = []
         self.__apples: List[BoardCell] = []
@@ -31,8 +58,45 @@ class Board:
         self.__score: int = 0
         self.is_debug: bool = is_debug
         self.is_over: bool = False
+        # the game's interactions are emitted on it as they are detected
+        self.events: events.EventBus = \
+            event_bus if event_bus is not None else events.EventBus()
         self.snake = Snake(self.width // 2, self.height // 2, length=3)
 
+        # indices kept up to date on every change, so the end-of-round rules
+        # only look at the cells which changed (the snake and the walls must
+        # therefore be moved and cut through the board)
+        self.__apple_locations: Dict[Tuple[int, int], BoardCell] = {}
+        self.__wall_cells_count: Dict[Tuple[int, int], int] = {}
+        self.__snake_cells_out_of_bounds: int = 0
+        # the apples and walls in every tile of the board (tiles are only
+        # allocated where there are any), to find the ones in a region
+        # (only on boards larger than TILED_BOARD_AREA)
+        self.__is_tiled: bool = self.width * self.height > TILED_BOARD_AREA
+        self.__apple_tiles: ChunkedGrid = ChunkedGrid()
+        self.__wall_tiles: ChunkedGrid = ChunkedGrid()
+        self.__wall_tile_crossings: Dict[str, Tuple[int, int, int, int]] = {
+            direction: self.__wall_tiles.get_tile_crossing(delta)
+            for direction, delta in MOVE_DELTA_MAPPING.items()}
+        # candidates which may be stale, verified when the rules are checked
+        self.__crushed_apples: Set[Tuple[int, int]] = set()
+        self.__snake_wall_contacts: Set[Tuple[int, int]] = set()
+        # (round, sequence number, wall) of the round every wall will be
+        # removed in, known when it is placed since walls move straight
+        self.__wall_expiries: List[Tuple[int, int, Wall]] = []
+        self.__wall_sequence: int = 0
+        # a Zobrist hash of the snake, walls, apples, direction and growth
+        self.__hash: int = 0
+        # the locations whose content may have changed since the last
+        # drawing, and the display and region it was drawn on
+        self.__dirty_cells: Set[Tuple[int, int]] = set()
+        # the same locations, kept for other readers of the board (see
+        # 'track_changed_cells')
+        self.__change_trackers: List[Set[Tuple[int, int]]] = []
+        self.__drawn_display: Optional[Any] = None
+        self.__drawn_area: Optional[Tuple[int, int, int, int]] = None
+        self.__rebuild_indices()
+
     # region get & set methods
     # region property: rounds
     def get_rounds(self) -> int:
@@ -61,8 +125,234 @@ class Board:
         """
         self.__score += value
 
+    def end_game(self, cause: str) -> None:
+        """
+        Ends the game (once, later calls are ignored)
+        :param cause: one of the 'events.OVER_*' causes
+        :return: None
+        """
+        if self.is_over:
+            return
+        self.is_over = True
+        if self.events.has_subscribers(events.GameOver):
+            self.events.emit(events.GameOver(self.__rounds, cause,
+                                             self.__score))
+
     # endregion property: score
+    # region property: key clicked
+    def get_key_clicked(self) -> Optional[str]:
+        """
+        Returns the key read in the current round
+        """
+        return self.__key_clicked
+
+    # endregion property: key clicked
+    # region property: state
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Returns the board's full state (snake, walls, apples, score and RNG
+        state) as plain data, which can be restored with 'set_state'
+        """
+        return {
+            'rounds': self.__rounds,
+            'score': self.__score,
+            'is_over': self.is_over,
+            'key_clicked': self.__key_clicked,
+            'snake': self.snake.get_state(),
+            'walls': [wall.get_state() for wall in self.__walls],
+            'apples': [apple.get_location() for apple in self.__apples],
+            'rng': self.rng.getstate()
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """
+        Restores a state returned by 'get_state'
+        :param state: a state returned by 'get_state'
+        :return: None
+        """
+        self.__rounds = state['rounds']
+        self.__score = state['score']
+        self.is_over = state['is_over']
+        self.__key_clicked = state['key_clicked']
+        # the trackers get the cells of the entities before and after
+        self.__mark_all_cells_changed()
+        self.snake.set_state(state['snake'])
+        self.__walls = [Wall.from_state(wall) for wall in state['walls']]
+        self.__apples = [BoardCell(col, row, color=APPLE_COLOR)
+                         for col, row in state['apples']]
+        self.rng.setstate(state['rng'])
+        self.__rebuild_indices()
+        self.__mark_all_cells_changed()
+
+    # endregion property: state
+    # region property: hash
+    def get_zobrist_hash(self) -> int:
+        """
+        Returns the board's 64-bit Zobrist hash, which covers the snake's
+        cells (and their order), direction and pending growth, the walls'
+        cells and directions, and the apples. Equal boards have equal hashes
+        """
+        return self.__hash
+
+    # endregion property: hash
+    # region property: changed cells
+    def track_changed_cells(self) -> Set[Tuple[int, int]]:
+        """
+        Returns a set which every location whose content may change is added
+        to from now on (the locations sent to the display when it is drawn),
+        for readers of the board other than its display. The reader empties
+        it after reading it
+        :return: an empty set of locations
+        """
+        changed_cells: Set[Tuple[int, int]] = set()
+        self.__change_trackers.append(changed_cells)
+        return changed_cells
+
+    # endregion property: changed cells
     # endregion get & set methods
+    # region index methods
+    def __rebuild_indices(self) -> None:
+        """
+        Rebuilds all the indices from scratch (after a major change)
+        """
+        self.__apple_locations = {apple.get_location(): apple
+                                  for apple in self.__apples}
+        self.__wall_cells_count = {}
+        self.__crushed_apples = set()
+        self.__wall_expiries = []
+        self.__apple_tiles.clear()
+        self.__wall_tiles.clear()
+        for wall in self.__walls:
+            for cell in wall.wall_cells:
+                self.__add_wall_cell(cell.get_location())
+            self.__schedule_wall_expiry(wall)
+        if self.__is_tiled:
+            for apple in self.__apples:
+                self.__apple_tiles.add(apple.get_location(), apple)
+            for wall in self.__walls:
+                for cell in wall.wall_cells:
+                    self.__wall_tiles.add(cell.get_location(), wall)
+        self.__rebuild_snake_indices()
+        self.__hash = zobrist.board_hash(self)
+        # everything may have changed, the next drawing is a full one
+        self.__drawn_display = None
+
+    def __rebuild_snake_indices(self) -> None:
+        """
+        Rebuilds the snake's indices (after its tail was cut)
+        """
+        snake_cells_locations = self.snake.get_snake_cells_locations()
+        self.__snake_cells_out_of_bounds = sum(
+            1 for cell in self.snake.get_snake_cells()
+            if not self.is_coord_in_board_boundaries(cell.get_location()))
+        self.__snake_wall_contacts = {
+            location for location in self.__wall_cells_count
+            if location in snake_cells_locations}
+
+    def __mark_changed(self, location: Tuple[int, int]) -> None:
+        """
+        Marks a location whose content may have changed, for the next
+        drawing and the trackers
+        """
+        self.__dirty_cells.add(location)
+        for changed_cells in self.__change_trackers:
+            changed_cells.add(location)
+
+    def __mark_all_cells_changed(self) -> None:
+        """
+        Adds the locations of all the cells to the trackers (the next drawing
+        after a major change is a full one anyway)
+        """
+        for changed_cells in self.__change_trackers:
+            changed_cells.update(cell.get_location()
+                                 for cell in self.get_all_cells())
+
+    def __add_wall_cell(self, location: Tuple[int, int]) -> None:
+        """
+        Marks a location as covered by (one more) wall cell
+        """
+        self.__wall_cells_count[location] = \
+            self.__wall_cells_count.get(location, 0) + 1
+        self.__mark_changed(location)
+        if location in self.__apple_locations:
+            self.__crushed_apples.add(location)
+        if location in self.snake.get_snake_cells_locations():
+            self.__snake_wall_contacts.add(location)
+
+    def __remove_wall_cell(self, location: Tuple[int, int]) -> None:
+        """
+        Marks a location as covered by one less wall cell
+        """
+        count = self.__wall_cells_count[location] - 1
+        self.__mark_changed(location)
+        if count:
+            self.__wall_cells_count[location] = count
+        else:
+            del self.__wall_cells_count[location]
+
+    def __move_wall(self, wall: Wall) -> None:
+        """
+        Moves a wall, updating only its trailing and leading cells
+        """
+        trailing_location = wall.wall_cells[0].get_location()
+        wall.move()
+        leading_location = wall.wall_cells[-1].get_location()
+        self.__remove_wall_cell(trailing_location)
+        self.__add_wall_cell(leading_location)
+
+        # the wall's tiles only change when one of its ends crosses into
+        # another tile (a wall is straight and shorter than a tile)
+        if self.__is_tiled:
+            axis, mask, entered_bits, leaving_bits = \
+                self.__wall_tile_crossings[wall.direction]
+            if leading_location[axis] & mask == entered_bits:
+                self.__wall_tiles.add(leading_location, wall)
+            if trailing_location[axis] & mask == leaving_bits:
+                self.__wall_tiles.discard(trailing_location, wall)
+        self.__hash ^= zobrist.wall_cell_key(trailing_location,
+                                             wall.direction) ^ \
+            zobrist.wall_cell_key(leading_location, wall.direction)
+
+    def __move_snake(self) -> None:
+        """
+        Moves the snake, updating only its removed tail and new head
+        """
+        snake_cells = self.snake.get_snake_cells()
+        tail_location = snake_cells[0].get_location()
+        # the cell after the tail (None if the tail is the head)
+        next_location = snake_cells[1].get_location() \
+            if len(snake_cells) > 1 else None
+        old_head_location = self.snake.get_head_location()
+        cells_to_be_added = self.snake.cells_to_be_added
+        is_growing = cells_to_be_added > 0
+        self.snake.move()
+        head_location = self.snake.get_head_location()
+        self.__mark_changed(tail_location)
+        self.__mark_changed(head_location)
+
+        # hash: the old head becomes a body cell, and the tail is removed
+        self.__hash ^= zobrist.snake_head_key(old_head_location) ^ \
+            zobrist.snake_head_key(head_location) ^ \
+            zobrist.snake_body_key(old_head_location, head_location)
+        if is_growing:
+            self.__hash ^= zobrist.growth_key(cells_to_be_added) ^ \
+                zobrist.growth_key(self.snake.cells_to_be_added)
+        elif next_location is not None:
+            self.__hash ^= zobrist.snake_body_key(tail_location,
+                                                  next_location)
+        else:
+            self.__hash ^= zobrist.snake_body_key(old_head_location,
+                                                  head_location)
+
+        if not is_growing and \
+                not self.is_coord_in_board_boundaries(tail_location):
+            self.__snake_cells_out_of_bounds -= 1
+        if not self.is_coord_in_board_boundaries(head_location):
+            self.__snake_cells_out_of_bounds += 1
+        if head_location in self.__wall_cells_count:
+            self.__snake_wall_contacts.add(head_location)
+
+    # endregion index methods
     # region action methods
     def read_key(self, key_clicked: Optional[str]) -> None:
         """
@@ -79,50 +369,214 @@ class Board:
         # region update walls
         if self.__rounds % 2 == 0:
             for wall in self.__walls:
-                wall.move()
+                self.__move_wall(wall)
         self.remove_walls()
         # endregion update walls
         # region update snake
         if not self.is_debug:
+            direction = self.snake.direction
             self.snake.update_direction(self.__key_clicked)
-            self.snake.move()
+            if self.snake.direction != direction:
+                self.__hash ^= zobrist.direction_key(direction) ^ \
+                    zobrist.direction_key(self.snake.direction)
+            self.__move_snake()
         # endregion update snake
 
-    def draw_list_of_board_cells(self, list_of_board_cells: List[BoardCell],
-                                 gd: GameDisplay) -> None:
+    def draw_list_of_board_cells(
+            self, list_of_board_cells: List[BoardCell], gd: GameDisplay,
+            visible_area: Optional[Tuple[int, int, int, int]] = None) -> None:
         """
         Draws all BoardCell(s) from a given list
         :param list_of_board_cells: a list of BoardCell(s)
         :param gd: a GameDisplay
+        :param visible_area: (min x, min y, max x, max y) of the shown region
+                             (the whole board if None), cells outside of it
+                             are not drawn
         :return: None
         """
+        if visible_area is None:
+            visible_area = (0, 0, self.width, self.height)
+        min_col, min_row, max_col, max_row = visible_area
+
         for cell in list_of_board_cells:
-            cell_row, cell_col = cell.get_location()
+            cell_col, cell_row = cell.get_location()
 
-            # verify in board boundaries
-            if self.is_coord_in_board_boundaries((cell_row, cell_col)):
+            # verify in the shown region (which is in board boundaries)
+            if min_col <= cell_col < max_col and min_row <= cell_row < max_row:
                 cell_color = cell.get_color()
-                gd.draw_cell(cell_row, cell_col, cell_color)
+                gd.draw_cell(cell_col, cell_row, cell_color)
 
-    def draw_board(self, gd: GameDisplay) -> None:
+    def draw_board(self, gd: GameDisplay, redraw: bool = False) -> None:
         """
-        Draws the board
+        Draws the board. Only the cells which changed since the last drawing
+        are sent to the display (and the ones the shown region moved onto),
+        unless it is the first drawing on the display
         :param gd: a GameDisplay
+        :param redraw: whether to clear the display and draw all the cells
         :return: None
         """
+        # the camera follows the snake's head (if the display has a viewport)
+        if not self.is_debug:
+            gd.follow(*self.snake.get_snake_cells()[-1].get_location())
+        visible_area = gd.get_visible_area()
+        if visible_area is None:
+            visible_area = (0, 0, self.width, self.height)
+
+        is_full_drawing = redraw or gd is not self.__drawn_display
+        if is_full_drawing:
+            self.__draw_all_cells(gd, visible_area)
+        else:
+            if visible_area != self.__drawn_area:
+                assert self.__drawn_area is not None
+                self.__move_drawn_area(gd, visible_area)
+            self.draw_list_of_locations(self.__dirty_cells, gd, visible_area)
+        if gd.has_minimap():
+            self.__draw_minimap(gd, is_full_drawing)
+        self.__dirty_cells = set()
+        self.__drawn_display = gd
+        self.__drawn_area = visible_area
+
+    def __draw_minimap(self, gd: GameDisplay, is_full_drawing: bool) -> None:
+        """
+        Sends the minimap the cells which changed since the last drawing
+        (all the cells, after clearing it, on a full drawing)
+        """
+        if is_full_drawing:
+            gd.clear_minimap()
+            # in drawing order, so a cell's last color is the drawn one
+            cells = ((*cell.get_location(), cell.get_color())
+                     for cell in self.get_all_cells())
+        else:
+            cells = ((*location, self.get_color_at(location))
+                     for location in self.__dirty_cells)
+        gd.draw_minimap(cell for cell in cells
+                        if self.is_coord_in_board_boundaries(cell[:2]))
+
+    def __draw_all_cells(self, gd: GameDisplay,
+                         visible_area: Tuple[int, int, int, int]) -> None:
+        """
+        Clears the display, and draws all the cells in the shown region
+        """
+        gd.clear_all()
+
         # draws apples before walls, so if a wall ran into an apple,
         # the wall will be drawn on top of it
 
         # apples
-        self.draw_list_of_board_cells(self.__apples, gd)
+        self.draw_list_of_board_cells(
+            self.get_apples_in_area(visible_area), gd, visible_area)
 
         # snake
         if not self.is_debug:
-            self.draw_list_of_board_cells(self.snake.get_snake_cells(), gd)
+            self.draw_list_of_board_cells(self.snake.get_snake_cells(), gd,
+                                          visible_area)
 
         # walls
+        for wall in self.get_walls_in_area(visible_area):
+            self.draw_list_of_board_cells(wall.get_wall_cells(), gd,
+                                          visible_area)
+
+    def __move_drawn_area(self, gd: GameDisplay,
+                          visible_area: Tuple[int, int, int, int]) -> None:
+        """
+        Clears the cells which left the shown region, and draws the ones
+        which entered it (all the cells, if that is cheaper)
+        """
+        assert self.__drawn_area is not None
+        min_col, min_row, max_col, max_row = visible_area
+        cells_count = len(self.__apples) + len(self.__wall_cells_count) + \
+            self.snake.get_length()
+        entered_count = (max_col - min_col) * (max_row - min_row) - \
+            self.__get_overlap(visible_area, self.__drawn_area)
+        if entered_count > cells_count:
+            self.__draw_all_cells(gd, visible_area)
+            return
+
+        for col, row in self.__get_area_difference(self.__drawn_area,
+                                                   visible_area):
+            gd.clear_cell(col, row)
+        self.draw_list_of_locations(
+            self.__get_area_difference(visible_area, self.__drawn_area), gd,
+            visible_area)
+
+    @staticmethod
+    def __get_overlap(area: Tuple[int, int, int, int],
+                      other_area: Tuple[int, int, int, int]) -> int:
+        """
+        Returns the number of cells two regions share
+        """
+        cols = min(area[2], other_area[2]) - max(area[0], other_area[0])
+        rows = min(area[3], other_area[3]) - max(area[1], other_area[1])
+        return max(0, cols) * max(0, rows)
+
+    @staticmethod
+    def __get_area_difference(area: Tuple[int, int, int, int],
+                              other_area: Tuple[int, int, int, int]) -> \
+            Iterator[Tuple[int, int]]:
+        """
+        Yields the locations in a region which are not in another region
+        """
+        min_col, min_row, max_col, max_row = area
+        other_min_col, other_min_row, other_max_col, other_max_row = \
+            other_area
+        for col in range(min_col, max_col):
+            if other_min_col <= col < other_max_col:
+                rows: Any = chain(
+                    range(min_row, min(max_row, other_min_row)),
+                    range(max(min_row, other_max_row), max_row))
+            else:
+                rows = range(min_row, max_row)
+            for row in rows:
+                yield col, row
+
+    def draw_list_of_locations(
+            self, locations: Any, gd: GameDisplay,
+            visible_area: Tuple[int, int, int, int]) -> None:
+        """
+        Draws the current content of the given locations (clearing the empty
+        ones)
+        :param locations: an iterable of (column, row) locations
+        :param gd: a GameDisplay
+        :param visible_area: (min x, min y, max x, max y) of the shown region,
+                             locations outside of it are not drawn
+        :return: None
+        """
+        min_col, min_row, max_col, max_row = visible_area
+        for location in locations:
+            cell_col, cell_row = location
+            if min_col <= cell_col < max_col and min_row <= cell_row < max_row:
+                cell_color = self.get_color_at(location)
+                if cell_color is None:
+                    gd.clear_cell(cell_col, cell_row)
+                else:
+                    gd.draw_cell(cell_col, cell_row, cell_color)
+
+    def get_color_at(self, coordinate: Tuple[int, int]) -> Optional[str]:
+        """
+        Returns the color a coordinate is drawn in (walls are drawn on top of
+        the snake, which is drawn on top of apples)
+        :param coordinate: a coordinate of a board cell
+        :return: the color, or None if the coordinate is empty
+        """
+        if coordinate in self.__wall_cells_count:
+            return WALL_COLOR
+        if not self.is_debug and \
+                coordinate in self.snake.get_snake_cells_locations():
+            return self.snake.color
+        if coordinate in self.__apple_locations:
+            return APPLE_COLOR
+        return None
+
+    def get_all_cells(self) -> List[BoardCell]:
+        """
+        Returns all the BoardCell(s) on the board, in drawing order
+        """
+        cells = list(self.__apples)
+        if not self.is_debug:
+            cells.extend(self.snake.get_snake_cells())
         for wall in self.__walls:
-            self.draw_list_of_board_cells(wall.get_wall_cells(), gd)
+            cells.extend(wall.get_wall_cells())
+        return cells
 
     # endregion action methods
     # region comparion methods
@@ -148,6 +602,27 @@ class Board:
         """
         return self.__walls
 
+    def get_tile_count(self) -> int:
+        """
+        Returns the number of tiles allocated by the apples' and walls'
+        index (0 on boards which are not tiled)
+        """
+        return self.__apple_tiles.get_tile_count() + \
+            self.__wall_tiles.get_tile_count()
+
+    def get_walls_in_area(self, area: Tuple[int, int, int, int]) -> \
+            List[Wall]:
+        """
+        Returns the walls which may have cells in a region, visiting only
+        the tiles which overlap it (so it takes as long on a board of any
+        size); all the walls on boards which are not tiled
+        :param area: (min x, min y, max x, max y) of the region
+        :return: a list of walls (in no particular order)
+        """
+        if not self.__is_tiled:
+            return self.__walls
+        return list(self.__wall_tiles.get_objects_in_area(area))
+
     def is_wall_valid_to_place(self, wall: Wall) -> bool:
         """
         Checks whether all the wall's cells are currently empty on the
@@ -155,25 +630,9 @@ class Board:
         :param wall: a new wall candidate
         :return: True if all cells are empty, False otherwise
         """
-        for cell in wall.wall_cells:
-            # snake position comparions
-            if not self.is_debug:
-                if cell.get_location() in \
-                        self.snake.get_snake_cells_locations():
-                    return False
-
-            # existing walls comparions
-            for existing_wall in self.__walls:
-                if cell.get_location() in \
-                        existing_wall.get_wall_cells_locations():
-                    return False
-
-            # existing apples comparions
-            for existing_apple in self.__apples:
-                if cell.get_location() == existing_apple.get_location():
-                    return False
-
-        return True
+        # the snake is ignored in debug mode
+        return all(self.__is_location_free(cell.get_location(), self.is_debug)
+                   for cell in wall.wall_cells)
 
     def add_wall(self) -> bool:
         """
@@ -181,7 +640,7 @@ class Board:
         :return: True if the wall was added, False otherwise
         """
         new_wall_col, new_wall_row, new_wall_direction = \
-            game_utils.get_random_wall_data()
+            self.rng.wall_data(self.width, self.height)
 
         # verify conditions
         # - 1: in board's boundaries
@@ -194,10 +653,70 @@ class Board:
         if not self.is_wall_valid_to_place(new_wall):
             return False
 
-        # add wall
-        self.__walls.append(new_wall)
+        self.__place_wall(new_wall)
         return True
 
+    def fill_walls(self, target: int) -> int:
+        """
+        Adds walls until there are 'target' walls (or the candidates ran
+        out), drawing and checking many candidates at once
+        :param target: the number of walls to reach
+        :return: the number of walls added
+        """
+        added = 0
+        for _ in range(FILL_BATCHES):
+            missing = target - len(self.__walls)
+            if missing <= 0:
+                break
+            for col, row, direction in self.rng.wall_batch(
+                    self.width, self.height, missing):
+                if len(self.__walls) >= target:
+                    break
+                if not self.is_coord_in_board_boundaries((col, row)):
+                    continue
+                new_wall = Wall(col, row, direction)
+                if self.is_wall_valid_to_place(new_wall):
+                    self.__place_wall(new_wall)
+                    added += 1
+        return added
+
+    def __is_location_free(self, location: Tuple[int, int],
+                           ignore_snake: bool = False) -> bool:
+        """
+        Checks whether there is no wall, apple (or snake) cell in a location,
+        looking it up in the indices of the walls' cells, the apples and the
+        snake's cells
+        """
+        return location not in self.__wall_cells_count and \
+            location not in self.__apple_locations and \
+            (ignore_snake or
+             location not in self.snake.get_snake_cells_locations())
+
+    def __place_wall(self, new_wall: Wall) -> None:
+        """
+        Adds a wall which is valid to place to the board
+        """
+        self.__walls.append(new_wall)
+        for cell in new_wall.wall_cells:
+            self.__add_wall_cell(cell.get_location())
+            if self.__is_tiled:
+                self.__wall_tiles.add(cell.get_location(), new_wall)
+            self.__hash ^= zobrist.wall_cell_key(cell.get_location(),
+                                                 new_wall.direction)
+        self.__schedule_wall_expiry(new_wall)
+        if self.events.has_subscribers(events.WallSpawned):
+            self.events.emit(events.WallSpawned(
+                self.__rounds, new_wall.get_wall_cells_locations_list(),
+                new_wall.direction))
+
+    def is_wall_at(self, coordinate: Tuple[int, int]) -> bool:
+        """
+        Checks whether a wall cell is in a given coordinate
+        :param coordinate: a coordinate of a board cell
+        :return: True if a wall covers the coordinate, False otherwise
+        """
+        return coordinate in self.__wall_cells_count
+
     def should_remove_wall(self, wall: Wall) -> bool:
         """
         Checks if the given wall is outside the board's boundaries,
@@ -216,13 +735,105 @@ class Board:
         return not wall_body_in_board_boundaries and \
             not wall_tail_in_board_boundaries
 
+    def get_wall_expiry_round(self, wall: Wall) -> Optional[int]:
+        """
+        Returns the round in which a wall will be removed: the round of the
+        move after which its tail and body cells are both outside the board
+        (walls move straight, one cell in every even round)
+        :param wall: a wall on the board, in its current location
+        :return: the round, or None if the wall never leaves the board
+        """
+        tail_location = wall.wall_cells[0].get_location()
+        body_location = wall.wall_cells[len(wall.wall_cells) // 2] \
+            .get_location()
+        if not self.is_coord_in_board_boundaries(tail_location) and \
+                not self.is_coord_in_board_boundaries(body_location):
+            return self.__rounds + 1
+
+        # the cells are in a line along the direction, so they leave the
+        # board through its far edge
+        delta_col, delta_row = MOVE_DELTA_MAPPING.get(wall.direction,
+                                                      (0, 0))
+        moves = 0
+        for col, row in (tail_location, body_location):
+            if delta_col:
+                moves = max(moves, self.width - col if delta_col > 0
+                            else col + 1)
+            elif delta_row:
+                moves = max(moves, self.height - row if delta_row > 0
+                            else row + 1)
+            else:
+                return None
+        first_move_round = self.__rounds + 1 + (self.__rounds + 1) % 2
+        return first_move_round + 2 * (moves - 1)
+
+    def __schedule_wall_expiry(self, wall: Wall) -> None:
+        """
+        Schedules the removal of a wall
+        """
+        expiry_round = self.get_wall_expiry_round(wall)
+        if expiry_round is not None:
+            heapq.heappush(self.__wall_expiries,
+                           (expiry_round, self.__wall_sequence, wall))
+            self.__wall_sequence += 1
+
     def remove_walls(self) -> None:
         """
-        Deletes all walls which should be removed
+        Deletes all walls which should be removed. Only the walls whose
+        scheduled removal is due are looked at
+        """
+        expired_walls = set()
+        while self.__wall_expiries and \
+                self.__wall_expiries[0][0] <= self.__rounds:
+            wall = heapq.heappop(self.__wall_expiries)[2]
+            if self.should_remove_wall(wall):
+                expired_walls.add(id(wall))
+            else:
+                # moved other than by the game loop
+                self.__schedule_wall_expiry(wall)
+        if not expired_walls:
+            return
+
+        # removed last to first, in the order all the walls used to be
+        # scanned in
+        for wall in reversed(self.__walls):
+            if id(wall) in expired_walls:
+                for cell in wall.wall_cells:
+                    self.__remove_wall_cell(cell.get_location())
+                    if self.__is_tiled:
+                        self.__wall_tiles.discard(cell.get_location(), wall)
+                    self.__hash ^= zobrist.wall_cell_key(cell.get_location(),
+                                                         wall.direction)
+                if self.events.has_subscribers(events.WallExpired):
+                    self.events.emit(events.WallExpired(
+                        self.__rounds, wall.get_wall_cells_locations_list(),
+                        wall.direction))
+        self.__walls = [wall for wall in self.__walls
+                        if id(wall) not in expired_walls]
+
+    def find_snake_wall_collision(self) -> \
+            Tuple[bool, Optional[Tuple[int, int]]]:
+        """
+        Checks whether a wall collided with the snake. Only the locations
+        where a snake cell and a wall cell met since the last check are
+        looked at, the walls are scanned (in order, for the same result as
+        scanning them all) only if one of these is still a collision
+        :return: Tuple[True, (column, row)] if a wall collided with the snake,
+                 Tuple[False, None] otherwise.
         """
-        for index in range(len(self.__walls) - 1, -1, -1):
-            if self.should_remove_wall(self.__walls[index]):
-                self.__walls.pop(index)
+        snake_cells_locations = self.snake.get_snake_cells_locations()
+        self.__snake_wall_contacts = {
+            location for location in self.__snake_wall_contacts
+            if location in self.__wall_cells_count and
+            location in snake_cells_locations}
+        if not self.__snake_wall_contacts:
+            return False, None
+
+        for wall in self.__walls:
+            collision, location = self.snake.is_collided(wall.wall_cells)
+            if collision:
+                return collision, location
+        return False, None
 
     # endregion walls
     # region apples
@@ -232,6 +843,19 @@ class Board:
         """
         return self.__apples
 
+    def get_apples_in_area(self, area: Tuple[int, int, int, int]) -> \
+            List[BoardCell]:
+        """
+        Returns the apples which may be in a region, visiting only the tiles
+        which overlap it (so it takes as long on a board of any size); all
+        the apples on boards which are not tiled
+        :param area: (min x, min y, max x, max y) of the region
+        :return: a list of apples (in no particular order)
+        """
+        if not self.__is_tiled:
+            return self.__apples
+        return list(self.__apple_tiles.get_objects_in_area(area))
+
     def is_apple_valid_to_place(self, apple: BoardCell) -> bool:
         """
         Checks whether a given coordinate is currently empty on the board,
@@ -239,29 +863,15 @@ class Board:
         :param apple: the new apple candidate
         :return: True if the cell are empty, False otherwise
         """
-        # snake position comparions
-        coordinate = apple.get_location()
-        if coordinate in self.snake.get_snake_cells_locations():
-            return False
-
-        # existing walls comparions
-        for existing_wall in self.__walls:
-            if coordinate in existing_wall.get_wall_cells_locations():
-                return False
-
-        # existing apples comparions
-        for existing_apple in self.__apples:
-            if coordinate == existing_apple.get_location():
-                return False
-
-        return True
+        return self.__is_location_free(apple.get_location())
 
     def add_apple(self) -> bool:
         """
         Adds an apple to the game
         :return: True if apple was added, False otherwise
         """
-        new_apple_col, new_apple_row = game_utils.get_random_apple_data()
+        new_apple_col, new_apple_row = \
+            self.rng.apple_data(self.width, self.height)
 
         # verify conditions
         # - 1: in board's boundaries
@@ -270,14 +880,49 @@ class Board:
         if not apple_in_boundaries:
             return False
         # - 2: is valid to place
-        new_apple = BoardCell(new_apple_col, new_apple_row, color="green")
+        new_apple = BoardCell(new_apple_col, new_apple_row,
+                              color=APPLE_COLOR)
         if not self.is_apple_valid_to_place(new_apple):
             return False
 
-        # add apple
-        self.__apples.append(new_apple)
+        self.__place_apple(new_apple)
         return True
 
+    def fill_apples(self, target: int) -> int:
+        """
+        Adds apples until there are 'target' apples (or the candidates ran
+        out), drawing and checking many candidates at once
+        :param target: the number of apples to reach
+        :return: the number of apples added
+        """
+        added = 0
+        for _ in range(FILL_BATCHES):
+            missing = target - len(self.__apples)
+            if missing <= 0:
+                break
+            for location in self.rng.apple_batch(self.width, self.height,
+                                                 missing):
+                if len(self.__apples) >= target:
+                    break
+                if not self.is_coord_in_board_boundaries(location):
+                    continue
+                new_apple = BoardCell(*location, color=APPLE_COLOR)
+                if self.is_apple_valid_to_place(new_apple):
+                    self.__place_apple(new_apple)
+                    added += 1
+        return added
+
+    def __place_apple(self, new_apple: BoardCell) -> None:
+        """
+        Adds an apple which is valid to place to the board
+        """
+        self.__apples.append(new_apple)
+        self.__apple_locations[new_apple.get_location()] = new_apple
+        if self.__is_tiled:
+            self.__apple_tiles.add(new_apple.get_location(), new_apple)
+        self.__hash ^= zobrist.apple_key(new_apple.get_location())
+        self.__mark_changed(new_apple.get_location())
+
     def remove_apple(self, apple: BoardCell) -> bool:
         """
         Removes the apple in a given coordinate from the board
@@ -288,9 +933,65 @@ class Board:
         for board_apple in self.__apples:
             if apple == board_apple:
                 self.__apples.remove(apple)
+                if self.__is_tiled:
+                    self.__apple_tiles.discard(apple.get_location(), apple)
+                if self.__apple_locations.get(apple.get_location()) is apple:
+                    del self.__apple_locations[apple.get_location()]
+                self.__hash ^= zobrist.apple_key(apple.get_location())
+                self.__mark_changed(apple.get_location())
                 return True
         return False
 
+    def get_apple_at(self, coordinate: Tuple[int, int]) -> \
+            Optional[BoardCell]:
+        """
+        Returns the apple in a given coordinate
+        :param coordinate: a coordinate of a board cell
+        :return: the apple, or None if there is no apple in the coordinate
+        """
+        return self.__apple_locations.get(coordinate)
+
+    def eat_apple(self, apple: BoardCell) -> None:
+        """
+        The snake eats an apple: removes it, grows the snake, and adds the
+        square root of the snake's length to the score
+        :param apple: the apple the snake's head is on
+        :return: None
+        """
+        self.remove_apple(apple)
+        cells_to_be_added = self.snake.cells_to_be_added
+        self.snake.grow()
+        self.__hash ^= zobrist.growth_key(cells_to_be_added) ^ \
+            zobrist.growth_key(self.snake.cells_to_be_added)
+        score_calculation = math.floor(self.snake.get_length() ** 0.5)
+        self.increase_score(score_calculation)
+        if self.events.has_subscribers(events.AppleEaten):
+            self.events.emit(events.AppleEaten(
+                self.__rounds, apple.get_location(), score_calculation))
+
+    def remove_crushed_apples(self) -> None:
+        """
+        Removes the apples which are covered by a wall. Only apples that a
+        wall's leading cell moved onto are looked at; the apples list is
+        scanned (as it was, removing while iterating, which leaves an apple
+        right after a removed one for the next round) only if there are any
+        """
+        crushed_locations = {
+            location for location in self.__crushed_apples
+            if location in self.__wall_cells_count and
+            location in self.__apple_locations}
+        if crushed_locations:
+            for apple in self.__apples:
+                if apple.get_location() in crushed_locations:
+                    self.remove_apple(apple)
+                    if self.events.has_subscribers(events.AppleCrushed):
+                        self.events.emit(events.AppleCrushed(
+                            self.__rounds, apple.get_location()))
+        # skipped apples are removed next round
+        self.__crushed_apples = {
+            location for location in crushed_locations
+            if location in self.__apple_locations}
+
     # endregion apples
     # region snake
     def get_snake_cells_length(self) -> int:
@@ -305,17 +1006,27 @@ class Board:
         :param cutting_coordinate: the coordinate of the tail to cut
         :return: None
         """
+        cells_before_cut = self.snake.get_snake_cells()
+        length_before_cut = len(cells_before_cut)
         self.snake.cut_tail(cutting_coordinate)
+        self.__rebuild_snake_indices()
+        for cell in cells_before_cut[:length_before_cut -
+                                     self.snake.get_length()]:
+            self.__mark_changed(cell.get_location())
+        # hash: only the cut cells are removed (the rest keep their keys)
+        self.__hash ^= zobrist.snake_tail_hash(
+            cells_before_cut, length_before_cut - self.snake.get_length())
+        if self.events.has_subscribers(events.TailCut):
+            self.events.emit(events.TailCut(
+                self.__rounds, cutting_coordinate,
+                length_before_cut - self.snake.get_length()))
 
     def is_snake_out_boundaries(self) -> bool:
         """
         Checks whther the snake collided with the board
         :return: True if the snake is out of boundaries, False otherwise
         """
-        for cell in self.snake.get_snake_cells():
-            if not self.is_coord_in_board_boundaries(cell.get_location()):
-                return True
-        return False
+        return self.__snake_cells_out_of_bounds > 0
 
     def is_snake_tangled(self) -> bool:
         """
@@ -0,0 +1,215 @@
+"""
+FILE: bots.py
+DESCRIPTION: input strategies ('bots') for a 'snake' game. A bot is called
+with the board once per round and returns the key to click, so it can be
+used as the input source of 'Board.read_key'.
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple, Type
+
+import game_utils
+from board import Board
+from board_cell import MOVE_DELTA_MAPPING
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+OPPOSITE_DIRECTION = {
+    game_utils.UP: game_utils.DOWN,
+    game_utils.DOWN: game_utils.UP,
+    game_utils.LEFT: game_utils.RIGHT,
+    game_utils.RIGHT: game_utils.LEFT
+}
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def get_head(board: Board) -> Tuple[int, int]:
+    """
+    Returns the location of the snake's head
+    """
+    return board.snake.get_snake_cells()[-1].get_location()
+
+
+def next_coord(coordinate: Tuple[int, int], direction: str) -> \
+        Tuple[int, int]:
+    """
+    Returns the coordinate one step from the given one in a direction
+    """
+    delta_col, delta_row = MOVE_DELTA_MAPPING[direction]
+    return coordinate[0] + delta_col, coordinate[1] + delta_row
+
+
+def get_blocked_cells(board: Board) -> Set[Tuple[int, int]]:
+    """
+    Returns the cells the snake's head should not move into: the snake's
+    body and every wall cell (and the cell each wall moves into next)
+    """
+    blocked = set(board.snake.get_snake_cells_locations())
+    for wall in board.get_walls():
+        for cell in wall.get_wall_cells():
+            blocked.add(cell.get_location())
+        blocked.add(wall.get_wall_cells()[-1].next_coord_in_direction(
+            wall.direction))
+    return blocked
+
+
+def get_possible_directions(board: Board) -> List[str]:
+    """
+    Returns the directions the snake may turn to (all but backwards)
+    """
+    backwards = OPPOSITE_DIRECTION[board.snake.direction]
+    return [direction for direction in game_utils.DIRECTIONS
+            if direction != backwards]
+
+
+def get_safe_directions(board: Board, blocked: Set[Tuple[int, int]]) -> \
+        List[str]:
+    """
+    Returns the possible directions which do not lead to an immediate loss
+    """
+    head = get_head(board)
+    return [direction for direction in get_possible_directions(board)
+            if board.is_coord_in_board_boundaries(next_coord(head, direction))
+            and next_coord(head, direction) not in blocked]
+
+
+###############################################################################
+#                           Class & Inner Functions                           #
+###############################################################################
+class Bot:
+    """
+    The base class of all bots. 'VERSION' must change whenever the bot's
+    decisions change, since tournament results are cached by it
+    """
+    NAME = 'none'
+    VERSION = '1'
+
+    def __call__(self, board: Board) -> Optional[str]:
+        """
+        Returns the key to click in the current round
+        :param board: the game's Board
+        :return: None, or one of 'Left', 'Right', 'Up', 'Down'
+        """
+        return None
+
+
+class ScriptedBot(Bot):
+    """
+    Clicks a fixed, repeating script of keys (a square loop by default)
+    """
+    NAME = 'scripted'
+    VERSION = '1'
+
+    def __init__(self, script: Optional[List[Optional[str]]] = None) -> None:
+        if script is None:
+            script = [game_utils.RIGHT] + [None] * 4 + \
+                     [game_utils.DOWN] + [None] * 4 + \
+                     [game_utils.LEFT] + [None] * 4 + \
+                     [game_utils.UP] + [None] * 4
+        self.script = script
+
+    def __call__(self, board: Board) -> Optional[str]:
+        # by the round (the first is round 1), so a game restored from a
+        # checkpoint continues the script where it was
+        return self.script[(board.get_rounds() - 1) % len(self.script)]
+
+
+class GreedyBot(Bot):
+    """
+    Turns towards the nearest apple (Manhattan distance), among the
+    directions which do not lead to an immediate loss
+    """
+    NAME = 'greedy'
+    VERSION = '1'
+
+    def __call__(self, board: Board) -> Optional[str]:
+        safe_directions = get_safe_directions(board, get_blocked_cells(board))
+        if not safe_directions:
+            return None
+        apples = [apple.get_location() for apple in board.get_apples()]
+        if not apples:
+            return safe_directions[0]
+
+        head = get_head(board)
+
+        def distance(direction: str) -> int:
+            col, row = next_coord(head, direction)
+            return min(abs(col - apple_col) + abs(row - apple_row)
+                       for apple_col, apple_row in apples)
+
+        return min(safe_directions, key=distance)
+
+
+class SearchBot(Bot):
+    """
+    Follows the shortest free path to the nearest apple (breadth-first
+    search). If no apple is reachable, turns to the safe direction with the
+    most reachable free cells
+    """
+    NAME = 'search'
+    VERSION = '1'
+
+    def __call__(self, board: Board) -> Optional[str]:
+        blocked = get_blocked_cells(board)
+        safe_directions = get_safe_directions(board, blocked)
+        if not safe_directions:
+            return None
+
+        apples = {apple.get_location() for apple in board.get_apples()}
+        head = get_head(board)
+        first_steps = {next_coord(head, direction): direction
+                       for direction in safe_directions}
+
+        # breadth-first search, remembering the first step of each path
+        queue = deque((coord, direction)
+                      for coord, direction in first_steps.items())
+        visited = set(first_steps)
+        while queue:
+            coord, first_direction = queue.popleft()
+            if coord in apples:
+                return first_direction
+            for direction in game_utils.DIRECTIONS:
+                neighbour = next_coord(coord, direction)
+                if neighbour in visited or neighbour in blocked or \
+                        not board.is_coord_in_board_boundaries(neighbour):
+                    continue
+                visited.add(neighbour)
+                queue.append((neighbour, first_direction))
+
+        return max(safe_directions, key=lambda direction: self.__free_area(
+            board, next_coord(head, direction), blocked))
+
+    @staticmethod
+    def __free_area(board: Board, start: Tuple[int, int],
+                    blocked: Set[Tuple[int, int]]) -> int:
+        """
+        Counts the free cells reachable from the given cell
+        """
+        stack = [start]
+        visited = {start}
+        while stack:
+            coord = stack.pop()
+            for direction in game_utils.DIRECTIONS:
+                neighbour = next_coord(coord, direction)
+                if neighbour in visited or neighbour in blocked or \
+                        not board.is_coord_in_board_boundaries(neighbour):
+                    continue
+                visited.add(neighbour)
+                stack.append(neighbour)
+        return len(visited)
+
+
+BOTS: Dict[str, Type[Bot]] = {
+    bot.NAME: bot for bot in [ScriptedBot, GreedyBot, SearchBot]
+}
+
+
+if __name__ == "__main__":
+    print("This script is part of the 'Snake' board game.\nYou should run:\n"
+          "> python game_display.py [optional arguments|--help]")
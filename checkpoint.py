@@ -0,0 +1,288 @@
+"""
+FILE: checkpoint.py
+DESCRIPTION: asynchronous checkpoints of long 'snake' games. The game loop
+only captures the board's full state (snake, walls, apples, score and RNG
+state) every few rounds; a background thread serializes it, writes it to a
+temporary file, fsyncs it and moves it over the checkpoint, so a crash
+never leaves a partial checkpoint. A game resumed from a checkpoint
+continues exactly as the original game would have.
+run (a headless bot game, resumed from its checkpoint if there is one):
+> python checkpoint.py PATH [optional arguments|--help]
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import os
+import sys
+import json
+import time
+import zlib
+import queue
+import argparse
+import threading
+from argparse import Namespace
+from typing import Any, Dict, List, Optional, Tuple
+
+import game_utils
+import snake_main
+from board import Board
+from bots import BOTS
+from headless_display import HeadlessDisplay, make_game_args
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+CHECKPOINT_MAGIC = b'PYSNAKE-CHECKPOINT\x01'
+CHECKPOINT_INTERVAL = 1000
+TEMPORARY_SUFFIX = '.tmp'
+ROUNDS = 100000
+
+
+###############################################################################
+#                           Class & Inner Functions                           #
+###############################################################################
+class Checkpointer:
+    """
+    A game loop observer which checkpoints the game every 'interval'
+    rounds, and when it is over. A checkpoint is written by a background
+    thread; if the previous one is still being written when the next is
+    captured, the older of the two pending checkpoints is dropped. Must be
+    closed to write the last checkpoint
+    """
+
+    def __init__(self, path: str, args: Namespace,
+                 interval: int = CHECKPOINT_INTERVAL,
+                 metadata: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Creates a new checkpointer and starts its writer thread
+        :param path: the checkpoint file (replaced by every checkpoint)
+        :param args: the arguments of the 'snake game'
+        :param interval: the number of rounds between checkpoints
+        :param metadata: plain data stored with every checkpoint (e.g. the
+                         bot playing the game)
+        """
+        self.path = path
+        self.args = args
+        self.interval = max(1, interval)
+        self.metadata = metadata if metadata is not None else {}
+        # the cost of the checkpoints, in seconds
+        self.checkpoints = 0
+        self.dropped = 0
+        self.capture_time = 0.0
+        self.max_capture_time = 0.0
+        self.write_time = 0.0
+        self.max_write_time = 0.0
+        self.__closed = False
+        self.__error: Optional[BaseException] = None
+        # a single pending checkpoint, replaced by a newer one
+        self.__pending: 'queue.Queue[Optional[Dict[str, Any]]]' = \
+            queue.Queue(1)
+        self.__writer = threading.Thread(target=self.__write_checkpoints)
+        self.__writer.daemon = True
+        self.__writer.start()
+
+    def __call__(self, board: Board) -> None:
+        """
+        Captures a checkpoint if the round which has just ended is due
+        :param board: the game's Board
+        :return: None
+        """
+        if self.__closed or (board.get_rounds() % self.interval != 0 and
+                             not board.is_over):
+            return
+        if self.__error is not None:
+            raise self.__error
+        start_time = time.perf_counter()
+        checkpoint = {
+            'rounds': board.get_rounds(),
+            'args': vars(self.args).copy(),
+            'board': {'width': board.width, 'height': board.height,
+                      'rng_block_size': board.rng.block_size,
+                      'rng_use_numpy': board.rng.use_numpy},
+            'metadata': self.metadata,
+            'state': board.get_state()
+        }
+        elapsed = time.perf_counter() - start_time
+        self.capture_time += elapsed
+        self.max_capture_time = max(self.max_capture_time, elapsed)
+        self.checkpoints += 1
+
+        try:
+            self.__pending.put_nowait(checkpoint)
+        except queue.Full:
+            try:
+                self.__pending.get_nowait()
+                self.dropped += 1
+            except queue.Empty:  # just taken by the writer
+                pass
+            self.__pending.put_nowait(checkpoint)
+
+    def __write_checkpoints(self) -> None:
+        """
+        The writer thread: writes the pending checkpoints until None
+        """
+        while True:
+            checkpoint = self.__pending.get()
+            if checkpoint is None:
+                return
+            start_time = time.perf_counter()
+            try:
+                write_checkpoint(self.path, checkpoint)
+            except BaseException as error:  # raised in the game loop
+                self.__error = error
+                return
+            elapsed = time.perf_counter() - start_time
+            self.write_time += elapsed
+            self.max_write_time = max(self.max_write_time, elapsed)
+
+    def close(self) -> None:
+        """
+        Writes the pending checkpoint and stops the writer thread
+        """
+        if self.__closed:
+            return
+        self.__closed = True
+        if self.__writer.is_alive():
+            self.__pending.put(None)
+            self.__writer.join()
+        if self.__error is not None:
+            raise self.__error
+
+    def get_report(self) -> str:
+        """
+        Returns the cost of the checkpoints so far
+        """
+        written = max(1, self.checkpoints - self.dropped)
+        return (f'{self.checkpoints} checkpoints ({self.dropped} dropped): '
+                f'capture {self.capture_time / max(1, self.checkpoints) * 1e6:.0f}us '
+                f'on average (max {self.max_capture_time * 1e6:.0f}us) in '
+                f'the game loop, write {self.write_time / written * 1e3:.1f}ms'
+                f' on average (max {self.max_write_time * 1e3:.1f}ms) in the '
+                f'background')
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def write_checkpoint(path: str, checkpoint: Dict[str, Any]) -> None:
+    """
+    Writes a checkpoint durably: into a temporary file which is fsynced and
+    then renamed over the checkpoint file
+    :param path: the checkpoint file
+    :param checkpoint: the checkpoint's plain data
+    :return: None
+    """
+    temporary_path = path + TEMPORARY_SUFFIX
+    with open(temporary_path, 'wb') as checkpoint_file:
+        checkpoint_file.write(CHECKPOINT_MAGIC)
+        checkpoint_file.write(zlib.compress(json.dumps(checkpoint).encode()))
+        checkpoint_file.flush()
+        os.fsync(checkpoint_file.fileno())
+    os.replace(temporary_path, path)
+    # the rename itself is durable once the directory is synced
+    if hasattr(os, 'O_DIRECTORY'):
+        directory = os.open(os.path.dirname(os.path.abspath(path)),
+                            os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+
+def read_checkpoint(path: str) -> Dict[str, Any]:
+    """
+    Reads a checkpoint's plain data
+    """
+    with open(path, 'rb') as checkpoint_file:
+        if checkpoint_file.read(len(CHECKPOINT_MAGIC)) != CHECKPOINT_MAGIC:
+            raise ValueError(f"not a checkpoint file: {path}")
+        return json.loads(zlib.decompress(checkpoint_file.read()))
+
+
+def load_checkpoint(path: str) -> Tuple[Board, Namespace, Dict[str, Any]]:
+    """
+    Restores the game of a checkpoint
+    :param path: the checkpoint file
+    :return: (the Board in the checkpoint's round, the arguments of the
+             'snake game', the checkpoint's metadata)
+    """
+    checkpoint = read_checkpoint(path)
+    args = Namespace(**checkpoint['args'])
+    board_config = checkpoint['board']
+    board = Board(is_debug=args.debug,
+                  rng=game_utils.RandomContext(
+                      block_size=board_config['rng_block_size'],
+                      use_numpy=board_config['rng_use_numpy']),
+                  width=board_config['width'],
+                  height=board_config['height'])
+    board.set_state(checkpoint['state'])
+    return board, args, checkpoint['metadata']
+
+
+def run_checkpointed_game(path: str, bot_name: str, seed: str,
+                          args: Namespace,
+                          interval: int = CHECKPOINT_INTERVAL) -> \
+        Tuple[Board, Checkpointer]:
+    """
+    Plays a headless bot game with checkpoints, resuming it from the
+    checkpoint file if there is one
+    :param path: the checkpoint file
+    :param bot_name: one of 'bots.BOTS' (ignored when resuming)
+    :param seed: the seed of the game (ignored when resuming)
+    :param args: the arguments of the 'snake game' (ignored when resuming)
+    :return: the Board at the end of the game, and the checkpointer
+    """
+    is_resumed = os.path.exists(path)
+    if is_resumed:
+        board, args, metadata = load_checkpoint(path)
+    else:
+        metadata = {'bot': bot_name, 'seed': seed}
+        board = Board(is_debug=args.debug,
+                      rng=game_utils.RandomContext(seed),
+                      width=args.width, height=args.height)
+    bot = BOTS[metadata['bot']]()
+    checkpointer = Checkpointer(path, args, interval, metadata)
+    try:
+        if not board.is_over:
+            snake_main.main_loop(HeadlessDisplay(lambda: bot(board)), args,
+                                 board=board, observers=[checkpointer],
+                                 is_resumed=is_resumed)
+    finally:
+        checkpointer.close()
+    return board, checkpointer
+
+
+def parse_args(argv: List[str]) -> Namespace:
+    parser = argparse.ArgumentParser(
+        prog='checkpoint.py',
+        description='Plays a headless bot game with periodic checkpoints, '
+                    'or resumes it from its checkpoint.',
+    )
+    parser.add_argument('path', help='The checkpoint file (the game is '
+                                     'resumed from it if it exists)')
+    parser.add_argument('-i', '--interval', type=int,
+                        default=CHECKPOINT_INTERVAL,
+                        help='Rounds between checkpoints')
+    parser.add_argument('-b', '--bot', choices=sorted(BOTS),
+                        default='search', help='The bot playing the game')
+    parser.add_argument('-s', '--seed', default='0')
+    parser.add_argument('-x', '--width', type=int, default=50)
+    parser.add_argument('-y', '--height', type=int, default=50)
+    parser.add_argument('-a', '--apples', type=int, default=10)
+    parser.add_argument('-w', '--walls', type=int, default=5)
+    parser.add_argument('-r', '--rounds', type=int, default=ROUNDS)
+    parser.add_argument('-F', '--fill', action='store_true')
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    run_args = parse_args(sys.argv[1:])
+    final_board, game_checkpointer = run_checkpointed_game(
+        run_args.path, run_args.bot, run_args.seed,
+        make_game_args(run_args.width, run_args.height, run_args.apples,
+                       run_args.walls, run_args.rounds, fill=run_args.fill),
+        run_args.interval)
+    print(f'round {final_board.get_rounds()} score {final_board.get_score()}'
+          f' hash {final_board.get_zobrist_hash():016x}')
+    print(game_checkpointer.get_report())
@@ -0,0 +1,159 @@
+"""
+FILE: chunked_grid.py
+DESCRIPTION: a 'ChunkedGrid' class, a sparse spatial index of the objects on
+a board of any size. The board is split into fixed-size square tiles, and a
+tile is allocated when an object is added in it and freed when its last
+object leaves it, so the index's memory grows with the occupied area rather
+than with the board's size. The objects in a region are found by visiting
+only the tiles which overlap it. Coordinates are not bounded (negative ones
+included).
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+from typing import Any, Dict, Set, Tuple
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+# tiles of 16 x 16 cells
+TILE_SHIFT = 4
+
+
+###############################################################################
+#                           Class & Inner Functions                           #
+###############################################################################
+class ChunkedGrid:
+    """
+    A sparse grid of tiles, each holding the objects which have a cell in it
+    (an object covering cells in several tiles is held by each of them).
+    Adding, discarding and finding a tile take O(1)
+    """
+
+    def __init__(self, tile_shift: int = TILE_SHIFT) -> None:
+        """
+        Creates a new empty grid
+        :param tile_shift: a tile's side is 2 ** tile_shift cells
+        """
+        self.tile_shift: int = tile_shift
+        # (tile column, tile row) -> the objects in the tile
+        self.__tiles: Dict[Tuple[int, int], Set[Any]] = {}
+
+    # region get & set methods
+    def get_tile_key(self, location: Tuple[int, int]) -> Tuple[int, int]:
+        """
+        Returns the (tile column, tile row) of the tile a location is in
+        """
+        return location[0] >> self.tile_shift, location[1] >> self.tile_shift
+
+    def get_tile(self, location: Tuple[int, int]) -> Set[Any]:
+        """
+        Returns the objects in the tile a location is in (an empty set if
+        the tile is not allocated)
+        """
+        return self.__tiles.get(self.get_tile_key(location), set())
+
+    def get_tile_crossing(self, delta: Tuple[int, int]) -> \
+            Tuple[int, int, int, int]:
+        """
+        Returns how to tell that a cell moving a step at a time along an
+        axis crosses into another tile, without comparing tile keys: it
+        entered a tile if its coordinate on the axis, masked, equals the
+        entered bits, and it is about to leave one if it equals the leaving
+        bits
+        :param delta: the (column, row) step, along a single axis
+        :return: (the axis (0 or 1), the mask, the entered bits, the leaving
+                 bits)
+        """
+        axis = 0 if delta[0] else 1
+        mask = (1 << self.tile_shift) - 1
+        if delta[axis] > 0:
+            return axis, mask, 0, mask
+        return axis, mask, mask, 0
+
+    def get_tile_count(self) -> int:
+        """
+        Returns the number of allocated tiles
+        """
+        return len(self.__tiles)
+
+    def get_objects_in_area(self, area: Tuple[int, int, int, int]) -> \
+            Set[Any]:
+        """
+        Returns the objects in the tiles which overlap a region (which may
+        have no cell in the region itself)
+        :param area: (min x, min y, max x, max y) of the region (the maximal
+                     ones excluded)
+        :return: a set of the objects
+        """
+        min_col, min_row, max_col, max_row = area
+        objects: Set[Any] = set()
+        if min_col >= max_col or min_row >= max_row:
+            return objects
+        min_tile_col, min_tile_row = self.get_tile_key((min_col, min_row))
+        max_tile_col, max_tile_row = self.get_tile_key((max_col - 1,
+                                                        max_row - 1))
+        # visit the tiles overlapping the region, or the allocated tiles if
+        # there are fewer of them
+        tiles_in_area = (max_tile_col - min_tile_col + 1) * \
+            (max_tile_row - min_tile_row + 1)
+        if tiles_in_area <= len(self.__tiles):
+            for tile_col in range(min_tile_col, max_tile_col + 1):
+                for tile_row in range(min_tile_row, max_tile_row + 1):
+                    tile = self.__tiles.get((tile_col, tile_row))
+                    if tile is not None:
+                        objects.update(tile)
+        else:
+            for (tile_col, tile_row), tile in self.__tiles.items():
+                if min_tile_col <= tile_col <= max_tile_col and \
+                        min_tile_row <= tile_row <= max_tile_row:
+                    objects.update(tile)
+        return objects
+
+    # endregion get & set methods
+    # region action methods
+    def add(self, location: Tuple[int, int], obj: Any) -> None:
+        """
+        Adds an object to the tile a location is in (allocating the tile if
+        needed)
+        :param location: a (column, row) location of one of the object's
+                         cells
+        :param obj: the object
+        :return: None
+        """
+        key = self.get_tile_key(location)
+        tile = self.__tiles.get(key)
+        if tile is None:
+            self.__tiles[key] = {obj}
+        else:
+            tile.add(obj)
+
+    def discard(self, location: Tuple[int, int], obj: Any) -> None:
+        """
+        Removes an object from the tile a location is in (if it is there),
+        freeing the tile if it was its last object. The caller makes sure
+        the object has no other cell in that tile
+        :param location: a (column, row) location in the tile
+        :param obj: the object
+        :return: None
+        """
+        key = self.get_tile_key(location)
+        tile = self.__tiles.get(key)
+        if tile is not None:
+            tile.discard(obj)
+            if not tile:
+                del self.__tiles[key]
+
+    def clear(self) -> None:
+        """
+        Removes all the objects (freeing all the tiles)
+        """
+        self.__tiles = {}
+
+    # endregion action methods
+
+
+if __name__ == "__main__":
+    print("This script is part of the 'Snake' board game.\nYou should run:\n"
+          "> python game_display.py [optional arguments|--help]")
@@ -0,0 +1,447 @@
+"""
+FILE: equivalence.py
+DESCRIPTION: an equivalence harness between the reference 'snake' rules
+('snake_main.main_loop' on a 'Board') and candidate engines. Both play the
+same seeds, board configs and random key sequences across a process pool,
+their per-round state fingerprints are compared, and every divergence is
+shrunk into a minimal reproducer.
+run:
+> python equivalence.py [optional arguments|--help]
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import sys
+import json
+import random
+import argparse
+import importlib
+from argparse import Namespace
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+import bots
+import game_utils
+import snake_main
+from board import Board
+from board_cell import BoardCell
+from headless_display import HeadlessDisplay, make_game_args
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+SEEDS = 1000
+ROUNDS = 300
+SNAPSHOT_INTERVAL = 7
+
+# the probability of a key being clicked in a round
+KEY_PROBABILITY = 0.3
+# the probability of a case's keys being those of a wandering snake, which
+# avoids immediate losses (random keys rarely survive long games)
+WANDER_PROBABILITY = 0.5
+# the ranges the board configs are drawn from
+WIDTH_RANGE = (8, 40)
+HEIGHT_RANGE = (8, 40)
+APPLES_RANGE = (0, 12)
+WALLS_RANGE = (0, 8)
+
+# the state of a board at the end of a round. 'hash' is the board's Zobrist
+# hash (snake, direction, growth, walls and apples)
+RoundFingerprint = namedtuple('RoundFingerprint',
+                              ['round', 'hash', 'score', 'is_over'])
+# a game to play: the seed of its random stream, the arguments of the
+# 'snake game' and the key clicked in every round (round r is at r - 1,
+# no key after the last one)
+Case = namedtuple('Case', ['seed', 'args', 'keys'])
+Divergence = namedtuple('Divergence',
+                        ['case', 'round', 'reference', 'candidate'])
+
+# an engine plays a case, and returns the fingerprint of every round, from
+# round 0 until the game is over
+Engine = Callable[[Case], List[RoundFingerprint]]
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+# region engines
+class FullScanBoard(Board):
+    """
+    A board which checks the end-of-round rules as they used to be checked,
+    scanning every snake cell, wall and apple instead of looking up the
+    cells which changed
+    """
+
+    def find_snake_wall_collision(self) -> \
+            Tuple[bool, Optional[Tuple[int, int]]]:
+        """
+        Checks every wall against the snake
+        """
+        for wall in self.get_walls():
+            collision, location = self.snake.is_collided(wall.wall_cells)
+            if collision:
+                return collision, location
+        return False, None
+
+    def get_apple_at(self, coordinate: Tuple[int, int]) -> \
+            Optional[BoardCell]:
+        """
+        Compares every apple with the coordinate
+        """
+        for apple in self.get_apples():
+            if apple.get_location() == coordinate:
+                return apple
+        return None
+
+    def remove_crushed_apples(self) -> None:
+        """
+        Checks every apple against every wall, removing while iterating
+        """
+        for apple in self.get_apples():
+            for wall in self.get_walls():
+                if apple.get_location() in wall.get_wall_cells_locations():
+                    self.remove_apple(apple)
+
+    def is_snake_out_boundaries(self) -> bool:
+        """
+        Checks every snake cell against the board's boundaries
+        """
+        for cell in self.snake.get_snake_cells():
+            if not self.is_coord_in_board_boundaries(cell.get_location()):
+                return True
+        return False
+
+
+def get_fingerprint(board: Board) -> RoundFingerprint:
+    """
+    Returns the fingerprint of a board at the end of a round
+    """
+    return RoundFingerprint(board.get_rounds(), board.get_zobrist_hash(),
+                            board.get_score(), board.is_over)
+
+
+def make_key_source(keys: Sequence[Optional[str]]) -> \
+        Callable[[], Optional[str]]:
+    """
+    Returns a key source clicking the given keys, and no key after them
+    """
+    key_iterator = iter(keys)
+    return lambda: next(key_iterator, None)
+
+
+def play_case(case: Case, board_class: Type[Board] = Board) -> \
+        List[RoundFingerprint]:
+    """
+    Plays a case by the game loop, on a board of the given class
+    """
+    board = board_class(is_debug=case.args.debug,
+                        rng=game_utils.RandomContext(case.seed),
+                        width=case.args.width, height=case.args.height)
+    fingerprints: List[RoundFingerprint] = []
+    snake_main.main_loop(
+        HeadlessDisplay(make_key_source(case.keys)), case.args, board=board,
+        observers=[lambda observed: fingerprints.append(
+            get_fingerprint(observed))])
+    return fingerprints
+
+
+def reference_engine(case: Case) -> List[RoundFingerprint]:
+    """
+    Plays a case by the reference rules
+    """
+    return play_case(case)
+
+
+def baseline_engine(case: Case) -> List[RoundFingerprint]:
+    """
+    Plays a case by the reference rules, checked by full scans at the end
+    of every round (see 'FullScanBoard')
+    """
+    return play_case(case, FullScanBoard)
+
+
+def snapshot_engine(case: Case) -> List[RoundFingerprint]:
+    """
+    Plays a case by the reference rules, but moves the game to a new board
+    through a JSON round trip of its state every SNAPSHOT_INTERVAL rounds
+    (as replays, rewinding and checkpoints do)
+    """
+    args = case.args
+    key_source = make_key_source(case.keys)
+    gd = HeadlessDisplay(key_source)
+    board = Board(is_debug=args.debug,
+                  rng=game_utils.RandomContext(case.seed),
+                  width=args.width, height=args.height)
+    snake_main.start_game(board, gd, args)
+    fingerprints = [get_fingerprint(board)]
+    while not board.is_over and args.rounds != 0:
+        if board.get_rounds() % SNAPSHOT_INTERVAL == 0:
+            state = json.loads(json.dumps(board.get_state()))
+            board = Board(is_debug=args.debug,
+                          rng=game_utils.RandomContext(
+                              block_size=board.rng.block_size,
+                              use_numpy=board.rng.use_numpy),
+                          width=args.width, height=args.height)
+            board.set_state(state)
+        snake_main.play_round(board, gd, args)
+        fingerprints.append(get_fingerprint(board))
+    return fingerprints
+
+
+ENGINES: Dict[str, Engine] = {
+    'reference': reference_engine,
+    'snapshot': snapshot_engine,
+    'baseline': baseline_engine
+}
+
+
+def get_engine(name: str) -> Engine:
+    """
+    Returns an engine by its name in ENGINES, or by 'module:function'
+    """
+    if name in ENGINES:
+        return ENGINES[name]
+    module_name, _, function_name = name.partition(':')
+    if not function_name:
+        raise ValueError(f"unknown engine: {name} (use one of "
+                         f"{sorted(ENGINES)}, or 'module:function')")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+# endregion engines
+# region cases
+def make_case(seed: int, rounds: int = ROUNDS) -> Case:
+    """
+    Creates the case of a seed: a random board config and key sequence
+    (the same for every process)
+    """
+    generator = random.Random(f'equivalence.{seed}')
+    width = generator.randint(*WIDTH_RANGE)
+    height = generator.randint(*HEIGHT_RANGE)
+    args = make_game_args(
+        width=width, height=height, apples=generator.randint(*APPLES_RANGE),
+        walls=generator.randint(*WALLS_RANGE), rounds=rounds,
+        debug=generator.random() < 0.05, fill=generator.random() < 0.2)
+    if generator.random() < WANDER_PROBABILITY:
+        return Case(str(seed), args, get_wandering_keys(
+            Case(str(seed), args, []), generator))
+    keys = [generator.choice(game_utils.DIRECTIONS)
+            if generator.random() < KEY_PROBABILITY else None
+            for _ in range(rounds)]
+    return Case(str(seed), args, keys)
+
+
+def get_wandering_keys(case: Case, generator: random.Random) -> \
+        List[Optional[str]]:
+    """
+    Plays a case by the reference rules with a snake which turns at random,
+    but never into an immediate loss (when it can avoid it)
+    :return: the keys clicked in every round
+    """
+    board = Board(is_debug=case.args.debug,
+                  rng=game_utils.RandomContext(case.seed),
+                  width=case.args.width, height=case.args.height)
+    keys: List[Optional[str]] = []
+
+    def wander() -> Optional[str]:
+        key = None
+        if not case.args.debug:
+            safe = bots.get_safe_directions(board,
+                                            bots.get_blocked_cells(board))
+            if safe and (board.snake.direction not in safe or
+                         generator.random() < KEY_PROBABILITY):
+                key = generator.choice(safe)
+        keys.append(key)
+        return key
+
+    snake_main.main_loop(HeadlessDisplay(wander), case.args, board=board)
+    return keys
+
+
+def compare(case: Case, reference: Engine,
+            candidate: Engine) -> Optional[Divergence]:
+    """
+    Plays a case by both engines
+    :return: the first round in which they diverge, or None
+    """
+    reference_fingerprints = reference(case)
+    candidate_fingerprints = candidate(case)
+    for round_num in range(max(len(reference_fingerprints),
+                               len(candidate_fingerprints))):
+        expected = reference_fingerprints[round_num] \
+            if round_num < len(reference_fingerprints) else None
+        actual = candidate_fingerprints[round_num] \
+            if round_num < len(candidate_fingerprints) else None
+        if expected != actual:
+            return Divergence(case, round_num, expected, actual)
+    return None
+
+
+def shrink(divergence: Divergence, reference: Engine,
+           candidate: Engine) -> Divergence:
+    """
+    Shrinks a divergent case: ends the game at the divergence, drops the
+    keys after it, then drops every key (and wall and apple) which is not
+    needed for the engines to diverge
+    """
+    def diverges(case: Case) -> Optional[Divergence]:
+        try:
+            return compare(case, reference, candidate)
+        except Exception as error:  # a crash is a divergence too
+            return Divergence(case, -1, None, repr(error))
+
+    case = divergence.case
+    shorter_args = Namespace(**vars(case.args))
+    shorter_args.rounds = max(1, divergence.round)
+    shorter = diverges(Case(case.seed, shorter_args,
+                            case.keys[:divergence.round]))
+    if shorter is not None:
+        divergence = shorter
+
+    for field in ('walls', 'apples'):
+        while getattr(divergence.case.args, field) > 0:
+            fewer_args = Namespace(**vars(divergence.case.args))
+            setattr(fewer_args, field, getattr(fewer_args, field) - 1)
+            fewer = diverges(divergence.case._replace(args=fewer_args))
+            if fewer is None:
+                break
+            divergence = fewer
+
+    keys = list(divergence.case.keys)
+    for index in reversed(range(len(keys))):
+        if keys[index] is None:
+            continue
+        keys[index] = None
+        fewer = diverges(divergence.case._replace(keys=list(keys)))
+        if fewer is None:
+            keys[index] = divergence.case.keys[index]
+        else:
+            divergence = fewer
+    while keys and keys[-1] is None:
+        keys.pop()
+    return divergence._replace(case=divergence.case._replace(keys=keys))
+
+
+def check_seed(task: Tuple[int, int, str, str]) -> Optional[Divergence]:
+    """
+    Compares the engines on a seed's case (in a worker process)
+    :param task: (seed, rounds, reference engine name, candidate engine
+                 name)
+    :return: the shrunk divergence, or None if the engines agree
+    """
+    seed, rounds, reference_name, candidate_name = task
+    reference = get_engine(reference_name)
+    candidate = get_engine(candidate_name)
+    case = make_case(seed, rounds)
+    try:
+        divergence = compare(case, reference, candidate)
+    except Exception as error:
+        divergence = Divergence(case, -1, None, repr(error))
+    if divergence is None:
+        return None
+    return shrink(divergence, reference, candidate)
+
+
+def check_engines(candidate_name: str, seeds: Sequence[int],
+                  rounds: int = ROUNDS, reference_name: str = 'reference',
+                  workers: int = 0) -> List[Divergence]:
+    """
+    Compares a candidate engine with the reference on many seeds across a
+    process pool (the engines are passed by name, so the workers can import
+    them)
+    :param workers: the number of processes (0 for one per CPU)
+    :return: the shrunk divergences, by seed
+    """
+    tasks = [(seed, rounds, reference_name, candidate_name)
+             for seed in seeds]
+    with ProcessPoolExecutor(max_workers=workers or None) as executor:
+        chunk_size = max(1, len(tasks) // (8 * (workers or 4)))
+        return [divergence for divergence in
+                executor.map(check_seed, tasks, chunksize=chunk_size)
+                if divergence is not None]
+
+
+# endregion cases
+# region reproducers
+def save_case(case: Case, path: str) -> None:
+    """
+    Writes a case into a JSON reproducer file
+    """
+    with open(path, 'w') as case_file:
+        json.dump({'seed': case.seed, 'args': vars(case.args),
+                   'keys': case.keys}, case_file)
+
+
+def load_case(path: str) -> Case:
+    """
+    Reads a case from a JSON reproducer file
+    """
+    with open(path) as case_file:
+        data = json.load(case_file)
+    return Case(data['seed'], Namespace(**data['args']), data['keys'])
+
+
+def describe(divergence: Divergence) -> str:
+    """
+    Returns a human-readable report of a divergence
+    """
+    case = divergence.case
+    clicked = [(round_num, key) for round_num, key
+               in enumerate(case.keys, start=1) if key is not None]
+    return (f'seed {case.seed}: diverged at round {divergence.round}\n'
+            f'  args:      {vars(case.args)}\n'
+            f'  keys:      {clicked} (round, key)\n'
+            f'  reference: {divergence.reference}\n'
+            f'  candidate: {divergence.candidate}')
+
+
+# endregion reproducers
+def parse_args(argv: List[str]) -> Namespace:
+    parser = argparse.ArgumentParser(
+        prog='equivalence.py',
+        description='Compares a candidate engine with the reference rules '
+                    'round by round, over many seeds and key sequences.',
+    )
+    parser.add_argument('-c', '--candidate', default='snapshot',
+                        help=f'The candidate engine, one of '
+                             f'{sorted(ENGINES)} or \'module:function\'')
+    parser.add_argument('--reference', default='reference',
+                        help='The reference engine')
+    parser.add_argument('-n', '--seeds', type=int, default=SEEDS,
+                        help='Number of seeds to compare')
+    parser.add_argument('--first-seed', type=int, default=0)
+    parser.add_argument('-r', '--rounds', type=int, default=ROUNDS,
+                        help='Maximal number of rounds per game')
+    parser.add_argument('-j', '--workers', type=int, default=0,
+                        help='Number of processes (default: one per CPU)')
+    parser.add_argument('--save', default=None,
+                        help='Write the first divergence\'s reproducer into '
+                             'this JSON file')
+    parser.add_argument('--repro', default=None,
+                        help='Compare the engines on a reproducer file only')
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    run_args = parse_args(sys.argv[1:])
+    if run_args.repro is not None:
+        repro_divergence = compare(load_case(run_args.repro),
+                                   get_engine(run_args.reference),
+                                   get_engine(run_args.candidate))
+        print('no divergence' if repro_divergence is None
+              else describe(repro_divergence))
+        sys.exit(0 if repro_divergence is None else 1)
+
+    divergences = check_engines(
+        run_args.candidate,
+        range(run_args.first_seed, run_args.first_seed + run_args.seeds),
+        run_args.rounds, run_args.reference, run_args.workers)
+    for found in divergences:
+        print(describe(found))
+    print(f'{len(divergences)} of {run_args.seeds} seeds diverged')
+    if divergences and run_args.save is not None:
+        save_case(divergences[0].case, run_args.save)
+        print(f'reproducer written to {run_args.save}')
+    sys.exit(1 if divergences else 0)
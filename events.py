@@ -0,0 +1,98 @@
+"""
+FILE: events.py
+DESCRIPTION: the events of a 'snake' game, and an 'EventBus' the board emits
+them on as the interactions are detected.
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+from collections import namedtuple
+from typing import Any, Callable, Dict, List, Tuple, Type
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+# locations are (column, row), 'round' is the round the event happened in
+AppleEaten = namedtuple('AppleEaten', ['round', 'location', 'score'])
+AppleCrushed = namedtuple('AppleCrushed', ['round', 'location'])
+WallSpawned = namedtuple('WallSpawned', ['round', 'cells', 'direction'])
+WallExpired = namedtuple('WallExpired', ['round', 'cells', 'direction'])
+TailCut = namedtuple('TailCut', ['round', 'location', 'cells_removed'])
+GameOver = namedtuple('GameOver', ['round', 'cause', 'score'])
+
+EVENT_TYPES = (AppleEaten, AppleCrushed, WallSpawned, WallExpired, TailCut,
+               GameOver)
+
+# the causes of a 'GameOver' event
+OVER_ROUNDS = 'rounds'
+OVER_OUT_OF_BOUNDS = 'out_of_bounds'
+OVER_TANGLED = 'tangled'
+OVER_WALL_HIT_HEAD = 'wall_hit_head'
+OVER_CUT_TO_HEAD = 'cut_to_head'
+
+
+###############################################################################
+#                           Class & Inner Functions                           #
+###############################################################################
+class EventBus:
+    """
+    Dispatches events to the callbacks subscribed to their type. Emitters
+    should check 'has_subscribers' first, so that no event is even created
+    when nobody listens
+    """
+
+    def __init__(self) -> None:
+        self.__subscribers: Dict[Type[Any], Tuple[Callable[[Any], None],
+                                                  ...]] = {}
+
+    def has_subscribers(self, event_type: Type[Any]) -> bool:
+        """
+        Checks whether any callback is subscribed to the event type
+        """
+        return event_type in self.__subscribers
+
+    def subscribe(self, event_type: Type[Any],
+                  callback: Callable[[Any], None]) -> None:
+        """
+        Subscribes a callback to an event type
+        :param event_type: one of 'EVENT_TYPES'
+        :param callback: called with every event of the type, on the game
+                         loop's thread
+        :return: None
+        """
+        self.__subscribers[event_type] = \
+            self.__subscribers.get(event_type, ()) + (callback,)
+
+    def subscribe_all(self, callback: Callable[[Any], None]) -> None:
+        """
+        Subscribes a callback to all the event types
+        """
+        for event_type in EVENT_TYPES:
+            self.subscribe(event_type, callback)
+
+    def unsubscribe(self, event_type: Type[Any],
+                    callback: Callable[[Any], None]) -> None:
+        """
+        Unsubscribes a callback from an event type
+        """
+        callbacks: List[Callable[[Any], None]] = \
+            list(self.__subscribers.get(event_type, ()))
+        if callback in callbacks:
+            callbacks.remove(callback)
+        if callbacks:
+            self.__subscribers[event_type] = tuple(callbacks)
+        else:
+            self.__subscribers.pop(event_type, None)
+
+    def emit(self, event: Any) -> None:
+        """
+        Calls every callback subscribed to the event's type
+        """
+        for callback in self.__subscribers.get(type(event), ()):
+            callback(event)
+
+
+if __name__ == "__main__":
+    print("This script is part of the 'Snake' board game.\nYou should run:\n"
+          "> python game_display.py [optional arguments|--help]")
@@ -6,10 +6,12 @@ DESCRIPTION: a 'GameDisplay' class used for a 'snake' game. Runs the game loop.
 #                                   Imports                                   #
 ###############################################################################
 import sys
+import queue
 import threading
 import time
 import tkinter as tki
-from typing import Any, Optional, List, Tuple, Dict
+from typing import Any, Callable, Iterable, Optional, List, Sequence, \
+    Set, Tuple, Dict
 
 import argparse
 from argparse import Namespace
@@ -27,6 +29,18 @@ WIDTH = 50
 HEIGHT = 50
 NUM_OF_APPLES = 3
 NUM_OF_WALLS = 2
+KEYFRAME_INTERVAL = 1000
+
+MINIMAP_SIZE = 150
+MINIMAP_INTERVAL = 10
+MINIMAP_BACKGROUND = "gray90"
+
+OVERLAY_INTERVAL = 0.5
+OVERLAY_KEY = 'F3'
+
+PAUSE_KEY = 'space'
+STEP_BACK_KEY = 'comma'
+STEP_FORWARD_KEY = 'period'
 
 
 ###############################################################################
@@ -37,9 +51,25 @@ class GameDisplay:
     The main class for the 'Snake' game.
     """
     def __init__(self, width: int, height: int, delay: int, verbose: int,
-                 args: Namespace) -> None:
+                 args: Namespace,
+                 observers: Sequence[Callable[[Any], None]] = (),
+                 viewport: Optional[Tuple[int, int]] = None,
+                 overlay: bool = False, rewind: int = 0,
+                 profile: Optional[str] = None) -> None:
         """
         Creates a new game display object and initializes it
+        :param observers: callables invoked with the board at the end of
+                          every round of the game loop
+        :param viewport: (width, height) of the shown region of the board,
+                         which follows the snake's head (the whole board if
+                         None)
+        :param overlay: whether the performance overlay is shown at start
+                        (toggled with the OVERLAY_KEY)
+        :param rewind: the number of past rounds which can be stepped
+                       through while paused (with the STEP_BACK_KEY and
+                       STEP_FORWARD_KEY)
+        :param profile: the pstats file the game loop's profile is written
+                        to (with its collapsed stacks next to it), or None
         """
         # placed this import in here to solve circular import issues.
         self.width, self.height, self.delay, self.verbose = width, height, delay / 1000, verbose > 1
@@ -52,21 +82,32 @@ class GameDisplay:
         self._score_var = tki.StringVar()
 
         self._init_score_frame()
+        self._init_overlay(overlay)
+        self._init_viewport(viewport)
         self._canvas = tki.Canvas(
-            self._root, bg="white", width=self.width * CELL_SIZE,
-            height=self.height * CELL_SIZE)
+            self._root, bg="white", width=self._view_width * CELL_SIZE,
+            height=self._view_height * CELL_SIZE)
         self._canvas.pack()
-        self._to_draw: Dict[Tuple[int, int], str] = dict()
-        self._already_drawn: Dict[Tuple[int, int, str], int] = dict()
+        self._init_minimap()
+        # the changes to draw at the end of the round (None clears a cell)
+        self._to_draw: Dict[Tuple[int, int], Optional[str]] = dict()
+        self._is_clear_pending = False
+        # (color, canvas item) of every drawn cell
+        self._already_drawn: Dict[Tuple[int, int], Tuple[str, int]] = dict()
 
         self._root.resizable(False, False)
         self.key_click: Optional[str] = None
         self._key_click_round: int = 0
+        self._init_rewind(args, rewind)
 
         self._game_control_thread = threading.Thread(
-            target=snake_main.main_loop, args=(self, args))
+            target=snake_main.main_loop,
+            args=(self, args, None, [*observers, *self._rewind_observers,
+                                     self._observe_board]))
+        self._observers = observers
         self._game_control_thread.daemon = True
         self._round_start_time = time.time()
+        self._profile = profile
 
     def _init_score_frame(self) -> None:
         """
@@ -86,15 +127,227 @@ class GameDisplay:
 
         self._score_frame.grid_rowconfigure(0, weight=1)
 
+    def _init_overlay(self, is_shown: bool) -> None:
+        """
+        Initializes the performance overlay, and its statistics
+        """
+        self._overlay_var = tki.StringVar()
+        self._overlay_label = tki.Label(self._score_frame,
+                                        justify=tki.LEFT,
+                                        textvariable=self._overlay_var,
+                                        font=("Courier", 9))
+        self._overlay_label.grid(row=0, column=1, sticky="w", padx=10)
+        self._is_overlay_shown = True
+        if not is_shown:
+            self._toggle_overlay()
+
+        # statistics of the rounds since the overlay was last updated
+        self._stats_start_time = time.perf_counter()
+        self._stats_rounds = 0
+        self._stats_simulation_time = 0.0
+        self._stats_render_time = 0.0
+        self._stats_late_rounds = 0
+        self._late_rounds = 0
+        self._last_round_end_time = self._stats_start_time
+        self._entity_counts: Tuple[int, int, int] = (0, 0, 0)
+
+    def _toggle_overlay(self) -> None:
+        """
+        Shows or hides the performance overlay
+        """
+        self._is_overlay_shown = not self._is_overlay_shown
+        if self._is_overlay_shown:
+            self._overlay_label.grid()
+        else:
+            self._overlay_label.grid_remove()
+
+    def _observe_board(self, board: Any) -> None:
+        """
+        Keeps the board's entity counts for the overlay, and holds the game
+        loop while the game is paused (a game loop observer)
+        """
+        self._entity_counts = (board.snake.get_length(),
+                               len(board.get_walls()), len(board.get_apples()))
+        with self._pause_lock:
+            if not self._is_paused:
+                return
+            self._is_pause_shown = True
+            # the steps clicked before the pause began are dropped
+            self._pause_commands = queue.Queue()
+        try:
+            self._pause(board)
+        finally:
+            with self._pause_lock:
+                self._is_pause_shown = False
+
+    def _init_rewind(self, args: Namespace, rounds: int) -> None:
+        """
+        Initializes pausing, and the rewind buffer of the last rounds
+        """
+        self._is_paused = False
+        # whether the game loop is held by '_pause' (the pause is pending
+        # from the PAUSE_KEY until the end of the round)
+        self._is_pause_shown = False
+        self._pause_lock = threading.Lock()
+        # PAUSE_KEY, STEP_BACK_KEY or STEP_FORWARD_KEY, sent while paused
+        self._pause_commands: 'queue.Queue[str]' = queue.Queue()
+        self._rewind: Optional[Any] = None
+        self._rewind_observers: List[Callable[[Any], None]] = []
+        if rounds > 0:
+            # placed this import in here to solve circular import issues.
+            from rewind import RewindBuffer
+            self._rewind = RewindBuffer(args, rounds)
+            self._rewind_observers.append(self._rewind)
+
+    def _pause(self, board: Any) -> None:
+        """
+        Shows past rounds as they are stepped through, until the game is
+        resumed (or stepped forward past its last round, in which case it
+        pauses again after the next round). Runs on the game loop's thread
+        :param board: the game's Board
+        """
+        live_round = view_round = board.get_rounds()
+        first_round = self._rewind.get_first_round() if \
+            self._rewind is not None else live_round
+        self._show_paused_board(board)
+        while True:
+            command = self._pause_commands.get()
+            if command == PAUSE_KEY:
+                break
+            if command == STEP_BACK_KEY and view_round > first_round:
+                view_round -= 1
+            elif command == STEP_FORWARD_KEY and view_round < live_round:
+                view_round += 1
+            elif command == STEP_FORWARD_KEY:
+                break
+            else:
+                continue
+            self._show_paused_board(board if view_round == live_round else
+                                    self._rewind.seek(view_round))
+
+        if view_round != live_round:
+            self._show_paused_board(board)
+        # the next round is not late because of the pause
+        self._round_start_time = time.time()
+        self._last_round_end_time = time.perf_counter()
+
+    def _show_paused_board(self, board: Any) -> None:
+        """
+        Draws a board while the game is paused
+        """
+        self.show_score(f'{board.get_score()} (paused at round '
+                        f'{board.get_rounds()})')
+        board.draw_board(self, redraw=True)
+        self._update_drawing()
+
+    def _update_overlay(self) -> None:
+        """
+        Shows the statistics since the last update, every OVERLAY_INTERVAL
+        seconds (so the overlay's own cost stays negligible), and prints
+        them on a single line if verbose
+        """
+        now = time.perf_counter()
+        elapsed = now - self._stats_start_time
+        if elapsed < OVERLAY_INTERVAL or not self._stats_rounds:
+            return
+
+        rounds = self._stats_rounds
+        length, walls, apples = self._entity_counts
+        if self.verbose:
+            print(f'Round {self._round_num}: {rounds / elapsed:.1f} ticks/s, '
+                  f'{len(self._already_drawn)} items, '
+                  f'{self._stats_late_rounds} late, snake {length}, '
+                  f'walls {walls}, apples {apples}')
+        if self._is_overlay_shown:
+            self._overlay_var.set(
+                f'{rounds / elapsed:6.1f} ticks/s  '
+                f'sim {self._stats_simulation_time / rounds * 1000:6.2f} ms  '
+                f'render {self._stats_render_time / rounds * 1000:6.2f} ms\n'
+                f'{len(self._already_drawn):6d} items   '
+                f'late {self._stats_late_rounds:3d} '
+                f'({self._late_rounds} total)\n'
+                f'snake {length}  walls {walls}  apples {apples}')
+
+        self._stats_start_time = now
+        self._stats_rounds = 0
+        self._stats_simulation_time = 0.0
+        self._stats_render_time = 0.0
+        self._stats_late_rounds = 0
+
+    def _init_viewport(self, viewport: Optional[Tuple[int, int]]) -> None:
+        """
+        Initializes the camera (the bottom-left cell of the shown region)
+        """
+        self._is_viewport = viewport is not None
+        if viewport is None:
+            viewport = (self.width, self.height)
+        self._view_width = max(1, min(viewport[0], self.width))
+        self._view_height = max(1, min(viewport[1], self.height))
+        self._camera: Tuple[int, int] = (0, 0)
+        # the camera the current canvas items were drawn with
+        self._drawn_camera: Tuple[int, int] = (0, 0)
+
+    def _init_minimap(self) -> None:
+        """
+        Initializes the minimap (an overview of the whole board, only shown
+        in viewport mode)
+        """
+        self._minimap: Optional[tki.Canvas] = None
+        if not self._is_viewport:
+            return
+        # a minimap pixel shows a square block of cells, and is zoomed in on
+        # boards smaller than the minimap
+        side = max(self.width, self.height)
+        self._minimap_block = -(-side // MINIMAP_SIZE)
+        self._minimap_zoom = max(1, MINIMAP_SIZE // side)
+        self._minimap_rows = -(-self.height // self._minimap_block)
+        map_width = -(-self.width // self._minimap_block) * self._minimap_zoom
+        map_height = self._minimap_rows * self._minimap_zoom
+        self._minimap = tki.Canvas(self._root, bg=MINIMAP_BACKGROUND,
+                                   width=map_width, height=map_height,
+                                   highlightthickness=0)
+        self._minimap.pack(pady=5)
+        self._minimap_image = tki.PhotoImage(width=map_width,
+                                             height=map_height)
+        self._minimap.create_image(0, 0, image=self._minimap_image,
+                                   anchor=tki.NW)
+        self._minimap_view = self._minimap.create_rectangle(
+            0, 0, 0, 0, outline="red")
+        # the color of every non-empty cell, and the number of cells of each
+        # color in every pixel's block
+        self._minimap_cells: Dict[Tuple[int, int], str] = dict()
+        self._minimap_counts: Dict[Tuple[int, int], Dict[str, int]] = dict()
+        # the drawn color of every non-empty pixel, and the pixels whose
+        # blocks changed since they were drawn
+        self._minimap_pixels: Dict[Tuple[int, int], str] = dict()
+        self._minimap_dirty: Set[Tuple[int, int]] = set()
+        self._is_minimap_redrawn = False
+
     def start(self) -> None:
         """
         Starts the program: calls the main method and runs the GUI
         """
+        sampler = None
+        if self._profile is not None:
+            # placed this import in here to solve circular import issues.
+            from profiler import StackSampler
+            sampler = StackSampler(self._game_control_thread)
+            sampler.start()
         self._root.after(500, self._game_control_thread.start)
         self._root.after(1000, self._check_end)
 
         self._root.mainloop()
 
+        if sampler is not None:
+            sampler.stop()
+            sampler.write(self._profile)
+
+        # observers which write files must finish writing them
+        for observer in self._observers:
+            close = getattr(observer, 'close', None)
+            if close is not None:
+                close()
+
     def _check_end(self) -> None:
         """
         Checks if the game has finished
@@ -112,6 +365,21 @@ class GameDisplay:
         if e.keysym in ["Left", "Right", "Up", "Down"]:
             self.key_click = e.keysym
             self._key_click_round = self._round_num
+        elif e.keysym == OVERLAY_KEY:
+            self._toggle_overlay()
+        elif e.keysym == PAUSE_KEY:
+            with self._pause_lock:
+                if not self._is_paused:
+                    self._is_paused = True
+                elif self._is_pause_shown:
+                    self._is_paused = False
+                    self._pause_commands.put(PAUSE_KEY)
+                else:
+                    # a pending pause is cancelled, nothing waits for a key
+                    self._is_paused = False
+        elif e.keysym in (STEP_BACK_KEY, STEP_FORWARD_KEY) and \
+                self._is_paused:
+            self._pause_commands.put(e.keysym)
 
     def get_key_clicked(self) -> Optional[str]:
         """
@@ -131,6 +399,89 @@ class GameDisplay:
         """
         self._to_draw[x, y] = color
 
+    def clear_cell(self, x: int, y: int) -> None:
+        """
+        Sets the cell at the given coordinates to be cleared
+        :param x: coordinate at x
+        :param y: coordinate at y
+        """
+        self._to_draw[x, y] = None
+
+    def clear_all(self) -> None:
+        """
+        Sets all the drawn cells to be cleared (before the cells set to draw
+        after this call)
+        """
+        self._is_clear_pending = True
+        self._to_draw = dict()
+
+    def follow(self, x: int, y: int) -> None:
+        """
+        Moves the camera so the given cell is centered in the viewport (as
+        far as the board's boundaries allow)
+        :param x: coordinate at x
+        :param y: coordinate at y
+        """
+        if not self._is_viewport:
+            return
+        camera_x = max(0, min(x - self._view_width // 2,
+                              self.width - self._view_width))
+        camera_y = max(0, min(y - self._view_height // 2,
+                              self.height - self._view_height))
+        self._camera = (camera_x, camera_y)
+
+    def get_visible_area(self) -> Tuple[int, int, int, int]:
+        """
+        Returns the region of the board which is shown
+        :return: (min x, min y, max x, max y), the max values are exclusive
+        """
+        camera_x, camera_y = self._camera
+        return (camera_x, camera_y, camera_x + self._view_width,
+                camera_y + self._view_height)
+
+    def has_minimap(self) -> bool:
+        """
+        Checks whether the minimap is shown
+        """
+        return self._minimap is not None
+
+    def clear_minimap(self) -> None:
+        """
+        Clears the minimap's cells (it is redrawn at the end of the round)
+        """
+        self._minimap_dirty.update(self._minimap_counts)
+        self._minimap_cells = dict()
+        self._minimap_counts = dict()
+        self._is_minimap_redrawn = True
+
+    def draw_minimap(self,
+                     cells: Iterable[Tuple[int, int, Optional[str]]]) -> None:
+        """
+        Sets the changed cells of the minimap, its pixels are redrawn every
+        MINIMAP_INTERVAL rounds
+        :param cells: (x, y, color) of every changed cell, None clears it
+        """
+        block = self._minimap_block
+        for x, y, color in cells:
+            location = (x, y)
+            old_color = self._minimap_cells.get(location, None)
+            if old_color == color:
+                continue
+            pixel = (x // block, y // block)
+            counts = self._minimap_counts.setdefault(pixel, dict())
+            if old_color is not None:
+                counts[old_color] -= 1
+                if not counts[old_color]:
+                    del counts[old_color]
+            if color is None:
+                del self._minimap_cells[location]
+            else:
+                self._minimap_cells[location] = color
+                counts[color] = counts.get(color, 0) + 1
+            if not counts:
+                del self._minimap_counts[pixel]
+            self._minimap_dirty.add(pixel)
+
     def _buffer_draw_cell(self, x: int, y: int, color: str) -> None:
         """
         Draws the x,y cell in color
@@ -143,49 +494,120 @@ class GameDisplay:
             raise ValueError(
                 "cell index out of bounds of the board: " + str((x, y)))
 
+        # relative to the camera (which is (0, 0) with no viewport)
+        x -= self._drawn_camera[0]
+        y -= self._drawn_camera[1]
+
         # setting the coordinates of the board correctly,
         # the y axis needs to point up.
         # the following line adjusts this.
-        y = self.height - y
+        y = self._view_height - y
         return self._canvas.create_rectangle(
             x * CELL_SIZE, (y - 1) * CELL_SIZE, (x + 1) * CELL_SIZE,
             y * CELL_SIZE,
             fill=color, outline=color)
 
+    def _update_camera(self) -> None:
+        """
+        Shifts the drawn cells by the camera's movement since the last round
+        """
+        delta_x = self._camera[0] - self._drawn_camera[0]
+        delta_y = self._camera[1] - self._drawn_camera[1]
+        if delta_x or delta_y:
+            # the y axis points down on the canvas
+            self._canvas.move(tki.ALL, -delta_x * CELL_SIZE,
+                              delta_y * CELL_SIZE)
+            self._drawn_camera = self._camera
+
+    def _update_minimap(self) -> None:
+        """
+        Redraws the changed pixels of the minimap (every MINIMAP_INTERVAL
+        rounds, or after it was cleared), and moves its viewport rectangle
+        """
+        if self._minimap is None or (not self._is_minimap_redrawn and
+                                     self._round_num % MINIMAP_INTERVAL):
+            return
+        zoom, rows = self._minimap_zoom, self._minimap_rows
+        for pixel in self._minimap_dirty:
+            # a pixel is drawn in the most common color in its block
+            counts = self._minimap_counts.get(pixel, None)
+            color = max(counts, key=counts.__getitem__) if counts else \
+                MINIMAP_BACKGROUND
+            if self._minimap_pixels.get(pixel, MINIMAP_BACKGROUND) == color:
+                continue
+            if counts:
+                self._minimap_pixels[pixel] = color
+            else:
+                del self._minimap_pixels[pixel]
+            # the y axis points down on the image
+            map_x, map_y = pixel[0] * zoom, (rows - 1 - pixel[1]) * zoom
+            self._minimap_image.put(
+                color, to=(map_x, map_y, map_x + zoom, map_y + zoom))
+        self._minimap_dirty = set()
+        self._is_minimap_redrawn = False
+
+        scale = zoom / self._minimap_block
+        map_height = rows * zoom
+        min_x, min_y, max_x, max_y = self.get_visible_area()
+        self._minimap.coords(
+            self._minimap_view, min_x * scale, map_height - max_y * scale,
+            max_x * scale, map_height - min_y * scale)
+
     def _update_drawing(self) -> None:
         """
         Updates the drawing
         """
-        if self.verbose:
-            print(self._to_draw)
-        to_draw = {(x, y, color) for (x, y), color in self._to_draw.items()}
-        for rect in self._already_drawn:
-            if rect not in to_draw:
-                self._canvas.delete(self._already_drawn[rect])
-
-        cur_drawn: Dict[Tuple[int, int, str], int] = dict()
+        self._update_camera()
+        self._update_minimap()
+        if self._is_clear_pending:
+            for _, ind in self._already_drawn.values():
+                self._canvas.delete(ind)
+            self._already_drawn = dict()
+            self._is_clear_pending = False
+
+        # only the cells which changed are set (see 'Board.draw_board')
         for (x, y), color in self._to_draw.items():
-            ind = self._already_drawn.get((x, y, color), None)
-            if ind is None:
-                ind = self._buffer_draw_cell(x, y, color)
-            cur_drawn[(x, y, color)] = ind
+            drawn = self._already_drawn.get((x, y), None)
+            if color is None:
+                if drawn is not None:
+                    self._canvas.delete(drawn[1])
+                    del self._already_drawn[x, y]
+            elif drawn is None:
+                self._already_drawn[x, y] = \
+                    (color, self._buffer_draw_cell(x, y, color))
+            elif drawn[0] != color:
+                self._canvas.itemconfigure(drawn[1], fill=color,
+                                           outline=color)
+                self._already_drawn[x, y] = (color, drawn[1])
 
-        self._already_drawn = cur_drawn
         self._to_draw = dict()
 
     def end_round(self) -> None:
         """
         Ends the current round
         """
+        render_start_time = time.perf_counter()
         self._update_drawing()
+        render_end_time = time.perf_counter()
 
         self._round_start_time += self.delay
         now = time.time()
+        if now >= self._round_start_time:
+            # the round took longer than the delay
+            self._stats_late_rounds += 1
+            self._late_rounds += 1
         while now < self._round_start_time:
             time.sleep(self._round_start_time - now)
             now = time.time()
         self._round_num += 1
 
+        self._stats_rounds += 1
+        self._stats_simulation_time += \
+            render_start_time - self._last_round_end_time
+        self._stats_render_time += render_end_time - render_start_time
+        self._update_overlay()
+        self._last_round_end_time = time.perf_counter()
+
     def show_score(self, val: Any) -> None:
         """
         Updates the currently shown score on the board
@@ -197,6 +619,8 @@ class GameDisplay:
 
 
 def parse_args(argv: List[str]) -> Namespace:
+    # placed this import in here to solve circular import issues.
+    from rewind import REWIND_ROUNDS
     parser = argparse.ArgumentParser(
         prog='game_display.py',
         description='Runs the "Snake" game. '
@@ -217,11 +641,31 @@ def parse_args(argv: List[str]) -> Namespace:
                         help='args.walls: Number of walls')
     parser.add_argument('-r', '--rounds', type=int, default=-1,
                         help='args.rounds: Number of rounds')
+    parser.add_argument('-F', '--fill', action='store_true',
+                        help='args.fill: Add all the missing walls and apples every round, instead of one of each')
     parser.add_argument('-t', '--delay', type=int, default=ROUND_TIME,
                         help='Delay between rounds in milliseconds (not passed to game loop)')
     parser.add_argument('-v', '--verbose',
                         action='count', default=0,
                         help='Print helpful debugging information (not passed to game loop, can be used multiple times)')
+    parser.add_argument('-R', '--record', default=None,
+                        help='Record the game into a replay file (not passed to game loop)')
+    parser.add_argument('--keyframe-interval', type=int,
+                        default=KEYFRAME_INTERVAL,
+                        help='Rounds between full-state keyframes in the replay file (not passed to game loop)')
+    parser.add_argument('-V', '--viewport', type=int, nargs=2,
+                        metavar=('WIDTH', 'HEIGHT'), default=None,
+                        help='Show only a region of the board which follows the snake (not passed to game loop)')
+    parser.add_argument('-P', '--overlay', action='store_true',
+                        help=f'Show the performance overlay, toggled with {OVERLAY_KEY} (not passed to game loop)')
+    parser.add_argument('-T', '--telemetry', default=None,
+                        help='Write per-round telemetry into a columnar file, or CSV for a .csv path (not passed to game loop)')
+    parser.add_argument('--rewind', type=int, default=REWIND_ROUNDS,
+                        help=f'Rounds which can be stepped back through while paused ({PAUSE_KEY}, then {STEP_BACK_KEY}/{STEP_FORWARD_KEY}), 0 to disable (not passed to game loop)')
+    parser.add_argument('--export', default=None,
+                        help='Publish every round into this shared memory block, which other processes can read with livestate.py (not passed to game loop)')
+    parser.add_argument('--profile', default=None,
+                        help='Sample the game loop\'s stack, and write pstats into this file and collapsed stacks next to it (not passed to game loop)')
     return parser.parse_args(argv)
 
 
@@ -230,11 +674,33 @@ def setup_game(args: Namespace) -> GameDisplay:
     game_utils.set_verbose(args.verbose)
     game_utils.set_size(width=args.width,
                         height=args.height)
+
+    observers: List[Callable[[Any], None]] = []
+    record = args.__dict__.pop('record')
+    keyframe_interval = args.__dict__.pop('keyframe_interval')
+    if record is not None:
+        # placed this import in here to solve circular import issues.
+        from replay import ReplayRecorder
+        observers.append(ReplayRecorder(record, args, keyframe_interval))
+    telemetry = args.__dict__.pop('telemetry')
+    if telemetry is not None:
+        from telemetry import TelemetrySink
+        observers.append(TelemetrySink(telemetry))
+    export = args.__dict__.pop('export')
+    if export is not None:
+        from livestate import LiveStateExporter
+        observers.append(LiveStateExporter(export))
+
     return GameDisplay(width=args.width,
                        height=args.height,
                        delay=args.__dict__.pop('delay'),
                        verbose=args.__dict__.pop('verbose'),
-                       args=args)
+                       args=args,
+                       observers=observers,
+                       viewport=args.__dict__.pop('viewport'),
+                       overlay=args.__dict__.pop('overlay'),
+                       rewind=args.__dict__.pop('rewind'),
+                       profile=args.__dict__.pop('profile'))
 
 
 if __name__ == "__main__":
@@ -6,9 +6,14 @@ DESCRIPTION: utility functions for the game.
 #                                   Imports                                   #
 ###############################################################################
 import random
-from typing import Tuple, Any
+from typing import Tuple, Any, List, Optional
 from collections import namedtuple
 
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, only used by 'RandomContext'
+    np = None
+
 
 ###############################################################################
 #                                  Constants                                  #
@@ -21,7 +26,19 @@ DOWN = 'Down'
 RIGHT = 'Right'
 LEFT = 'Left'
 
-random_array = [random.Random(), random.Random()]
+DIRECTIONS = [UP, DOWN, LEFT, RIGHT]
+
+# board cell codes (of 'selfplay' observations and 'livestate' exports)
+CELL_EMPTY = 0
+CELL_SNAKE = 1
+CELL_HEAD = 2
+CELL_WALL = 3
+CELL_APPLE = 4
+CELL_OUTSIDE = 5
+
+RANDOM_BLOCK_SIZE = 64
+# joins a parent's seed and a child's index in the seeds of spawned contexts
+SPAWN_SEPARATOR = '\x1f'
 
 Size = namedtuple('Size', ['width', 'height'])
 size = Size(WIDTH, HEIGHT)
@@ -29,6 +46,258 @@ size = Size(WIDTH, HEIGHT)
 verbose = False
 
 
+###############################################################################
+#                           Class & Inner Functions                           #
+###############################################################################
+class RandomContext:
+    """
+    A per-game source of random apple and wall data. Candidates are drawn
+    ahead in blocks, and the context can be split into independent child
+    streams (e.g. one per parallel game).
+    In the default mode (two 'random.Random' streams) the drawn values are
+    the same as drawing them one at a time, so seeded games are unchanged.
+    The NumPy mode is faster but produces a different sequence.
+    """
+
+    def __init__(self, seed: Any = None,
+                 block_size: int = RANDOM_BLOCK_SIZE,
+                 use_numpy: bool = False) -> None:
+        if use_numpy and np is None:
+            raise ImportError("'use_numpy' requires numpy to be installed")
+        self.block_size: int = max(1, block_size)
+        self.use_numpy: bool = use_numpy
+        self.seed_value: Any = None
+        self.__entropy: Any = None
+        self.__apple_random = random.Random()
+        self.__wall_random = random.Random()
+        self.__np_apple: Any = None
+        self.__np_wall: Any = None
+        # pending candidates, drawn ahead for a given board size
+        self.__apple_block: List[Tuple[int, int]] = []
+        self.__wall_block: List[Tuple[int, int, str]] = []
+        self.__apple_block_size: Optional[Tuple[int, int]] = None
+        self.__wall_block_size: Optional[Tuple[int, int]] = None
+        self.seed(seed)
+
+    # region get & set methods
+    def get_generators(self) -> List[random.Random]:
+        """
+        Returns the [apple, wall] 'random.Random' streams of the default mode
+        """
+        return [self.__apple_random, self.__wall_random]
+
+    def seed(self, val: Any = None) -> None:
+        """
+        Re-seeds the context and drops all candidates drawn ahead
+        :param val: the seed, or None for a system-random seed
+        :return: None
+        """
+        self.seed_value = val
+        # children are derived from the entropy, so they never draw from
+        # (and shift) the parent's streams
+        self.__entropy = val if val is not None else \
+            random.SystemRandom().getrandbits(64)
+        if self.use_numpy:
+            root = np.random.SeedSequence(
+                [ord(char) for char in str(self.__entropy)])
+            apple_seq, wall_seq = root.spawn(2)
+            self.__np_apple = np.random.default_rng(apple_seq)
+            self.__np_wall = np.random.default_rng(wall_seq)
+        elif val is None:
+            self.__apple_random.seed()
+            self.__wall_random.seed()
+        else:
+            self.__apple_random.seed(f'apple{val}')
+            self.__wall_random.seed(f'wall{val}')
+        self.__apple_block = []
+        self.__wall_block = []
+
+    def getstate(self) -> Tuple[Any, ...]:
+        """
+        Returns the full state of the context (streams and pending blocks)
+        """
+        if self.use_numpy:
+            streams = (self.__np_apple.bit_generator.state,
+                       self.__np_wall.bit_generator.state)
+        else:
+            streams = (self.__apple_random.getstate(),
+                       self.__wall_random.getstate())
+        return (self.use_numpy, self.__entropy, streams,
+                list(self.__apple_block), self.__apple_block_size,
+                list(self.__wall_block), self.__wall_block_size)
+
+    def setstate(self, state: Tuple[Any, ...]) -> None:
+        """
+        Restores a state returned by 'getstate'
+        :param state: a state returned by 'getstate'
+        :return: None
+        """
+        use_numpy, self.__entropy, streams, apple_block, \
+            self.__apple_block_size, wall_block, self.__wall_block_size = \
+            state
+        if use_numpy != self.use_numpy:
+            raise ValueError("state was taken from a context of another mode")
+        if self.use_numpy:
+            self.__np_apple.bit_generator.state = streams[0]
+            self.__np_wall.bit_generator.state = streams[1]
+        else:
+            # accept states which went through JSON (lists instead of tuples)
+            for stream, (version, internal, gauss) in zip(
+                    self.get_generators(), streams):
+                stream.setstate((version, tuple(internal), gauss))
+        self.__apple_block = [tuple(item) for item in apple_block]
+        self.__wall_block = [tuple(item) for item in wall_block]
+        if self.__apple_block_size is not None:
+            self.__apple_block_size = tuple(self.__apple_block_size)
+        if self.__wall_block_size is not None:
+            self.__wall_block_size = tuple(self.__wall_block_size)
+
+    # endregion get & set methods
+    # region action methods
+    def spawn(self, count: int) -> List['RandomContext']:
+        """
+        Splits the context into independent child contexts
+        :param count: the number of children to create
+        :return: a list of new RandomContext(s)
+        """
+        # the separator cannot be typed in a seed (e.g. on the command
+        # line), so a child's stream is never the stream of another game
+        return [RandomContext(f'{self.__entropy}{SPAWN_SEPARATOR}{index}',
+                              self.block_size, self.use_numpy)
+                for index in range(count)]
+
+    def apple_data(self, width: int, height: int) -> Tuple[int, int]:
+        """
+        Returns randomly drawn data for the apple
+        :param width: the board's width
+        :param height: the board's height
+        :return: (x,y) - Random location on the board
+        """
+        if not self.__apple_block or self.__apple_block_size != (width,
+                                                                 height):
+            self.__apple_block = self.__draw_apple_block(width, height)
+            self.__apple_block_size = (width, height)
+        x, y = self.__apple_block.pop()
+
+        if verbose:
+            print(f'Apple(x={x},y={y})')
+
+        return x, y
+
+    def wall_data(self, width: int, height: int) -> Tuple[int, int, str]:
+        """
+        Returns randomly drawn data for the wall
+        :param width: the board's width
+        :param height: the board's height
+        :return: (x,y,direction) Random location and direction
+        """
+        if not self.__wall_block or self.__wall_block_size != (width, height):
+            self.__wall_block = self.__draw_wall_block(width, height)
+            self.__wall_block_size = (width, height)
+        x, y, direction = self.__wall_block.pop()
+
+        if verbose:
+            print(f'Wall(x={x},y={y},direction={direction})')
+
+        return x, y, direction
+
+    def apple_batch(self, width: int, height: int, count: int) -> \
+            List[Tuple[int, int]]:
+        """
+        Returns many apple candidates at once, the same ones 'count' calls
+        to 'apple_data' would return
+        :param width: the board's width
+        :param height: the board's height
+        :param count: the number of candidates
+        :return: a list of (x,y) - Random locations on the board
+        """
+        if self.__apple_block_size != (width, height):
+            self.__apple_block = []
+            self.__apple_block_size = (width, height)
+        # the pending candidates first, then a single block of the rest
+        batch = self.__apple_block[::-1][:count]
+        del self.__apple_block[len(self.__apple_block) - len(batch):]
+        if len(batch) < count:
+            batch.extend(reversed(self.__draw_apple_block(
+                width, height, count - len(batch))))
+        return batch
+
+    def wall_batch(self, width: int, height: int, count: int) -> \
+            List[Tuple[int, int, str]]:
+        """
+        Returns many wall candidates at once, the same ones 'count' calls to
+        'wall_data' would return
+        :param width: the board's width
+        :param height: the board's height
+        :param count: the number of candidates
+        :return: a list of (x,y,direction) Random locations and directions
+        """
+        if self.__wall_block_size != (width, height):
+            self.__wall_block = []
+            self.__wall_block_size = (width, height)
+        batch = self.__wall_block[::-1][:count]
+        del self.__wall_block[len(self.__wall_block) - len(batch):]
+        if len(batch) < count:
+            batch.extend(reversed(self.__draw_wall_block(
+                width, height, count - len(batch))))
+        return batch
+
+    def __draw_apple_block(self, width: int, height: int,
+                           count: Optional[int] = None) -> \
+            List[Tuple[int, int]]:
+        """
+        Draws a block of apple candidates, stored in reverse order (so the
+        next candidate is popped from the end)
+        :param count: the number of candidates (the block size if None)
+        """
+        if count is None:
+            count = self.block_size
+        if self.use_numpy:
+            xs = self.__np_apple.integers(0, width, count)
+            ys = self.__np_apple.integers(0, height, count)
+            block = list(zip(xs.tolist(), ys.tolist()))
+        else:
+            randint = self.__apple_random.randint
+            block = [(randint(0, width - 1), randint(0, height - 1))
+                     for _ in range(count)]
+        block.reverse()
+        return block
+
+    def __draw_wall_block(self, width: int, height: int,
+                          count: Optional[int] = None) -> \
+            List[Tuple[int, int, str]]:
+        """
+        Draws a block of wall candidates, stored in reverse order (so the
+        next candidate is popped from the end)
+        :param count: the number of candidates (the block size if None)
+        """
+        if count is None:
+            count = self.block_size
+        if self.use_numpy:
+            xs = self.__np_wall.integers(0, width, count)
+            ys = self.__np_wall.integers(0, height, count)
+            ds = self.__np_wall.integers(0, len(DIRECTIONS), count)
+            block = [(x, y, DIRECTIONS[d]) for x, y, d in
+                     zip(xs.tolist(), ys.tolist(), ds.tolist())]
+        else:
+            randint = self.__wall_random.randint
+            choice = self.__wall_random.choice
+            block = []
+            for _ in range(count):
+                x = randint(0, width - 1)
+                y = randint(0, height - 1)
+                block.append((x, y, choice(DIRECTIONS)))
+        block.reverse()
+        return block
+
+    # endregion action methods
+
+
+random_context = RandomContext()
+# the module-level streams, kept for code that draws from them directly
+random_array = random_context.get_generators()
+
+
 ###############################################################################
 #                                  Functions                                  #
 ###############################################################################
@@ -37,28 +306,15 @@ def get_random_apple_data() -> Tuple[int, int]:
     Returns randomly drawn data for the apple
     :return: (x,y) - Random location on the board
     """
-    x = random_array[0].randint(0, size.width - 1)
-    y = random_array[0].randint(0, size.height - 1)
-
-    if verbose:
-        print(f'Apple(x={x},y={y})')
-
-    return x, y
+    return random_context.apple_data(size.width, size.height)
 
 
 def get_random_wall_data() -> Tuple[int, int, str]:
     """
     Returns randomly drawn data for the wall
-    :return: (x,y,length,direction) Random location, length, and direction
+    :return: (x,y,direction) Random location and direction
     """
-    x = random_array[1].randint(0, size.width - 1)
-    y = random_array[1].randint(0, size.height - 1)
-    direction = random_array[1].choice(["Up", "Down", "Left", "Right"])
-
-    if verbose:
-        print(f'Wall(x={x},y={y},direction={direction})')
-
-    return x, y, direction
+    return random_context.wall_data(size.width, size.height)
 
 
 def set_size(width: int, height: int) -> None:
@@ -75,12 +331,7 @@ def set_random_seed(val: Any) -> None:
     """
     Sets the seed
     """
-    if val is None:
-        random_array[0].seed()
-        random_array[1].seed()
-    else:
-        random_array[0].seed(f'apple{val}')
-        random_array[1].seed(f'wall{val}')
+    random_context.seed(val)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,144 @@
+"""
+FILE: headless_display.py
+DESCRIPTION: a 'HeadlessDisplay' class used to run 'snake' games without a
+window (bots, replays, batch runs).
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+from argparse import Namespace
+from typing import Any, Callable, Iterable, Optional, Sequence, Tuple
+
+import events
+import game_utils
+import snake_main
+from board import Board
+from game_display import WIDTH, HEIGHT, NUM_OF_APPLES, NUM_OF_WALLS
+
+
+###############################################################################
+#                           Class & Inner Functions                           #
+###############################################################################
+class HeadlessDisplay:
+    """
+    A display with the same interface the game loop uses on 'GameDisplay',
+    which draws nothing and never waits between rounds
+    """
+
+    def __init__(self,
+                 key_source: Optional[Callable[[], Optional[str]]] = None) \
+            -> None:
+        """
+        Creates a new headless display
+        :param key_source: a callable returning the key clicked in each
+                           round (None for no key)
+        """
+        self.key_source = key_source
+        self.score: Any = None
+        self._round_num = 0
+
+    def get_key_clicked(self) -> Optional[str]:
+        """
+        Returns the key clicked in the current round
+        :return: None, or one of 'Left', 'Right', 'Up', 'Down'
+        """
+        if self.key_source is None:
+            return None
+        return self.key_source()
+
+    def draw_cell(self, x: int, y: int, color: str) -> None:
+        """
+        Ignores the cell (nothing is drawn)
+        """
+
+    def clear_cell(self, x: int, y: int) -> None:
+        """
+        Ignores the cell (nothing is drawn)
+        """
+
+    def clear_all(self) -> None:
+        """
+        Ignores the clearing (nothing is drawn)
+        """
+
+    def follow(self, x: int, y: int) -> None:
+        """
+        Ignores the camera (there is no viewport)
+        """
+
+    def get_visible_area(self) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Returns None, the whole board is 'shown'
+        """
+        return None
+
+    def has_minimap(self) -> bool:
+        """
+        Returns False, there is no minimap
+        """
+        return False
+
+    def clear_minimap(self) -> None:
+        """
+        Ignores the clearing (there is no minimap)
+        """
+
+    def draw_minimap(self,
+                     cells: Iterable[Tuple[int, int, Optional[str]]]) -> None:
+        """
+        Ignores the cells (there is no minimap)
+        """
+
+    def end_round(self) -> None:
+        """
+        Ends the current round
+        """
+        self._round_num += 1
+
+    def show_score(self, val: Any) -> None:
+        """
+        Stores the current score
+        :param val: the score
+        """
+        self.score = val
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def make_game_args(width: int = WIDTH, height: int = HEIGHT,
+                   apples: int = NUM_OF_APPLES, walls: int = NUM_OF_WALLS,
+                   rounds: int = -1, debug: bool = False,
+                   fill: bool = False) -> Namespace:
+    """
+    Creates the arguments passed to the game loop, as 'parse_args' would
+    :return: a Namespace of the game loop's arguments
+    """
+    return Namespace(width=width, height=height, apples=apples, walls=walls,
+                     rounds=rounds, debug=debug, fill=fill)
+
+
+def run_headless_game(args: Namespace,
+                      bot: Optional[Callable[[Board], Optional[str]]] = None,
+                      rng: Optional[game_utils.RandomContext] = None,
+                      observers: Sequence[Callable[[Board], None]] = (),
+                      event_bus: Optional[events.EventBus] = None) -> Board:
+    """
+    Runs a full game without a window
+    :param args: the arguments of the 'snake game'
+    :param bot: a callable returning the key to click given the board
+    :param rng: the game's random stream (the shared one if None)
+    :param observers: callables invoked with the board after every round
+    :param event_bus: the bus the game's events are emitted on
+    :return: the Board the game was played on
+    """
+    board = Board(is_debug=args.debug, rng=rng, width=args.width,
+                  height=args.height, event_bus=event_bus)
+    key_source = (lambda: bot(board)) if bot is not None else None
+    return snake_main.main_loop(HeadlessDisplay(key_source), args,
+                                board=board, observers=observers)
+
+
+if __name__ == "__main__":
+    print("This script is part of the 'Snake' board game.\nYou should run:\n"
+          "> python game_display.py [optional arguments|--help]")
@@ -0,0 +1,339 @@
+"""
+FILE: livestate.py
+DESCRIPTION: a live export of a running 'snake' game's state into
+'multiprocessing.shared_memory'. The game loop publishes every round into
+an occupancy grid and a small header, guarded by a seqlock version counter,
+so any number of local processes can attach and read consistent rounds
+without copies, while the game never waits for them.
+run (a reader, printing the rounds of an exported game):
+> python livestate.py NAME [optional arguments|--help]
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import sys
+import time
+import struct
+import argparse
+from argparse import Namespace
+from collections import namedtuple
+from multiprocessing import resource_tracker, shared_memory
+from typing import List, Optional, Set, Tuple
+
+from board import Board
+from game_utils import CELL_EMPTY, CELL_SNAKE, CELL_HEAD, CELL_WALL, \
+    CELL_APPLE
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+LIVE_STATE_MAGIC = b'SNKL'
+
+# layout:
+#   VERSION (uint64) | HEADER | cells (a byte per cell, rows from the top)
+# the version is odd while a round is being written
+VERSION = struct.Struct('<Q')
+# magic, width, height, round, score, snake length, walls, apples, is over
+HEADER = struct.Struct('<4sIIqqIIIBxxx')
+CELLS_OFFSET = VERSION.size + HEADER.size
+
+POLL_INTERVAL = 0.05
+CELL_CHARACTERS = {CELL_EMPTY: '.', CELL_SNAKE: 'o', CELL_HEAD: '@',
+                   CELL_WALL: '#', CELL_APPLE: '*'}
+
+LiveHeader = namedtuple('LiveHeader', [
+    'width', 'height', 'round', 'score', 'length', 'walls', 'apples',
+    'is_over'])
+
+
+###############################################################################
+#                           Class & Inner Functions                           #
+###############################################################################
+class LiveStateExporter:
+    """
+    A game loop observer which publishes the board of every round into
+    shared memory (it is the only writer, and never waits for the readers).
+    Only the cells which changed since the last round are written, as the
+    board tracks them (see 'Board.track_changed_cells')
+    """
+
+    def __init__(self, name: Optional[str] = None) -> None:
+        """
+        :param name: the shared memory block's name (a random one if None),
+                     which readers attach to
+        """
+        self.name = name
+        self.__shm: Optional[shared_memory.SharedMemory] = None
+        self.__version: Optional[memoryview] = None
+        self.__cells: Optional[memoryview] = None
+        self.__width = 0
+        self.__height = 0
+        # the board whose changed locations are tracked, and the location of
+        # its snake's head in the last round (which becomes a body cell)
+        self.__board: Optional[Board] = None
+        self.__changed_cells: Set[Tuple[int, int]] = set()
+        self.__head_location: Optional[Tuple[int, int]] = None
+
+    def __call__(self, board: Board) -> None:
+        """
+        Publishes the round which has just ended
+        :param board: the game's Board
+        :return: None
+        """
+        if self.__shm is None:
+            self.__open(board)
+        assert self.__version is not None and self.__cells is not None
+
+        self.__version[0] += 1
+        if board is not self.__board:
+            self.__track(board)
+        changed_cells = self.__changed_cells
+        if not board.is_debug:
+            if self.__head_location is not None:
+                changed_cells.add(self.__head_location)
+            self.__head_location = board.snake.get_head_location()
+            changed_cells.add(self.__head_location)
+        for location in changed_cells:
+            self.__write_cell(location, self.__get_code(board, location))
+        changed_cells.clear()
+        self.__pack_header(board)
+        self.__version[0] += 1
+
+    def __open(self, board: Board) -> None:
+        """
+        Creates the shared memory block for the board's size
+        """
+        self.__width, self.__height = board.width, board.height
+        self.__shm = shared_memory.SharedMemory(
+            name=self.name, create=True,
+            size=CELLS_OFFSET + self.__width * self.__height)
+        self.name = self.__shm.name
+        self.__version = self.__shm.buf[:VERSION.size].cast('Q')
+        self.__cells = self.__shm.buf[CELLS_OFFSET:CELLS_OFFSET +
+                                      self.__width * self.__height]
+        self.__version[0] = 0
+        struct.pack_into('<4sII', self.__shm.buf, VERSION.size,
+                         LIVE_STATE_MAGIC, self.__width, self.__height)
+
+    def __track(self, board: Board) -> None:
+        """
+        Starts tracking a board's changed locations, from all of its cells
+        (on an empty grid)
+        """
+        assert self.__cells is not None
+        if self.__board is not None:
+            self.__cells[:] = bytes(len(self.__cells))
+        self.__board = board
+        self.__changed_cells = board.track_changed_cells()
+        self.__changed_cells.update(cell.get_location()
+                                    for cell in board.get_all_cells())
+
+    @staticmethod
+    def __get_code(board: Board, location: Tuple[int, int]) -> int:
+        """
+        Returns the code of a location (walls are on top of the snake, which
+        is on top of apples, as the board is drawn)
+        """
+        if board.is_wall_at(location):
+            return CELL_WALL
+        if not board.is_debug and \
+                location in board.snake.get_snake_cells_locations():
+            return CELL_HEAD if location == \
+                board.snake.get_head_location() else CELL_SNAKE
+        if board.get_apple_at(location) is not None:
+            return CELL_APPLE
+        return CELL_EMPTY
+
+    def __write_cell(self, location: Tuple[int, int], code: int) -> None:
+        """
+        Writes a cell's code (cells outside the board are not exported)
+        """
+        col, row = location
+        if 0 <= col < self.__width and 0 <= row < self.__height:
+            assert self.__cells is not None
+            self.__cells[(self.__height - 1 - row) * self.__width + col] = \
+                code
+
+    def __pack_header(self, board: Board) -> None:
+        """
+        Writes the round's header
+        """
+        assert self.__shm is not None
+        HEADER.pack_into(
+            self.__shm.buf, VERSION.size, LIVE_STATE_MAGIC, self.__width,
+            self.__height, board.get_rounds(), board.get_score(),
+            0 if board.is_debug else board.snake.get_length(),
+            len(board.get_walls()), len(board.get_apples()), board.is_over)
+
+    def close(self) -> None:
+        """
+        Removes the shared memory block (attached readers keep their
+        mapping until they close it)
+        """
+        if self.__shm is None:
+            return
+        assert self.__version is not None and self.__cells is not None
+        self.__version.release()
+        self.__cells.release()
+        self.__shm.close()
+        self.__shm.unlink()
+        self.__shm = None
+
+
+class LiveStateReader:
+    """
+    Attaches to a game exported by a LiveStateExporter. A round is read
+    between 'begin_read' and 'end_read', straight from the shared memory
+    ('get_cells'), and must be read again if 'end_read' returns False
+    """
+
+    def __init__(self, name: str) -> None:
+        """
+        :param name: the exporter's shared memory block name
+        """
+        self.name = name
+        self.__shm = attach_shared_memory(name)
+        self.__version = self.__shm.buf[:VERSION.size].cast('Q')
+        magic, self.width, self.height = struct.unpack_from(
+            '<4sII', self.__shm.buf, VERSION.size)
+        if magic != LIVE_STATE_MAGIC:
+            self.__version.release()
+            self.__shm.close()
+            raise ValueError(f"not an exported snake game: {name}")
+        self.__cells = self.__shm.buf[CELLS_OFFSET:CELLS_OFFSET +
+                                      self.width * self.height]
+
+    def __enter__(self) -> 'LiveStateReader':
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    # region get & set methods
+    def get_version(self) -> int:
+        """
+        Returns the number of rounds published so far
+        """
+        return self.__version[0] // 2
+
+    def get_cells(self) -> memoryview:
+        """
+        Returns the cell codes (rows from the top, the y axis pointing up),
+        a view of the shared memory which the game keeps writing to
+        """
+        return self.__cells
+
+    def get_header(self) -> LiveHeader:
+        """
+        Returns the header of the last round (only consistent between
+        'begin_read' and a successful 'end_read')
+        """
+        _, width, height, round_num, score, length, walls, apples, \
+            is_over = HEADER.unpack_from(self.__shm.buf, VERSION.size)
+        return LiveHeader(width, height, round_num, score, length, walls,
+                          apples, bool(is_over))
+
+    # endregion get & set methods
+    # region action methods
+    def begin_read(self) -> int:
+        """
+        Waits until no round is being written
+        :return: the version to pass to 'end_read'
+        """
+        while True:
+            version = self.__version[0]
+            if version % 2 == 0:
+                return version
+            time.sleep(0)
+
+    def end_read(self, version: int) -> bool:
+        """
+        Checks whether what was read since 'begin_read' is consistent
+        :param version: the version returned by 'begin_read'
+        :return: True if no round was written in the meantime
+        """
+        return self.__version[0] == version
+
+    def read(self) -> Tuple[LiveHeader, bytes]:
+        """
+        Returns a consistent copy of the last round's header and cells
+        """
+        while True:
+            version = self.begin_read()
+            header = self.get_header()
+            cells = bytes(self.__cells)
+            if self.end_read(version):
+                return header, cells
+
+    def close(self) -> None:
+        """
+        Detaches from the shared memory block
+        """
+        self.__version.release()
+        self.__cells.release()
+        self.__shm.close()
+
+    # endregion action methods
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    Attaches to an existing shared memory block without registering it with
+    this process's resource tracker, which would remove the block when this
+    process exits (it belongs to the process which created it)
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # no 'track' before Python 3.13
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def format_cells(header: LiveHeader, cells: bytes) -> str:
+    """
+    Returns the cells as text, a line per row (from the top)
+    """
+    return '\n'.join(
+        ''.join(CELL_CHARACTERS.get(code, '?') for code in
+                cells[row * header.width:(row + 1) * header.width])
+        for row in range(header.height))
+
+
+def parse_args(argv: List[str]) -> Namespace:
+    parser = argparse.ArgumentParser(
+        prog='livestate.py',
+        description='Attaches to a game exported with game_display.py '
+                    '--export, and prints its rounds as they are played.',
+    )
+    parser.add_argument('name', help='The exported shared memory name')
+    parser.add_argument('--show', action='store_true',
+                        help='Print the board as well')
+    parser.add_argument('-i', '--interval', type=float,
+                        default=POLL_INTERVAL,
+                        help='Seconds between reads')
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    run_args = parse_args(sys.argv[1:])
+    with LiveStateReader(run_args.name) as reader:
+        last_round = -1
+        while True:
+            live_header, live_cells = reader.read()
+            if live_header.round != last_round:
+                last_round = live_header.round
+                print(f'round {live_header.round} score {live_header.score} '
+                      f'length {live_header.length} walls {live_header.walls}'
+                      f' apples {live_header.apples}')
+                if run_args.show:
+                    print(format_cells(live_header, live_cells) + '\n')
+            if live_header.is_over:
+                break
+            time.sleep(run_args.interval)
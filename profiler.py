@@ -0,0 +1,285 @@
+"""
+FILE: profiler.py
+DESCRIPTION: a sampling profiler of 'snake' games. A background thread
+samples the Python stack of the game loop's thread at a fixed interval, and
+the samples are written as pstats (for 'pstats' / snakeviz) and as collapsed
+stacks (for flamegraph.pl / speedscope), with every frame named by its
+module. Profiles a headless bot game, or the game window's loop with
+'game_display.py --profile'.
+run:
+> python profiler.py [optional arguments|--help]
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import os
+import sys
+import time
+import marshal
+import pstats
+import argparse
+import threading
+from argparse import Namespace
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import game_utils
+from bots import BOTS
+from headless_display import make_game_args, run_headless_game
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+# a thread waiting for the GIL gets it within the switch interval (5ms by
+# default), so shorter intervals sample the busy game loop no faster
+SAMPLE_INTERVAL = 0.005
+MAX_STACK_DEPTH = 128
+COLLAPSED_SUFFIX = '.collapsed'
+ROUNDS = 5000
+
+# (file name, first line, function name), as in 'pstats'
+FrameKey = Tuple[str, int, str]
+
+
+###############################################################################
+#                           Class & Inner Functions                           #
+###############################################################################
+class StackSampler:
+    """
+    Samples the stack of a single thread from a background thread. The
+    sampled thread is not instrumented, so it runs at full speed apart from
+    the sampling itself
+    """
+
+    def __init__(self, target: Optional[threading.Thread] = None,
+                 interval: float = SAMPLE_INTERVAL) -> None:
+        """
+        Creates a new sampler
+        :param target: the sampled thread (the current one if None), which
+                       may be started after the sampler
+        :param interval: the time between samples in seconds
+        """
+        self.target = threading.current_thread() if target is None \
+            else target
+        self.interval = interval
+        self.samples = 0
+        self.elapsed = 0.0
+        # the number of samples of every stack, root first
+        self.__stacks: Counter = Counter()
+        self.__stop = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> 'StackSampler':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    # region get & set methods
+    def get_stacks(self) -> Dict[Tuple[FrameKey, ...], int]:
+        """
+        Returns the number of samples of every stack (root first)
+        """
+        return dict(self.__stacks)
+
+    # endregion get & set methods
+    # region action methods
+    def start(self) -> None:
+        """
+        Starts sampling
+        """
+        self.__stop.clear()
+        self.__thread = threading.Thread(target=self.__sample_loop)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops sampling (the samples are kept)
+        """
+        self.__stop.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+    def __sample_loop(self) -> None:
+        """
+        Takes a sample every interval, while the sampled thread runs
+        """
+        start_time = time.perf_counter()
+        while not self.__stop.wait(self.interval):
+            thread_id = self.target.ident
+            if thread_id is None:
+                # not started yet
+                start_time = time.perf_counter()
+                continue
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                if not self.target.is_alive():
+                    break
+                continue
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno,
+                              code.co_name))
+                frame = frame.f_back
+            del frame
+            stack.reverse()
+            self.__stacks[tuple(stack)] += 1
+            self.samples += 1
+        self.elapsed += time.perf_counter() - start_time
+
+    def get_module_samples(self) -> Dict[str, int]:
+        """
+        Returns the number of samples in which every module was running
+        (its own code, not the functions it called)
+        """
+        modules: Counter = Counter()
+        for stack, count in self.__stacks.items():
+            if stack:
+                modules[get_frame_name(stack[-1]).split(':')[0]] += count
+        return dict(modules)
+
+    def write_collapsed(self, path: str) -> None:
+        """
+        Writes the samples as collapsed stacks: a line per stack, of its
+        frames (root first, as 'module:function') separated by ';', and its
+        number of samples
+        :param path: the file to write
+        """
+        lines: Counter = Counter()
+        for stack, count in self.__stacks.items():
+            lines[';'.join(get_frame_name(key) for key in stack)] += count
+        with open(path, 'w') as collapsed_file:
+            for line, count in sorted(lines.items()):
+                collapsed_file.write(f'{line} {count}\n')
+
+    def write_pstats(self, path: str) -> None:
+        """
+        Writes the samples in the format of 'cProfile' dumps, so they can be
+        loaded by 'pstats.Stats'. The times are estimated from the samples,
+        and the call counts are numbers of samples
+        :param path: the file to write
+        """
+        sample_time = self.elapsed / max(1, self.samples)
+        # {function: [samples, self time, total time, {caller: [samples,
+        #  self time, total time]}]}
+        functions: Dict[FrameKey, Any] = {}
+        for stack, count in self.__stacks.items():
+            weight = count * sample_time
+            seen = set()
+            for depth, key in enumerate(stack):
+                entry = functions.setdefault(key, [0, 0.0, 0.0, {}])
+                is_leaf = depth == len(stack) - 1
+                if key not in seen:
+                    # a recursive function's time is counted once
+                    seen.add(key)
+                    entry[0] += count
+                    entry[2] += weight
+                if is_leaf:
+                    entry[1] += weight
+                if depth > 0:
+                    edge = entry[3].setdefault(stack[depth - 1],
+                                               [0, 0.0, 0.0])
+                    edge[0] += count
+                    edge[1] += weight if is_leaf else 0.0
+                    edge[2] += weight
+        stats = {
+            key: (samples, samples, self_time, total_time,
+                  {caller: (edge[0], edge[0], edge[1], edge[2])
+                   for caller, edge in callers.items()})
+            for key, (samples, self_time, total_time, callers)
+            in functions.items()}
+        with open(path, 'wb') as stats_file:
+            marshal.dump(stats, stats_file)
+
+    def write(self, path: str) -> None:
+        """
+        Writes the pstats file, and the collapsed stacks next to it (with the
+        COLLAPSED_SUFFIX)
+        """
+        self.write_pstats(path)
+        self.write_collapsed(path + COLLAPSED_SUFFIX)
+
+    # endregion action methods
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def get_frame_name(key: FrameKey) -> str:
+    """
+    Returns the name of a frame in the collapsed stacks, 'module:function'
+    """
+    filename, _, function_name = key
+    module = os.path.splitext(os.path.basename(filename))[0] or filename
+    return f'{module}:{function_name}'
+
+
+def print_profile(path: str, limit: int = 20) -> None:
+    """
+    Prints the functions with the highest self time of a pstats file
+    """
+    pstats.Stats(path).sort_stats('tottime').print_stats(limit)
+
+
+def profile_game(args: Namespace, bot_name: str, seed: str = '0',
+                 interval: float = SAMPLE_INTERVAL) -> StackSampler:
+    """
+    Plays a headless bot game while sampling its stack
+    :param args: the arguments of the 'snake game'
+    :param bot_name: one of 'bots.BOTS'
+    :return: the sampler, with the game's samples
+    """
+    bot = BOTS[bot_name]()
+    rng = game_utils.RandomContext(seed)
+    with StackSampler(interval=interval) as sampler:
+        run_headless_game(args, bot=bot, rng=rng)
+    return sampler
+
+
+def parse_args(argv: List[str]) -> Namespace:
+    parser = argparse.ArgumentParser(
+        prog='profiler.py',
+        description='Profiles a headless bot game with a stack sampler, and '
+                    'writes pstats and collapsed stacks.',
+    )
+    parser.add_argument('-o', '--output', default='snake.prof',
+                        help=f'The pstats file (the collapsed stacks are '
+                             f'written next to it, with a '
+                             f'{COLLAPSED_SUFFIX} suffix)')
+    parser.add_argument('-i', '--interval', type=float,
+                        default=SAMPLE_INTERVAL,
+                        help='Seconds between samples')
+    parser.add_argument('-b', '--bot', choices=sorted(BOTS),
+                        default='search', help='The bot playing the game')
+    parser.add_argument('-s', '--seed', default='0')
+    parser.add_argument('-x', '--width', type=int, default=50)
+    parser.add_argument('-y', '--height', type=int, default=50)
+    parser.add_argument('-a', '--apples', type=int, default=10)
+    parser.add_argument('-w', '--walls', type=int, default=5)
+    parser.add_argument('-r', '--rounds', type=int, default=ROUNDS)
+    parser.add_argument('-F', '--fill', action='store_true')
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    run_args = parse_args(sys.argv[1:])
+    game_sampler = profile_game(
+        make_game_args(run_args.width, run_args.height, run_args.apples,
+                       run_args.walls, run_args.rounds,
+                       fill=run_args.fill),
+        run_args.bot, run_args.seed, run_args.interval)
+    game_sampler.write(run_args.output)
+    print(f'{game_sampler.samples} samples over '
+          f'{game_sampler.elapsed:.2f}s, written to {run_args.output} and '
+          f'{run_args.output}{COLLAPSED_SUFFIX}')
+    for module_name, module_samples in sorted(
+            game_sampler.get_module_samples().items(),
+            key=lambda item: -item[1]):
+        print(f'{module_name:>20} '
+              f'{100 * module_samples / max(1, game_sampler.samples):5.1f}%')
+    print_profile(run_args.output)
@@ -0,0 +1,429 @@
+"""
+FILE: render.py
+DESCRIPTION: an offline renderer of 'snake' games. Rasterizes every round of
+a recorded game into an RGB frame, in the colors and orientation of the game
+window, and writes the frames as a PNG sequence or as raw frames (e.g. to a
+pipe into a video encoder). Long games are split into round ranges rendered
+in parallel processes.
+run:
+> python render.py [optional arguments|--help]
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import os
+import sys
+import struct
+import zlib
+import argparse
+import tempfile
+from argparse import Namespace
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, BinaryIO, Callable, Deque, Dict, Iterator, List, \
+    Optional, Tuple
+
+import game_utils
+import snake_main
+from bots import BOTS
+from headless_display import HeadlessDisplay, make_game_args, \
+    run_headless_game
+from replay import ReplayReader, ReplayRecorder
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, frames are then plain bytearrays
+    np = None
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+CELL_SIZE = 4
+CHUNK_ROUNDS = 250
+# the chunks rendered ahead of the one being written, per worker process
+CHUNKS_AHEAD_PER_WORKER = 2
+PNG_COMPRESS_LEVEL = 1
+FRAME_NAME = 'frame_{:06d}.png'
+
+# the RGB values of the colors the board draws in (as Tk defines them)
+BACKGROUND_COLOR = "white"
+COLORS: Dict[str, Tuple[int, int, int]] = {
+    "white": (255, 255, 255),
+    "black": (0, 0, 0),
+    "green": (0, 255, 0),
+    "blue": (0, 0, 255),
+    "red": (255, 0, 0),
+    "gray80": (204, 204, 204),
+    "gray90": (229, 229, 229)
+}
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# width, height, bit depth 8, color type 2 (RGB), default compression,
+# filter and interlace methods
+PNG_HEADER = struct.Struct('>IIBBBBB')
+
+# (path of the replay, first round, last round, cell size, output directory
+#  of the PNG frames, or None to return raw frames)
+RenderTask = Tuple[str, int, int, int, Optional[str]]
+
+
+###############################################################################
+#                           Class & Inner Functions                           #
+###############################################################################
+class FrameRenderer(HeadlessDisplay):
+    """
+    A display which rasterizes the board into a single RGB frame buffer,
+    which is reused between rounds (the board only sends it the cells which
+    changed). Every ended round hands the frame to a callback
+    """
+
+    def __init__(self, width: int, height: int, cell_size: int = CELL_SIZE,
+                 on_frame: Optional[Callable[[int, Any], None]] = None,
+                 key_source: Optional[Callable[[], Optional[str]]] = None,
+                 first_round: int = 0) -> None:
+        """
+        Creates a new renderer
+        :param width: the board's width
+        :param height: the board's height
+        :param cell_size: the width and height of a cell in pixels
+        :param on_frame: a callable invoked with the round and the frame
+                         (see 'get_frame') at the end of every round
+        :param key_source: a callable returning the key clicked in each
+                           round (None for no key)
+        :param first_round: the round of the first frame
+        """
+        super().__init__(key_source)
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.on_frame = on_frame
+        self._round_num = first_round
+        self.frame_width = width * cell_size
+        self.frame_height = height * cell_size
+        self.__stride = self.frame_width * 3
+        # a row of a cell's pixels, per color
+        self.__cell_rows: Dict[str, bytes] = {}
+        self.__blank = self.__get_cell_row(BACKGROUND_COLOR) * width * \
+            self.frame_height
+        self.__frame = bytearray(self.__blank)
+        self.__array = None if np is None else np.frombuffer(
+            self.__frame, dtype=np.uint8).reshape(
+            (self.frame_height, self.frame_width, 3))
+
+    # region get & set methods
+    def get_frame(self) -> Any:
+        """
+        Returns the frame buffer, a (height, width, 3) uint8 numpy array if
+        numpy is installed, a bytearray of the RGB rows (top to bottom)
+        otherwise. It is overwritten by the next rounds
+        """
+        return self.__frame if self.__array is None else self.__array
+
+    def get_frame_bytes(self) -> bytearray:
+        """
+        Returns the frame buffer as a bytearray of the RGB rows, top to
+        bottom (the same memory as 'get_frame')
+        """
+        return self.__frame
+
+    def __get_cell_row(self, color: str) -> bytes:
+        """
+        Returns a row of a cell's pixels in the given color
+        """
+        if color not in self.__cell_rows:
+            if color.startswith('#') and len(color) == 7:
+                rgb = tuple(bytes.fromhex(color[1:]))
+            elif color in COLORS:
+                rgb = COLORS[color]
+            else:
+                raise ValueError(f"unknown color: {color}")
+            self.__cell_rows[color] = bytes(rgb) * self.cell_size
+        return self.__cell_rows[color]
+
+    # endregion get & set methods
+    # region action methods
+    def draw_cell(self, x: int, y: int, color: str) -> None:
+        """
+        Draws the x,y cell in color
+        :param x: coordinate at x
+        :param y: coordinate at y
+        :param color: the color we wish to draw
+        """
+        if x < 0 or x >= self.width or \
+                y < 0 or y >= self.height:
+            raise ValueError(
+                "cell index out of bounds of the board: " + str((x, y)))
+        cell_row = self.__get_cell_row(color)
+        # the y axis points up, as in the game window
+        offset = (self.height - 1 - y) * self.cell_size * self.__stride + \
+            x * len(cell_row)
+        for _ in range(self.cell_size):
+            self.__frame[offset:offset + len(cell_row)] = cell_row
+            offset += self.__stride
+
+    def clear_cell(self, x: int, y: int) -> None:
+        """
+        Clears the x,y cell (to the background color)
+        """
+        self.draw_cell(x, y, BACKGROUND_COLOR)
+
+    def clear_all(self) -> None:
+        """
+        Clears the whole frame (to the background color)
+        """
+        self.__frame[:] = self.__blank
+
+    def end_round(self) -> None:
+        """
+        Ends the current round, handing its frame to the callback
+        """
+        if self.on_frame is not None:
+            self.on_frame(self._round_num, self.get_frame())
+        self._round_num += 1
+
+    # endregion action methods
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def encode_png(frame: Any, width: int, height: int,
+               level: int = PNG_COMPRESS_LEVEL) -> bytes:
+    """
+    Encodes an RGB frame as a PNG image
+    :param frame: the RGB rows of the frame, top to bottom (a bytes-like
+                  object or a numpy array)
+    :param width: the frame's width in pixels
+    :param height: the frame's height in pixels
+    :param level: the zlib compression level
+    :return: the PNG file's content
+    """
+    view = memoryview(frame).cast('B')
+    stride = width * 3
+    # every row starts with its filter type (0, none)
+    rows = b'\x00' + b'\x00'.join(view[row * stride:(row + 1) * stride]
+                                  for row in range(height))
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + tag + data + \
+            struct.pack('>I', zlib.crc32(tag + data))
+
+    return PNG_SIGNATURE + \
+        chunk(b'IHDR', PNG_HEADER.pack(width, height, 8, 2, 0, 0, 0)) + \
+        chunk(b'IDAT', zlib.compress(rows, level)) + \
+        chunk(b'IEND', b'')
+
+
+def render_rounds(task: RenderTask) -> List[bytes]:
+    """
+    Renders a range of rounds of a replay
+    :param task: (path of the replay, first round, last round, cell size,
+                 output directory of the PNG frames, or None)
+    :return: the raw frames, in order (empty if written as PNG files)
+    """
+    path, first_round, last_round, cell_size, directory = task
+    frames: List[bytes] = []
+    with ReplayReader(path) as reader:
+        args = reader.get_args()
+        keys = iter(reader.get_keys(first_round, last_round))
+        renderer = FrameRenderer(
+            args.width, args.height, cell_size, key_source=lambda: next(keys),
+            first_round=first_round)
+
+        def on_frame(round_num: int, _: Any) -> None:
+            frame = renderer.get_frame_bytes()
+            if directory is None:
+                frames.append(bytes(frame))
+                return
+            with open(os.path.join(directory, FRAME_NAME.format(round_num)),
+                      'wb') as png_file:
+                png_file.write(encode_png(frame, renderer.frame_width,
+                                          renderer.frame_height))
+
+        renderer.on_frame = on_frame
+        if first_round == 0:
+            # round 0 is drawn as it was set up
+            board = reader.seek(0)
+            board.draw_board(renderer)
+            renderer.end_round()
+            first_round = 1
+        else:
+            # a round is drawn before the snake is cut, so it is played again
+            # from the end of the previous one
+            board = reader.seek(first_round - 1)
+        for _ in range(first_round, last_round + 1):
+            snake_main.play_round(board, renderer, args)
+    return frames
+
+
+def render_chunks(tasks: List[RenderTask],
+                  workers: int = 0) -> Iterator[List[bytes]]:
+    """
+    Renders round ranges across a process pool, yielding their frames in
+    order. At most CHUNKS_AHEAD_PER_WORKER chunks per worker are submitted
+    ahead of the one yielded, so the raw frames held in memory do not grow
+    with the length of the game
+    :param tasks: the round ranges to render
+    :param workers: the number of processes (0 for one per CPU, 1 renders in
+                    this process)
+    :return: an iterator of every task's frames (see 'render_rounds')
+    """
+    if workers == 1:
+        yield from map(render_rounds, tasks)
+        return
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: Deque['Future[List[bytes]]'] = deque()
+        for task in tasks:
+            if len(pending) >= workers * CHUNKS_AHEAD_PER_WORKER:
+                yield pending.popleft().result()
+            pending.append(executor.submit(render_rounds, task))
+        while pending:
+            yield pending.popleft().result()
+
+
+def render_replay(path: str, directory: Optional[str] = None,
+                  raw_output: Optional[BinaryIO] = None,
+                  first_round: int = 0, last_round: Optional[int] = None,
+                  cell_size: int = CELL_SIZE, workers: int = 0,
+                  chunk_rounds: int = CHUNK_ROUNDS) -> int:
+    """
+    Renders the rounds of a replay across a process pool, as PNG files in a
+    directory or as raw RGB frames written (in order) to a binary stream
+    :param path: the replay file
+    :param directory: the output directory of the PNG frames
+    :param raw_output: the output stream of the raw frames (if no directory)
+    :param first_round: the first round to render
+    :param last_round: the last round to render (the replay's last if None)
+    :param cell_size: the width and height of a cell in pixels
+    :param workers: the number of processes (0 for one per CPU, 1 renders in
+                    this process)
+    :param chunk_rounds: the number of rounds rendered by each task
+    :return: the number of frames rendered
+    """
+    if (directory is None) == (raw_output is None):
+        raise ValueError("render to either a directory or a raw output")
+    with ReplayReader(path) as reader:
+        rounds = reader.get_rounds()
+    if last_round is None:
+        last_round = rounds
+    if not (0 <= first_round <= last_round <= rounds):
+        raise ValueError(f"rounds {first_round} - {last_round} are not in "
+                         f"the replay (0 - {rounds})")
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+
+    chunk_rounds = max(1, chunk_rounds)
+    tasks: List[RenderTask] = [
+        (path, start, min(start + chunk_rounds - 1, last_round), cell_size,
+         directory) for start in range(first_round, last_round + 1,
+                                       chunk_rounds)]
+    for frames in render_chunks(tasks, workers):
+        if raw_output is not None:
+            for frame in frames:
+                raw_output.write(frame)
+    return last_round - first_round + 1
+
+
+def record_bot_game(path: str, bot_name: str, seed: str,
+                    args: Namespace) -> int:
+    """
+    Plays a bot's game, as 'game_display.py --seed' would, into a replay
+    :return: the number of rounds played
+    """
+    recorder = ReplayRecorder(path, args)
+    board = run_headless_game(args, bot=BOTS[bot_name](),
+                              rng=game_utils.RandomContext(seed),
+                              observers=[recorder])
+    recorder.close()
+    return board.get_rounds()
+
+
+def parse_args(argv: List[str]) -> Namespace:
+    parser = argparse.ArgumentParser(
+        prog='render.py',
+        description='Renders the rounds of a recorded (or a bot\'s) game '
+                    'into PNG frames or raw RGB frames.',
+    )
+    parser.add_argument('replay', nargs='?',
+                        help='The replay file to render (see '
+                             'game_display.py --record)')
+    parser.add_argument('-o', '--output', required=True,
+                        help='The output directory of the PNG frames, or '
+                             'the raw frames\' file with --raw (- for the '
+                             'standard output)')
+    parser.add_argument('--raw', action='store_true',
+                        help='Write raw RGB frames (rgb24), one after the '
+                             'other')
+    parser.add_argument('--first', type=int, default=0,
+                        help='The first round to render')
+    parser.add_argument('--last', type=int, default=None,
+                        help='The last round to render (default: the last '
+                             'round)')
+    parser.add_argument('-c', '--cell-size', type=int, default=CELL_SIZE,
+                        help='Width and height of a board cell in pixels')
+    parser.add_argument('-j', '--workers', type=int, default=0,
+                        help='Number of processes (default: one per CPU)')
+    parser.add_argument('--play', choices=sorted(BOTS),
+                        help='Play and render a game of this bot, instead '
+                             'of a replay')
+    parser.add_argument('-s', '--seed', default='0',
+                        help='Seed of the bot\'s game (with --play)')
+    parser.add_argument('-x', '--width', type=int, default=40)
+    parser.add_argument('-y', '--height', type=int, default=30)
+    parser.add_argument('-a', '--apples', type=int, default=3)
+    parser.add_argument('-w', '--walls', type=int, default=2)
+    parser.add_argument('-r', '--rounds', type=int, default=1000)
+    run_args = parser.parse_args(argv)
+    if (run_args.replay is None) == (run_args.play is None):
+        parser.error('render either a replay file or a --play game')
+    return run_args
+
+
+def main(argv: List[str]) -> None:
+    run_args = parse_args(argv)
+    replay_path = run_args.replay
+    if run_args.play is not None:
+        replay_file, replay_path = tempfile.mkstemp(suffix='.replay')
+        os.close(replay_file)
+        record_bot_game(replay_path, run_args.play, run_args.seed,
+                        make_game_args(run_args.width, run_args.height,
+                                       run_args.apples, run_args.walls,
+                                       run_args.rounds))
+    try:
+        with ReplayReader(replay_path) as reader:
+            args = reader.get_args()
+        frame_size = (args.width * run_args.cell_size,
+                      args.height * run_args.cell_size)
+        if not run_args.raw:
+            count = render_replay(replay_path, directory=run_args.output,
+                                  first_round=run_args.first,
+                                  last_round=run_args.last,
+                                  cell_size=run_args.cell_size,
+                                  workers=run_args.workers)
+        elif run_args.output == '-':
+            count = render_replay(replay_path,
+                                  raw_output=sys.stdout.buffer,
+                                  first_round=run_args.first,
+                                  last_round=run_args.last,
+                                  cell_size=run_args.cell_size,
+                                  workers=run_args.workers)
+            sys.stdout.flush()
+        else:
+            with open(run_args.output, 'wb') as raw_output:
+                count = render_replay(replay_path, raw_output=raw_output,
+                                      first_round=run_args.first,
+                                      last_round=run_args.last,
+                                      cell_size=run_args.cell_size,
+                                      workers=run_args.workers)
+    finally:
+        if run_args.play is not None:
+            os.remove(replay_path)
+    # the standard output may hold the frames
+    print(f'rendered {count} frames of {frame_size[0]}x{frame_size[1]}',
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
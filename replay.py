@@ -0,0 +1,256 @@
+"""
+FILE: replay.py
+DESCRIPTION: recording and seeking of 'snake' game replays. A replay holds
+the key clicked in every round plus periodic full-state keyframes, so any
+round can be rebuilt by loading the nearest keyframe and simulating only the
+rounds after it.
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import bisect
+import json
+import struct
+import zlib
+from argparse import Namespace
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+import game_utils
+import snake_main
+from board import Board
+from game_display import KEYFRAME_INTERVAL
+from headless_display import HeadlessDisplay, make_game_args
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+REPLAY_MAGIC = b'PYSNAKE-REPLAY\x01'
+
+# file layout:
+#   MAGIC | keyframe blobs ... | keys block | index (JSON) | FOOTER
+# the footer holds the offset and length of the index
+FOOTER = struct.Struct('<QQ')
+
+# a single byte per round
+KEY_TO_CODE = {
+    None: ord('-'),
+    game_utils.UP: ord('U'),
+    game_utils.DOWN: ord('D'),
+    game_utils.LEFT: ord('L'),
+    game_utils.RIGHT: ord('R')
+}
+CODE_TO_KEY = {code: key for key, code in KEY_TO_CODE.items()}
+
+
+###############################################################################
+#                           Class & Inner Functions                           #
+###############################################################################
+class ReplayRecorder:
+    """
+    A game loop observer which records a game into a replay file. The file is
+    finalized when the game is over (or when 'close' is called)
+    """
+
+    def __init__(self, path: str, args: Namespace,
+                 keyframe_interval: int = KEYFRAME_INTERVAL) -> None:
+        """
+        Creates a new recorder
+        :param path: the replay file to write
+        :param args: the arguments of the 'snake game'
+        :param keyframe_interval: the number of rounds between keyframes
+        """
+        self.path = path
+        self.args = args
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.__file: Optional[BinaryIO] = None
+        self.__header: Dict[str, Any] = {}
+        self.__keys = bytearray()
+        self.__keyframes: List[Tuple[int, int, int]] = []
+        self.__closed = False
+
+    def __call__(self, board: Board) -> None:
+        """
+        Records the round which has just ended
+        :param board: the game's Board
+        :return: None
+        """
+        if self.__closed:
+            return
+        if self.__file is None:
+            self.__open(board)
+        assert self.__file is not None
+
+        rounds = board.get_rounds()
+        if rounds > 0:
+            # the key of round r is stored at index r - 1
+            self.__keys.append(KEY_TO_CODE.get(board.get_key_clicked(),
+                                               KEY_TO_CODE[None]))
+        if rounds % self.keyframe_interval == 0:
+            blob = zlib.compress(json.dumps(board.get_state()).encode())
+            self.__keyframes.append((rounds, self.__file.tell(), len(blob)))
+            self.__file.write(blob)
+
+        if board.is_over:
+            self.close()
+
+    def __open(self, board: Board) -> None:
+        """
+        Opens the replay file and stores the game's configuration
+        """
+        self.__file = open(self.path, 'wb')
+        self.__file.write(REPLAY_MAGIC)
+        self.__header = {
+            'width': board.width,
+            'height': board.height,
+            'apples': int(self.args.apples),
+            'walls': int(self.args.walls),
+            'rounds': int(self.args.rounds),
+            'debug': bool(self.args.debug),
+            'fill': bool(getattr(self.args, 'fill', False)),
+            'rng_block_size': board.rng.block_size,
+            'rng_use_numpy': board.rng.use_numpy,
+            'keyframe_interval': self.keyframe_interval
+        }
+
+    def close(self) -> None:
+        """
+        Writes the keys and the index, and closes the replay file
+        """
+        if self.__closed or self.__file is None:
+            self.__closed = True
+            return
+        keys_offset = self.__file.tell()
+        self.__file.write(bytes(self.__keys))
+        index = json.dumps({
+            'header': self.__header,
+            'keys': [keys_offset, len(self.__keys)],
+            'keyframes': self.__keyframes
+        }).encode()
+        index_offset = self.__file.tell()
+        self.__file.write(index)
+        self.__file.write(FOOTER.pack(index_offset, len(index)))
+        self.__file.close()
+        self.__closed = True
+
+
+class ReplayReader:
+    """
+    Reads a replay file, and rebuilds the board at any recorded round
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Opens a replay file and loads its index (not its content)
+        :param path: the replay file to read
+        """
+        self.path = path
+        self.__file: BinaryIO = open(path, 'rb')
+        if self.__file.read(len(REPLAY_MAGIC)) != REPLAY_MAGIC:
+            self.__file.close()
+            raise ValueError(f"not a replay file: {path}")
+
+        self.__file.seek(-FOOTER.size, 2)
+        index_offset, index_length = FOOTER.unpack(
+            self.__file.read(FOOTER.size))
+        self.__file.seek(index_offset)
+        index = json.loads(self.__file.read(index_length))
+
+        self.header: Dict[str, Any] = index['header']
+        self.__keys_offset, self.__keys_length = index['keys']
+        self.__keyframes: List[Tuple[int, int, int]] = \
+            [tuple(keyframe) for keyframe in index['keyframes']]
+        self.__keyframe_rounds = [keyframe[0] for keyframe in
+                                  self.__keyframes]
+
+    def __enter__(self) -> 'ReplayReader':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Closes the replay file
+        """
+        self.__file.close()
+
+    # region get & set methods
+    def get_rounds(self) -> int:
+        """
+        Returns the last recorded round
+        """
+        return self.__keys_length
+
+    def get_args(self) -> Namespace:
+        """
+        Returns the arguments the recorded game was played with
+        """
+        return make_game_args(
+            width=self.header['width'], height=self.header['height'],
+            apples=self.header['apples'], walls=self.header['walls'],
+            rounds=self.header['rounds'], debug=self.header['debug'],
+            fill=self.header.get('fill', False))
+
+    def get_keys(self, first_round: int, last_round: int) -> \
+            List[Optional[str]]:
+        """
+        Returns the keys clicked from 'first_round' to 'last_round'
+        (inclusive)
+        """
+        first_round = max(first_round, 1)
+        if last_round < first_round:
+            return []
+        self.__file.seek(self.__keys_offset + first_round - 1)
+        codes = self.__file.read(last_round - first_round + 1)
+        return [CODE_TO_KEY[code] for code in codes]
+
+    # endregion get & set methods
+    # region action methods
+    def load_keyframe(self, round_num: int) -> Tuple[int, Dict[str, Any]]:
+        """
+        Loads the nearest keyframe at or before the given round
+        :param round_num: the requested round
+        :return: (the keyframe's round, the board's state in that round)
+        """
+        position = bisect.bisect_right(self.__keyframe_rounds, round_num) - 1
+        if position < 0:
+            raise ValueError(f"no keyframe before round {round_num}")
+        keyframe_round, offset, length = self.__keyframes[position]
+        self.__file.seek(offset)
+        state = json.loads(zlib.decompress(self.__file.read(length)))
+        return keyframe_round, state
+
+    def seek(self, round_num: int) -> Board:
+        """
+        Rebuilds the board as it was at the end of the given round
+        :param round_num: the requested round
+        :return: a Board in the state of the requested round
+        """
+        if not (0 <= round_num <= self.get_rounds()):
+            raise ValueError(
+                f"round {round_num} is not in the replay "
+                f"(0 - {self.get_rounds()})")
+
+        keyframe_round, state = self.load_keyframe(round_num)
+        args = self.get_args()
+        rng = game_utils.RandomContext(
+            block_size=self.header['rng_block_size'],
+            use_numpy=self.header['rng_use_numpy'])
+        board = Board(is_debug=args.debug, rng=rng, width=args.width,
+                      height=args.height)
+        board.set_state(state)
+
+        # simulate forward only the gap from the keyframe
+        keys = iter(self.get_keys(keyframe_round + 1, round_num))
+        gd = HeadlessDisplay(lambda: next(keys))
+        for _ in range(keyframe_round, round_num):
+            snake_main.play_round(board, gd, args)
+        return board
+
+    # endregion action methods
+
+
+if __name__ == "__main__":
+    print("This script is part of the 'Snake' board game.\nYou should run:\n"
+          "> python game_display.py [optional arguments|--help]")
@@ -0,0 +1,135 @@
+"""
+FILE: rewind.py
+DESCRIPTION: a bounded rewind buffer of the last rounds of a 'snake' game.
+The round's key is the only per-round delta kept (the rounds are
+deterministic given the board's state, RNG included), together with periodic
+full snapshots of the board, so any recent round can be rebuilt by loading
+the nearest snapshot and simulating the rounds after it.
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import bisect
+from argparse import Namespace
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+import game_utils
+import snake_main
+from board import Board
+from headless_display import HeadlessDisplay
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+REWIND_ROUNDS = 500
+REWIND_SNAPSHOT_INTERVAL = 50
+
+
+###############################################################################
+#                           Class & Inner Functions                           #
+###############################################################################
+class RewindBuffer:
+    """
+    A game loop observer which keeps enough of the last rounds to rebuild
+    any of them. At most 'capacity' / 'snapshot_interval' + 2 snapshots and
+    'capacity' + 'snapshot_interval' keys are held at any time
+    """
+
+    def __init__(self, args: Namespace, capacity: int = REWIND_ROUNDS,
+                 snapshot_interval: int = REWIND_SNAPSHOT_INTERVAL) -> None:
+        """
+        Creates a new rewind buffer
+        :param args: the arguments of the 'snake game'
+        :param capacity: the number of past rounds which can be rebuilt
+        :param snapshot_interval: the number of rounds between snapshots
+        """
+        self.args = args
+        self.capacity = max(1, capacity)
+        self.snapshot_interval = max(1, snapshot_interval)
+        self.__snapshots: Deque[Tuple[int, Dict[str, Any]]] = deque()
+        # the key of every round after the oldest snapshot's round
+        self.__keys: Deque[Optional[str]] = deque()
+        self.__last_round = -1
+        # (width, height, RNG block size, RNG numpy mode) of the board
+        self.__board_config: Tuple[int, int, int, bool] = \
+            (0, 0, game_utils.RANDOM_BLOCK_SIZE, False)
+
+    def __call__(self, board: Board) -> None:
+        """
+        Records the round which has just ended
+        :param board: the game's Board
+        :return: None
+        """
+        rounds = board.get_rounds()
+        if not self.__snapshots:
+            self.__board_config = (board.width, board.height,
+                                   board.rng.block_size, board.rng.use_numpy)
+        elif rounds > 0:
+            self.__keys.append(board.get_key_clicked())
+        self.__last_round = rounds
+        if not self.__snapshots or rounds % self.snapshot_interval == 0:
+            self.__snapshots.append((rounds, board.get_state()))
+
+        # drop the snapshots (and their keys) no longer needed to reach the
+        # oldest round in the buffer's capacity
+        oldest_round = rounds - self.capacity
+        while len(self.__snapshots) > 1 and \
+                self.__snapshots[1][0] <= oldest_round:
+            dropped_round = self.__snapshots.popleft()[0]
+            for _ in range(self.__snapshots[0][0] - dropped_round):
+                self.__keys.popleft()
+
+    # region get & set methods
+    def get_first_round(self) -> int:
+        """
+        Returns the oldest round which can be rebuilt
+        """
+        return self.__snapshots[0][0] if self.__snapshots else 0
+
+    def get_last_round(self) -> int:
+        """
+        Returns the last recorded round
+        """
+        return self.__last_round
+
+    # endregion get & set methods
+    # region action methods
+    def seek(self, round_num: int) -> Board:
+        """
+        Rebuilds the board as it was at the end of the given round
+        :param round_num: the requested round
+        :return: a new Board in the state of the requested round
+        """
+        if not (self.get_first_round() <= round_num <=
+                self.get_last_round()):
+            raise ValueError(
+                f"round {round_num} is not in the rewind buffer "
+                f"({self.get_first_round()} - {self.get_last_round()})")
+
+        rounds = [snapshot[0] for snapshot in self.__snapshots]
+        snapshot_round, state = \
+            self.__snapshots[bisect.bisect_right(rounds, round_num) - 1]
+        width, height, block_size, use_numpy = self.__board_config
+        board = Board(is_debug=self.args.debug,
+                      rng=game_utils.RandomContext(block_size=block_size,
+                                                   use_numpy=use_numpy),
+                      width=width, height=height)
+        board.set_state(state)
+
+        # simulate forward only the gap from the snapshot
+        first_key = snapshot_round - self.get_first_round()
+        keys = iter([self.__keys[index] for index in
+                     range(first_key, first_key + round_num - snapshot_round)])
+        gd = HeadlessDisplay(lambda: next(keys))
+        for _ in range(snapshot_round, round_num):
+            snake_main.play_round(board, gd, self.args)
+        return board
+
+    # endregion action methods
+
+
+if __name__ == "__main__":
+    print("This script is part of the 'Snake' board game.\nYou should run:\n"
+          "> python game_display.py [optional arguments|--help]")
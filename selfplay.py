@@ -0,0 +1,505 @@
+"""
+FILE: selfplay.py
+DESCRIPTION: a self-play pipeline for training 'snake' policies on CPUs.
+Worker processes play headless games (with the rules of 'snake_main') and
+write observations, actions, rewards and done flags straight into
+'multiprocessing.shared_memory' ring buffers, which a learner reads without
+pickling.
+run (a throughput demo):
+> python selfplay.py [optional arguments|--help]
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import sys
+import time
+import random
+import argparse
+import multiprocessing
+from argparse import Namespace
+from collections import namedtuple
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import game_utils
+import snake_main
+from board import Board
+from headless_display import HeadlessDisplay, make_game_args
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+OBSERVATION_RADIUS = 5
+OBSERVATION_SIZE = (2 * OBSERVATION_RADIUS + 1) ** 2
+CAPACITY = 1 << 16
+ROUNDS = 5000
+BACKOFF = 0.001
+
+# action codes are indices of this list
+ACTIONS: List[Optional[str]] = [None] + game_utils.DIRECTIONS
+ACTION_INDEX = {action: index for index, action in enumerate(ACTIONS)}
+
+# ring buffer header fields (uint64 each)
+HEADER_FIELDS = 8
+WRITE_INDEX = 0
+READ_INDEX = 1
+GAMES = 2
+STALLS = 3
+
+RolloutBatch = namedtuple('RolloutBatch', ['observations', 'actions',
+                                           'rewards', 'dones', 'count'])
+
+Policy = Callable[[memoryview, Board], Optional[str]]
+PolicyFactory = Callable[['SharedParameters', int], Policy]
+
+
+###############################################################################
+#                           Class & Inner Functions                           #
+###############################################################################
+class RolloutBuffer:
+    """
+    A single-producer single-consumer ring buffer of samples in shared
+    memory. The worker only moves the write index and the learner only
+    moves the read index, so no lock is needed
+    """
+
+    def __init__(self, capacity: int = CAPACITY,
+                 observation_size: int = OBSERVATION_SIZE) -> None:
+        self.capacity = capacity
+        self.observation_size = observation_size
+        header_size = HEADER_FIELDS * 8
+        observations_size = capacity * observation_size
+        # rewards (float32) are placed last, 8-byte aligned
+        self.__offsets = [0, header_size, header_size + observations_size,
+                          header_size + observations_size + capacity]
+        rewards_offset = self.__offsets[-1] + capacity
+        rewards_offset += -rewards_offset % 8
+        self.__offsets.append(rewards_offset)
+        self.__shm = shared_memory.SharedMemory(
+            create=True, size=rewards_offset + 4 * capacity)
+        self.__attach_views()
+        for field in range(HEADER_FIELDS):
+            self.__header[field] = 0
+
+    def __attach_views(self) -> None:
+        header, observations, actions, dones, rewards = self.__offsets
+        buffer = self.__shm.buf
+        self.__header = buffer[header:observations].cast('Q')
+        self.__observations = buffer[observations:actions]
+        self.__actions = buffer[actions:dones]
+        self.__dones = buffer[dones:dones + self.capacity]
+        self.__rewards = buffer[rewards:rewards + 4 * self.capacity].cast('f')
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # only used by the 'spawn' start method (forked workers inherit the
+        # buffer as is)
+        return {'capacity': self.capacity,
+                'observation_size': self.observation_size,
+                'offsets': self.__offsets, 'name': self.__shm.name}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.capacity = state['capacity']
+        self.observation_size = state['observation_size']
+        self.__offsets = state['offsets']
+        self.__shm = shared_memory.SharedMemory(name=state['name'])
+        self.__attach_views()
+
+    # region get & set methods
+    def get_counter(self, field: int) -> int:
+        """
+        Returns a header counter (WRITE_INDEX is the number of samples
+        written so far)
+        """
+        return self.__header[field]
+
+    def add_to_counter(self, field: int, value: int) -> None:
+        """
+        Adds to a header counter (by the writing side only)
+        """
+        self.__header[field] += value
+
+    # endregion get & set methods
+    # region action methods
+    def write(self, observation: Any, action: int, reward: float,
+              done: bool) -> bool:
+        """
+        Writes a sample (by the worker)
+        :return: True if written, False if the buffer is full
+        """
+        header = self.__header
+        write_index = header[WRITE_INDEX]
+        if write_index - header[READ_INDEX] >= self.capacity:
+            return False
+        slot = write_index % self.capacity
+        offset = slot * self.observation_size
+        self.__observations[offset:offset + self.observation_size] = \
+            observation
+        self.__actions[slot] = action
+        self.__rewards[slot] = reward
+        self.__dones[slot] = done
+        # publish the sample only after it was written
+        header[WRITE_INDEX] = write_index + 1
+        return True
+
+    def read(self, max_samples: int) -> Optional[RolloutBatch]:
+        """
+        Returns the oldest unread samples (by the learner), as zero-copy
+        views into the shared memory which are valid until 'release'
+        :param max_samples: the maximal number of samples to return
+        :return: a RolloutBatch of up to 'max_samples' contiguous samples,
+                 or None if there are none
+        """
+        read_index = self.__header[READ_INDEX]
+        available = self.__header[WRITE_INDEX] - read_index
+        if not available:
+            return None
+        slot = read_index % self.capacity
+        count = min(available, max_samples, self.capacity - slot)
+        size = self.observation_size
+        return RolloutBatch(
+            self.__observations[slot * size:(slot + count) * size],
+            self.__actions[slot:slot + count],
+            self.__rewards[slot:slot + count],
+            self.__dones[slot:slot + count], count)
+
+    def release(self, count: int) -> None:
+        """
+        Frees the oldest samples for the worker to overwrite (by the learner)
+        """
+        self.__header[READ_INDEX] += count
+
+    def close(self, unlink: bool = False) -> None:
+        """
+        Closes the shared memory (all batches must be released first)
+        :param unlink: whether to also destroy it (by its creator)
+        """
+        for view in (self.__header, self.__observations, self.__actions,
+                     self.__dones, self.__rewards):
+            view.release()
+        self.__shm.close()
+        if unlink:
+            self.__shm.unlink()
+
+    # endregion action methods
+
+
+class SharedParameters:
+    """
+    A block of float64 policy parameters in shared memory, which the learner
+    updates and the workers copy (at the start of every game). A seqlock
+    version counter makes sure a copy is never torn
+    """
+
+    def __init__(self, count: int) -> None:
+        self.count = count
+        self.__shm = shared_memory.SharedMemory(create=True,
+                                                size=8 + 8 * max(1, count))
+        self.__attach_views()
+        self.__version[0] = 0
+
+    def __attach_views(self) -> None:
+        self.__version = self.__shm.buf[0:8].cast('Q')
+        self.__values = self.__shm.buf[8:8 + 8 * self.count].cast('d')
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {'count': self.count, 'name': self.__shm.name}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.count = state['count']
+        self.__shm = shared_memory.SharedMemory(name=state['name'])
+        self.__attach_views()
+
+    def get_version(self) -> int:
+        """
+        Returns the number of completed updates
+        """
+        return self.__version[0] // 2
+
+    def set_values(self, values: List[float]) -> None:
+        """
+        Updates the parameters (by the learner)
+        """
+        self.__version[0] += 1
+        for index, value in enumerate(values[:self.count]):
+            self.__values[index] = value
+        self.__version[0] += 1
+
+    def get_values(self) -> List[float]:
+        """
+        Returns a consistent copy of the parameters (by a worker)
+        """
+        while True:
+            version = self.__version[0]
+            if version % 2 == 0:
+                values = self.__values.tolist()
+                if self.__version[0] == version:
+                    return values
+            time.sleep(0)
+
+    def close(self, unlink: bool = False) -> None:
+        self.__version.release()
+        self.__values.release()
+        self.__shm.close()
+        if unlink:
+            self.__shm.unlink()
+
+
+class RandomPolicy:
+    """
+    Keeps its direction, and turns at random every few rounds
+    """
+
+    def __init__(self, parameters: SharedParameters, worker_id: int) -> None:
+        self.random = random.Random(worker_id)
+
+    def __call__(self, observation: memoryview, board: Board) -> \
+            Optional[str]:
+        if self.random.random() < 0.8:
+            return None
+        return self.random.choice(game_utils.DIRECTIONS)
+
+
+class LinearPolicy:
+    """
+    Scores every action by a weighted sum of the observation's cell codes
+    (one weight per action and observation cell), with weights taken from
+    the shared parameters - e.g. for evolution strategies
+    """
+    PARAMETERS_COUNT = len(ACTIONS) * OBSERVATION_SIZE
+
+    def __init__(self, parameters: SharedParameters, worker_id: int) -> None:
+        self.parameters = parameters
+        self.version = -1
+        self.weights: List[List[float]] = []
+
+    def __call__(self, observation: memoryview, board: Board) -> \
+            Optional[str]:
+        if board.get_rounds() == 0 or \
+                self.version != self.parameters.get_version():
+            self.version = self.parameters.get_version()
+            values = self.parameters.get_values()
+            self.weights = [values[index:index + OBSERVATION_SIZE] for index
+                            in range(0, self.PARAMETERS_COUNT,
+                                     OBSERVATION_SIZE)]
+        cells = observation.tolist()
+        scores = [sum(weight * cell for weight, cell in zip(weights, cells))
+                  for weights in self.weights]
+        return ACTIONS[scores.index(max(scores))]
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def encode_observation(board: Board, observation: memoryview,
+                       radius: int = OBSERVATION_RADIUS) -> None:
+    """
+    Writes the cell codes of the square around the snake's head (rows from
+    the top, the y axis pointing up) into a preallocated buffer
+    :param board: the game's Board
+    :param observation: a writable buffer of (2 * radius + 1) ** 2 bytes
+    :param radius: the distance from the head to the square's edges
+    :return: None
+    """
+    head_col, head_row = board.snake.get_head_location()
+    snake_cells = board.snake.get_snake_cells_locations()
+    index = 0
+    for row in range(head_row + radius, head_row - radius - 1, -1):
+        for col in range(head_col - radius, head_col + radius + 1):
+            location = (col, row)
+            if not board.is_coord_in_board_boundaries(location):
+                code = game_utils.CELL_OUTSIDE
+            elif board.is_wall_at(location):
+                code = game_utils.CELL_WALL
+            elif location in snake_cells:
+                code = game_utils.CELL_SNAKE
+            elif board.get_apple_at(location) is not None:
+                code = game_utils.CELL_APPLE
+            else:
+                code = game_utils.CELL_EMPTY
+            observation[index] = code
+            index += 1
+    center = radius * (2 * radius + 1) + radius
+    if observation[center] == game_utils.CELL_SNAKE:
+        observation[center] = game_utils.CELL_HEAD
+
+
+def run_worker(worker_id: int, buffer: RolloutBuffer, args: Namespace,
+               seed: Any, policy_factory: PolicyFactory,
+               parameters: SharedParameters, stop: Any) -> None:
+    """
+    A worker process: plays games until 'stop' is set, writing a sample per
+    round (the observation before the round, the action taken, the score
+    gained in the round and whether the game ended)
+    """
+    policy = policy_factory(parameters, worker_id)
+    observation = memoryview(bytearray(buffer.observation_size))
+    # the key of the round being played, read by the game loop
+    pending_key: List[Optional[str]] = [None]
+    gd = HeadlessDisplay(lambda: pending_key[0])
+
+    game = 0
+    while not stop.is_set():
+        board = Board(is_debug=False,
+                      rng=game_utils.RandomContext(f'{seed}.{game}'),
+                      width=args.width, height=args.height)
+        snake_main.start_game(board, gd, args)
+        while not board.is_over and not stop.is_set():
+            encode_observation(board, observation)
+            key = policy(observation, board)
+            score = board.get_score()
+            pending_key[0] = key
+            snake_main.play_round(board, gd, args)
+
+            # back-pressure: wait for the learner rather than overwrite
+            while not buffer.write(observation, ACTION_INDEX.get(key, 0),
+                                   board.get_score() - score,
+                                   board.is_over):
+                if stop.is_set():
+                    return
+                buffer.add_to_counter(STALLS, 1)
+                time.sleep(BACKOFF)
+        buffer.add_to_counter(GAMES, 1)
+        game += 1
+
+
+###############################################################################
+#                           Class & Inner Functions                           #
+###############################################################################
+class SelfPlayPipeline:
+    """
+    Runs worker processes, each writing into its own rollout buffer, and
+    hands their samples to the learner
+    """
+
+    def __init__(self, workers: int, args: Optional[Namespace] = None,
+                 policy_factory: PolicyFactory = RandomPolicy,
+                 parameters_count: int = 0, capacity: int = CAPACITY,
+                 seed: Any = 0) -> None:
+        """
+        :param workers: the number of worker processes
+        :param args: the arguments of the 'snake game' (with a rounds limit)
+        :param policy_factory: creates a worker's policy, given the shared
+                               parameters and the worker's id
+        :param parameters_count: the number of shared policy parameters
+        :param capacity: the number of samples per worker's buffer
+        :param seed: the root seed, every game gets its own stream
+        """
+        if args is None:
+            args = make_game_args(rounds=ROUNDS)
+        # forked workers inherit the shared memory (a spawned one re-attaches
+        # it by name)
+        methods = multiprocessing.get_all_start_methods()
+        self.__context = multiprocessing.get_context(
+            'fork' if 'fork' in methods else 'spawn')
+        self.__stop = self.__context.Event()
+        self.parameters = SharedParameters(parameters_count)
+        self.buffers = [RolloutBuffer(capacity) for _ in range(workers)]
+        self.__processes = [
+            self.__context.Process(
+                target=run_worker,
+                args=(worker_id, buffer, args, f'{seed}.{worker_id}',
+                      policy_factory, self.parameters, self.__stop),
+                daemon=True)
+            for worker_id, buffer in enumerate(self.buffers)]
+        self.__last_counts: List[Tuple[float, int]] = []
+
+    def __enter__(self) -> 'SelfPlayPipeline':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def start(self) -> None:
+        """
+        Starts the workers
+        """
+        for process in self.__processes:
+            process.start()
+        now = time.perf_counter()
+        self.__last_counts = [(now, 0) for _ in self.buffers]
+
+    def iter_batches(self, max_samples: int) -> \
+            Iterator[Tuple[int, RolloutBatch]]:
+        """
+        Yields (worker id, batch) for every buffer with unread samples. A
+        batch is released once the loop moves to the next one, so it must
+        not be kept
+        """
+        for worker_id, buffer in enumerate(self.buffers):
+            batch = buffer.read(max_samples)
+            if batch is None:
+                continue
+            try:
+                yield worker_id, batch
+            finally:
+                for view in batch[:4]:
+                    view.release()
+                buffer.release(batch.count)
+
+    def get_throughput(self) -> List[float]:
+        """
+        Returns the samples per second of every worker, since the last call
+        """
+        now = time.perf_counter()
+        rates = []
+        for index, buffer in enumerate(self.buffers):
+            last_time, last_count = self.__last_counts[index]
+            count = buffer.get_counter(WRITE_INDEX)
+            rates.append((count - last_count) / max(now - last_time, 1e-9))
+            self.__last_counts[index] = (now, count)
+        return rates
+
+    def close(self) -> None:
+        """
+        Stops the workers and frees the shared memory
+        """
+        self.__stop.set()
+        for process in self.__processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for buffer in self.buffers:
+            buffer.close(unlink=True)
+        self.parameters.close(unlink=True)
+
+
+def parse_args(argv: List[str]) -> Namespace:
+    parser = argparse.ArgumentParser(
+        prog='selfplay.py',
+        description='Measures the self-play pipeline\'s throughput.',
+    )
+    parser.add_argument('-j', '--workers', type=int,
+                        default=multiprocessing.cpu_count(),
+                        help='Number of worker processes')
+    parser.add_argument('-t', '--seconds', type=float, default=10,
+                        help='Duration of the run')
+    parser.add_argument('--linear', action='store_true',
+                        help='Use the (randomly weighted) linear policy')
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    run_args = parse_args(sys.argv[1:])
+    factory: PolicyFactory = LinearPolicy if run_args.linear else \
+        RandomPolicy
+    count = LinearPolicy.PARAMETERS_COUNT if run_args.linear else 0
+    with SelfPlayPipeline(run_args.workers, policy_factory=factory,
+                          parameters_count=count) as pipeline:
+        weights = random.Random(0)
+        pipeline.parameters.set_values(
+            [weights.gauss(0, 1) for _ in range(count)])
+        pipeline.get_throughput()
+        end_time = time.perf_counter() + run_args.seconds
+        samples = 0
+        while time.perf_counter() < end_time:
+            # a stand-in learner, which only consumes the samples
+            for _, rollout in pipeline.iter_batches(4096):
+                samples += rollout.count
+            time.sleep(0.01)
+        rates = pipeline.get_throughput()
+
+    for worker, rate in enumerate(rates):
+        print(f'worker {worker}: {rate:9.0f} samples/s')
+    print(f'total:    {sum(rates):9.0f} samples/s ({samples} consumed)')
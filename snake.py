@@ -6,7 +6,7 @@ DESCRIPTION: a 'Snake' class used for a 'snake' game.
 #                                   Imports                                   #
 ###############################################################################
 import game_utils
-from typing import Optional, List, Set, Tuple
+from typing import Any, Dict, Optional, List, Set, Tuple
 from board_cell import BoardCell, MOVE_DELTA_MAPPING
 
 
@@ -59,6 +59,34 @@ class Snake(BoardCell):
         """
         return self.__snake_cells_locations
 
+    def get_head_location(self) -> Tuple[int, int]:
+        """
+        Returns the location of the snake's head
+        """
+        return self.__snake_cells[-1].get_location()
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Returns the snake's full state as plain data
+        """
+        return {
+            'cells': [cell.get_location() for cell in self.__snake_cells],
+            'direction': self.direction,
+            'cells_to_be_added': self.cells_to_be_added
+        }
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """
+        Restores a state returned by 'get_state'
+        :param state: a state returned by 'get_state'
+        :return: None
+        """
+        self.__snake_cells = [BoardCell(col, row, self.color)
+                              for col, row in state['cells']]
+        self.__regenerage_snake_cell_locations()
+        self.direction = state['direction']
+        self.cells_to_be_added = state['cells_to_be_added']
+
     # endregion get & set methods
     # region action methods
     def update_direction(self, key_clicked) -> None:
@@ -6,9 +6,9 @@ game.
 ###############################################################################
 #                                   Imports                                   #
 ###############################################################################
-import math
 import argparse
-from typing import Optional, Tuple
+from typing import Callable, Optional, Sequence, Tuple
+import events
 from board import Board
 from game_display import GameDisplay
 
@@ -29,9 +29,9 @@ def interaction_snake_walls(board: Board) -> \
     if collision_bool:
         assert hit_location is not None
         if len(board.snake.get_snake_cells()) < 1:
-            board.is_over = True
+            board.end_game(events.OVER_CUT_TO_HEAD)
         if board.snake.compare_to_head(hit_location):
-            board.is_over = True
+            board.end_game(events.OVER_WALL_HIT_HEAD)
 
     return collision_bool, hit_location
 
@@ -43,12 +43,7 @@ def is_snake_cut_by_wall(board: Board) -> \
     :return: Tuple[True, (column, row)] if the snake was cut by a wall,
              Tuple[False, None] otherwise.
     """
-    for wall in board.get_walls():
-        collision, location = board.snake.is_collided(wall.wall_cells)
-        if collision:
-            return collision, location
-
-    return False, None
+    return board.find_snake_wall_collision()
 
 
 def interaction_snake_apples(board: Board) -> None:
@@ -59,12 +54,9 @@ def interaction_snake_apples(board: Board) -> None:
     :param board: a Board object
     :return: None
     """
-    for apple in board.get_apples():
-        if board.snake.compare_to_head(apple.get_location()):
-            board.remove_apple(apple)
-            board.snake.grow()
-            score_calculation = math.floor(board.snake.get_length() ** 0.5)
-            board.increase_score(score_calculation)
+    apple = board.get_apple_at(board.snake.get_head_location())
+    if apple is not None:
+        board.eat_apple(apple)
 
 
 def interaction_walls_apples(board: Board) -> None:
@@ -73,94 +65,151 @@ def interaction_walls_apples(board: Board) -> None:
     :param board: a Board object
     :return: None
     """
-    for apple in board.get_apples():
-        for wall in board.get_walls():
-            if apple.get_location() in wall.get_wall_cells_locations():
-                board.remove_apple(apple)
+    board.remove_crushed_apples()
 
 
 # endregion interactions
 
-def main_loop(gd: GameDisplay, args: argparse.Namespace) -> None:
+def add_new_objects(board: Board, args: argparse.Namespace) -> None:
     """
-    The main loop of the snake game
-    :param gd: a GameDisplay
+    Adds the missing walls and apples: at most one of each per round, or all
+    of them at once if 'args.fill' is set
+    :param board: a Board object
     :param args: the arguments of the 'snake game'
     :return: None
     """
-    # region round 0
-    # init objects
-    board = Board(is_debug=args.debug)
-    gd.show_score(board.get_score())
-
-    # add outside the board's boundaries objects
+    if getattr(args, 'fill', False):
+        board.fill_walls(int(args.walls))
+        board.fill_apples(int(args.apples))
+        return
     if len(board.get_walls()) < int(args.walls):
         board.add_wall()
     if len(board.get_apples()) < int(args.apples):
         board.add_apple()
 
+
+def start_game(board: Board, gd: GameDisplay,
+               args: argparse.Namespace) -> None:
+    """
+    Plays round 0 of the snake game
+    :param board: a new Board object
+    :param gd: a GameDisplay
+    :param args: the arguments of the 'snake game'
+    :return: None
+    """
+    gd.show_score(board.get_score())
+
+    # add outside the board's boundaries objects
+    add_new_objects(board, args)
+
     # draw board
     board.draw_board(gd)
 
     # end round
     gd.end_round()
-    # endregion round 0
 
-    while not board.is_over and args.rounds != 0:
-        # add round count
-        board.add_round()
 
-        # check key press
-        key_clicked = gd.get_key_clicked()
-        board.read_key(key_clicked)
+def play_round(board: Board, gd: GameDisplay,
+               args: argparse.Namespace) -> None:
+    """
+    Plays a single round of the snake game
+    :param board: a Board object
+    :param gd: a GameDisplay
+    :param args: the arguments of the 'snake game'
+    :return: None
+    """
+    # add round count
+    board.add_round()
+
+    # check key press
+    key_clicked = gd.get_key_clicked()
+    board.read_key(key_clicked)
+
+    # update moving objects
+    board.update_moving_objects()
 
-        # update moving objects
-        board.update_moving_objects()
+    # apples' interactions
+    interaction_walls_apples(board)
+    if not args.debug:
+        interaction_snake_apples(board)
 
-        # apples' interactions
-        interaction_walls_apples(board)
-        if not args.debug:
-            interaction_snake_apples(board)
+    # check for new objects to add
+    add_new_objects(board, args)
+
+    # update score
+    gd.show_score(board.get_score())
+
+    # draw board
+    board.draw_board(gd)
 
-        # check for new objects to add
-        if len(board.get_walls()) < int(args.walls):
-            board.add_wall()
-        if len(board.get_apples()) < int(args.apples):
-            board.add_apple()
+    # wait for next round
+    gd.end_round()
 
-        # update score
+    # tangled snake
+    if not args.debug:
+        # cut the snake after collision (next turn)
+        cut_tail, cutting_point = interaction_snake_walls(board)
+        if cut_tail:
+            assert cutting_point is not None
+            board.cut_snake_tail(cutting_point)
+            # check whether only the head remained
+            if board.get_snake_cells_length() <= 1:
+                board.end_game(events.OVER_CUT_TO_HEAD)
+
+    # conditions to verify
+    # - 1: no more rounds
+    is_rounds_over = 0 < args.rounds < board.get_rounds() + 1
+    # - 2: the snake is oudside the board's boundaries
+    is_snake_out_bounds = board.is_snake_out_boundaries() if not \
+        args.debug else False
+    # - 3: the snake is tangled
+    is_snake_tangled = not board.is_snake_tangled() if not args.debug \
+        else False
+
+    if (is_rounds_over or is_snake_out_bounds or is_snake_tangled) and \
+            not board.is_over:
+        if is_rounds_over:
+            board.end_game(events.OVER_ROUNDS)
+        elif is_snake_out_bounds:
+            board.end_game(events.OVER_OUT_OF_BOUNDS)
+        else:
+            board.end_game(events.OVER_TANGLED)
+
+
+def main_loop(gd: GameDisplay, args: argparse.Namespace,
+              board: Optional[Board] = None,
+              observers: Sequence[Callable[[Board], None]] = (),
+              is_resumed: bool = False) -> Board:
+    """
+    The main loop of the snake game
+    :param gd: a GameDisplay
+    :param args: the arguments of the 'snake game'
+    :param board: a new Board to play on (created from 'args' if None)
+    :param observers: callables invoked with the board at the end of every
+                      round (including round 0)
+    :param is_resumed: whether the board is a game restored in the middle
+                       (see 'Board.set_state'), which continues from its
+                       next round instead of playing round 0
+    :return: the Board the game was played on
+    """
+    # region round 0
+    # init objects
+    if board is None:
+        board = Board(is_debug=args.debug)
+    if is_resumed:
         gd.show_score(board.get_score())
+    else:
+        start_game(board, gd, args)
+        for observer in observers:
+            observer(board)
+    # endregion round 0
+
+    while not board.is_over and args.rounds != 0:
+        play_round(board, gd, args)
+        for observer in observers:
+            observer(board)
 
-        # draw board
-        board.draw_board(gd)
-
-        # wait for next round
-        gd.end_round()
-
-        # tangled snake
-        if not args.debug:
-            # cut the snake after collision (next turn)
-            cut_tail, cutting_point = interaction_snake_walls(board)
-            if cut_tail:
-                assert cutting_point is not None
-                board.cut_snake_tail(cutting_point)
-                # check whether only the head remained
-                if board.get_snake_cells_length() <= 1:
-                    board.is_over = True
-
-        # conditions to verify
-        # - 1: no more rounds
-        is_rounds_over = 0 < args.rounds < board.get_rounds() + 1
-        # - 2: the snake is oudside the board's boundaries
-        is_snake_out_bounds = board.is_snake_out_boundaries() if not \
-            args.debug else False
-        # - 3: the snake is tangled
-        is_snake_tangled = not board.is_snake_tangled() if not args.debug \
-            else False
-
-        if (is_rounds_over or is_snake_out_bounds or is_snake_tangled) and \
-                not board.is_over:
-            board.is_over = True
+    return board
 
 
 if __name__ == "__main__":
@@ -0,0 +1,256 @@
+"""
+FILE: soak.py
+DESCRIPTION: a memory soak test of long 'snake' games. Plays bot games for a
+given number of rounds while sampling 'tracemalloc' and the process's RSS,
+attributes the traced memory to the game's modules, and fails if the memory
+grows by more than a budget per round.
+run:
+> python soak.py [optional arguments|--help]
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import os
+import sys
+import argparse
+import tracemalloc
+from argparse import Namespace
+from collections import namedtuple
+from typing import Dict, List, Optional
+
+import game_utils
+from board import Board
+from bots import BOTS
+from headless_display import make_game_args, run_headless_game
+
+try:
+    import psutil
+except ImportError:  # RSS is read from '/proc' (or the peak from 'resource')
+    psutil = None
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+ROUNDS = 20000
+SAMPLE_INTERVAL = 1000
+# the allowed growth of the traced memory, in bytes per round
+GROWTH_BUDGET = 256
+TRACEBACK_FRAMES = 8
+
+# the modules the traced memory is attributed to (a 'BoardCell' is
+# attributed to the module which created it, and the cached Zobrist keys to
+# 'zobrist')
+MODULES = ['board', 'snake', 'wall', 'game_display', 'zobrist']
+OTHER_MODULE = 'other'
+
+MemorySample = namedtuple('MemorySample', [
+    'round', 'length', 'walls', 'apples', 'traced', 'rss', 'modules'])
+
+
+###############################################################################
+#                           Class & Inner Functions                           #
+###############################################################################
+class MemorySampler:
+    """
+    A game loop observer which samples the memory every 'interval' rounds,
+    counting the rounds of all the games it observes
+    """
+
+    def __init__(self, interval: int = SAMPLE_INTERVAL) -> None:
+        self.interval = max(1, interval)
+        self.rounds = 0
+        self.samples: List[MemorySample] = []
+
+    def __call__(self, board: Board) -> None:
+        """
+        Counts the round which has just ended, and samples if it is due
+        :param board: the game's Board
+        :return: None
+        """
+        if board.get_rounds() == 0:
+            return
+        self.rounds += 1
+        if self.rounds % self.interval == 0:
+            self.sample(board)
+
+    def sample(self, board: Board) -> None:
+        """
+        Takes a sample of the memory and of the board's entity counts
+        """
+        # read before the snapshot, which is traced too
+        traced = tracemalloc.get_traced_memory()[0]
+        rss = get_rss()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)])
+        self.samples.append(MemorySample(
+            self.rounds, board.snake.get_length(), len(board.get_walls()),
+            len(board.get_apples()), traced, rss,
+            attribute_snapshot(snapshot)))
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def get_rss() -> int:
+    """
+    Returns the process's resident set size in bytes (its peak, where the
+    current one is not available)
+    """
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        # kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def attribute_snapshot(snapshot: tracemalloc.Snapshot) -> Dict[str, int]:
+    """
+    Sums the traced memory per module: every allocation is attributed to the
+    most recent frame of its traceback which is in one of the MODULES
+    :param snapshot: a 'tracemalloc' snapshot
+    :return: {module: bytes}, for the MODULES and OTHER_MODULE
+    """
+    totals = {module: 0 for module in MODULES + [OTHER_MODULE]}
+    module_names: Dict[str, Optional[str]] = {}
+    for trace in snapshot.traces:
+        owner = OTHER_MODULE
+        for frame in reversed(trace.traceback):
+            if frame.filename not in module_names:
+                name = os.path.splitext(os.path.basename(frame.filename))[0]
+                module_names[frame.filename] = \
+                    name if name in MODULES else None
+            name = module_names[frame.filename]
+            if name is not None:
+                owner = name
+                break
+        totals[owner] += trace.size
+    return totals
+
+
+def get_growth_per_round(samples: List[MemorySample],
+                         module: Optional[str] = None) -> float:
+    """
+    Returns the least-squares slope of the traced memory over the rounds,
+    in bytes per round (the first sample is a warm-up, and is left out)
+    :param samples: the samples, in order
+    :param module: the module whose memory is looked at (all if None)
+    :return: the growth in bytes per round
+    """
+    samples = samples[1:]
+    if len(samples) < 2:
+        return 0.0
+    values = [sample.traced if module is None else sample.modules[module]
+              for sample in samples]
+    mean_round = sum(sample.round for sample in samples) / len(samples)
+    mean_value = sum(values) / len(values)
+    covariance = sum((sample.round - mean_round) * (value - mean_value)
+                     for sample, value in zip(samples, values))
+    variance = sum((sample.round - mean_round) ** 2 for sample in samples)
+    return covariance / variance
+
+
+def run_soak(args: Namespace, bot_name: str, rounds: int,
+             interval: int = SAMPLE_INTERVAL,
+             seed: str = '0') -> List[MemorySample]:
+    """
+    Plays games of a bot, one after the other, until 'rounds' rounds were
+    played, sampling the memory every 'interval' rounds
+    :param args: the arguments of the 'snake game' (its rounds limit is
+                 ignored)
+    :param bot_name: one of 'bots.BOTS'
+    :return: the samples
+    """
+    sampler = MemorySampler(interval)
+    tracemalloc.start(TRACEBACK_FRAMES)
+    try:
+        game = 0
+        while sampler.rounds < rounds:
+            game_args = Namespace(**vars(args))
+            game_args.rounds = rounds - sampler.rounds + 1
+            run_headless_game(game_args, bot=BOTS[bot_name](),
+                              rng=game_utils.RandomContext(f'{seed}.{game}'),
+                              observers=[sampler])
+            game += 1
+    finally:
+        tracemalloc.stop()
+    return sampler.samples
+
+
+def print_report(samples: List[MemorySample], budget: float) -> bool:
+    """
+    Prints the samples, the growth per round and the bytes per snake segment
+    and per entity
+    :return: True if the growth is within the budget, False otherwise
+    """
+    columns = MODULES + [OTHER_MODULE]
+    widths = [max(9, len(module) + 3) for module in columns]
+    print(f'{"round":>8} {"length":>7} {"walls":>6} {"apples":>7} '
+          f'{"traced KB":>10} {"rss KB":>9} ' +
+          ' '.join(f'{module + " KB":>{width}}'
+                   for module, width in zip(columns, widths)))
+    for sample in samples:
+        print(f'{sample.round:>8} {sample.length:>7} {sample.walls:>6} '
+              f'{sample.apples:>7} {sample.traced / 1024:>10.1f} '
+              f'{sample.rss / 1024:>9.0f} ' +
+              ' '.join(f'{sample.modules[module] / 1024:>{width}.1f}'
+                       for module, width in zip(columns, widths)))
+    if not samples:
+        print('no samples, play more rounds than the sample interval')
+        return True
+
+    last = samples[-1]
+    # the walls' cells are created by the walls, and the apples by the board
+    entities = last.walls + last.apples
+    growth = get_growth_per_round(samples)
+    print(f'\nsnake:    {last.modules["snake"] / max(1, last.length):.0f} '
+          f'bytes per segment')
+    entity_bytes = last.modules["wall"] + last.modules["board"]
+    print(f'entities: {entity_bytes / max(1, entities):.0f} bytes per wall '
+          f'or apple (board and wall modules)')
+    print(f'growth:   {growth:.1f} bytes per round (budget {budget:g}), ' +
+          ', '.join(f'{module} {get_growth_per_round(samples, module):.1f}'
+                    for module in columns))
+    if growth > budget:
+        print('FAILED: the memory grows faster than the budget')
+        return False
+    return True
+
+
+def parse_args(argv: List[str]) -> Namespace:
+    parser = argparse.ArgumentParser(
+        prog='soak.py',
+        description='Plays long bot games while sampling the memory, and '
+                    'fails if it grows faster than a budget.',
+    )
+    parser.add_argument('-n', '--rounds', type=int, default=ROUNDS,
+                        help='Number of rounds to play (over as many games '
+                             'as needed)')
+    parser.add_argument('-i', '--interval', type=int,
+                        default=SAMPLE_INTERVAL,
+                        help='Rounds between memory samples')
+    parser.add_argument('--budget', type=float, default=GROWTH_BUDGET,
+                        help='Allowed traced memory growth in bytes per '
+                             'round')
+    parser.add_argument('-b', '--bot', choices=sorted(BOTS),
+                        default='search', help='The bot playing the games')
+    parser.add_argument('-s', '--seed', default='0')
+    parser.add_argument('-x', '--width', type=int, default=50)
+    parser.add_argument('-y', '--height', type=int, default=50)
+    parser.add_argument('-a', '--apples', type=int, default=10)
+    parser.add_argument('-w', '--walls', type=int, default=5)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    run_args = parse_args(sys.argv[1:])
+    soak_samples = run_soak(
+        make_game_args(run_args.width, run_args.height, run_args.apples,
+                       run_args.walls),
+        run_args.bot, run_args.rounds, run_args.interval, run_args.seed)
+    sys.exit(0 if print_report(soak_samples, run_args.budget) else 1)
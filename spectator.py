@@ -0,0 +1,299 @@
+"""
+FILE: spectator.py
+DESCRIPTION: a spectator wall for watching many 'snake' games at once. The
+boards are tiled in a single Tk window, at a reduced cell size, and redrawn
+together at a fixed frame rate. Games feed it frames through bounded
+queues, and a frame which the wall is not ready for is dropped rather than
+making the game wait.
+run:
+> python spectator.py [optional arguments|--help]
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import sys
+import math
+import queue
+import time
+import argparse
+import multiprocessing
+import tkinter as tki
+from argparse import Namespace
+from typing import Any, Dict, List, Optional, Tuple
+
+import game_utils
+from board import Board
+from bots import BOTS
+from headless_display import make_game_args, run_headless_game
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+CELL_SIZE = 4
+FRAME_RATE = 20
+TITLE_HEIGHT = 14
+TILE_PADDING = 6
+FINAL_FRAME_TIMEOUT = 1.0
+
+# (round, score, is over, frames dropped since the last frame,
+#  {(x, y): color})
+Frame = Tuple[int, int, bool, int, Dict[Tuple[int, int], str]]
+
+
+###############################################################################
+#                           Class & Inner Functions                           #
+###############################################################################
+class BoardFeed:
+    """
+    A game loop observer which sends frames of a board to a spectator wall.
+    It takes at most one frame per frame interval, and only when the wall has
+    taken the previous one, so a game never waits for the wall (apart from
+    its final frame)
+    """
+
+    def __init__(self, frames: Any, frame_rate: float = FRAME_RATE) -> None:
+        """
+        :param frames: a queue of a single frame, shared with the wall
+        :param frame_rate: the maximal number of frames per second
+        """
+        self.frames = frames
+        self.interval = 1 / frame_rate
+        self.__next_time = 0.0
+        self.__dropped = 0
+
+    def __call__(self, board: Board) -> None:
+        """
+        Sends a frame of the round which has just ended, if one is due
+        :param board: the game's Board
+        :return: None
+        """
+        now = time.perf_counter()
+        if not board.is_over:
+            if now < self.__next_time or self.frames.full():
+                self.__dropped += 1
+                return
+        self.__next_time = now + self.interval
+
+        # later cells are drawn on top, as in 'Board.draw_board'
+        cells = {cell.get_location(): cell.get_color()
+                 for cell in board.get_all_cells()
+                 if board.is_coord_in_board_boundaries(cell.get_location())}
+        frame = (board.get_rounds(), board.get_score(), board.is_over,
+                 self.__dropped, cells)
+        try:
+            if board.is_over:
+                self.frames.put(frame, timeout=FINAL_FRAME_TIMEOUT)
+            else:
+                self.frames.put_nowait(frame)
+            self.__dropped = 0
+        except queue.Full:
+            self.__dropped += 1
+
+
+class SpectatorWall:
+    """
+    A single Tk window showing a tile per watched board
+    """
+
+    def __init__(self, columns: int = 0, cell_size: int = CELL_SIZE,
+                 frame_rate: float = FRAME_RATE) -> None:
+        """
+        :param columns: the number of tiles per row (0 for a square layout)
+        :param cell_size: the size of a board cell, in pixels
+        :param frame_rate: the number of redraws per second
+        """
+        self.columns = columns
+        self.cell_size = cell_size
+        self.frame_rate = frame_rate
+        methods = multiprocessing.get_all_start_methods()
+        self.__context = multiprocessing.get_context(
+            'fork' if 'fork' in methods else 'spawn')
+        self.__tiles: List[Dict[str, Any]] = []
+        self.__processes: List[Any] = []
+        self._root: Optional[tki.Tk] = None
+        self._canvas: Optional[tki.Canvas] = None
+
+    def add_board(self, title: str, width: int, height: int) -> BoardFeed:
+        """
+        Adds a tile for a board
+        :param title: the tile's title
+        :param width: the board's width
+        :param height: the board's height
+        :return: the observer to pass to the board's game loop (in this or
+                 another process)
+        """
+        frames = self.__context.Queue(maxsize=1)
+        self.__tiles.append({
+            'title': title, 'width': width, 'height': height,
+            'frames': frames, 'origin': (0, 0), 'title_item': None,
+            'drawn': {}, 'round': 0, 'score': 0, 'is_over': False,
+            'frames_shown': 0, 'frames_dropped': 0})
+        return BoardFeed(frames, self.frame_rate)
+
+    def watch_games(self, bot_name: str, seeds: List[str],
+                    args: Namespace) -> None:
+        """
+        Adds a tile per seed, and plays the bot's games in background
+        processes (started with the wall)
+        :param bot_name: one of 'bots.BOTS'
+        :param seeds: the games' seeds
+        :param args: the arguments of the 'snake game'
+        :return: None
+        """
+        for seed in seeds:
+            feed = self.add_board(f'{bot_name} #{seed}', args.width,
+                                  args.height)
+            self.__processes.append(self.__context.Process(
+                target=play_watched_game, args=(bot_name, seed, args, feed),
+                daemon=True))
+
+    def start(self) -> None:
+        """
+        Starts the watched games, opens the window and runs the GUI
+        """
+        # the games are started first, so the processes are not forked with
+        # the window's Tk interpreter in them
+        for process in self.__processes:
+            process.start()
+        try:
+            self.__init_window()
+            self._root.after(0, self._update)
+            self._root.mainloop()
+        finally:
+            for process in self.__processes:
+                if process.is_alive():
+                    process.terminate()
+
+    def __init_window(self) -> None:
+        """
+        Creates the canvas and lays the tiles out on it
+        """
+        columns = self.columns or max(1, math.ceil(math.sqrt(
+            len(self.__tiles))))
+        tile_width = max([tile['width'] for tile in self.__tiles] + [1]) * \
+            self.cell_size + TILE_PADDING
+        tile_height = max([tile['height'] for tile in self.__tiles] + [1]) \
+            * self.cell_size + TITLE_HEIGHT + TILE_PADDING
+        rows = max(1, math.ceil(len(self.__tiles) / columns))
+
+        self._root = tki.Tk()
+        self._root.title('Snake - spectator')
+        self._canvas = tki.Canvas(self._root, bg="gray80",
+                                  width=columns * tile_width,
+                                  height=rows * tile_height)
+        self._canvas.pack()
+        self._root.resizable(False, False)
+
+        for index, tile in enumerate(self.__tiles):
+            row, column = divmod(index, columns)
+            left, top = column * tile_width, row * tile_height
+            tile['origin'] = (left, top + TITLE_HEIGHT)
+            self._canvas.create_rectangle(
+                left, top + TITLE_HEIGHT, left + tile['width'] *
+                self.cell_size, top + TITLE_HEIGHT + tile['height'] *
+                self.cell_size, fill="white", outline="white")
+            tile['title_item'] = self._canvas.create_text(
+                left, top, anchor=tki.NW, font=("Courier", 8),
+                text=tile['title'])
+
+    def _update(self) -> None:
+        """
+        Redraws every tile which got a new frame, then schedules the next
+        redraw
+        """
+        assert self._root is not None
+        start_time = time.perf_counter()
+        for tile in self.__tiles:
+            frame: Optional[Frame] = None
+            try:
+                frame = tile['frames'].get_nowait()
+            except queue.Empty:
+                pass
+            if frame is not None:
+                self._draw_frame(tile, frame)
+        elapsed = time.perf_counter() - start_time
+        delay = max(1, int((1 / self.frame_rate - elapsed) * 1000))
+        self._root.after(delay, self._update)
+
+    def _draw_frame(self, tile: Dict[str, Any], frame: Frame) -> None:
+        """
+        Draws a frame on its tile, changing only the cells which differ from
+        the tile's last frame
+        """
+        assert self._canvas is not None
+        rounds, score, is_over, dropped, cells = frame
+        left, top = tile['origin']
+        size = self.cell_size
+        drawn: Dict[Tuple[int, int], Tuple[str, int]] = tile['drawn']
+
+        for location in [location for location in drawn
+                         if location not in cells]:
+            self._canvas.delete(drawn.pop(location)[1])
+        for (x, y), color in cells.items():
+            current = drawn.get((x, y))
+            if current is None:
+                # the y axis needs to point up
+                cell_top = top + (tile['height'] - 1 - y) * size
+                drawn[x, y] = (color, self._canvas.create_rectangle(
+                    left + x * size, cell_top, left + (x + 1) * size,
+                    cell_top + size, fill=color, outline=color))
+            elif current[0] != color:
+                self._canvas.itemconfigure(current[1], fill=color,
+                                           outline=color)
+                drawn[x, y] = (color, current[1])
+
+        tile['frames_shown'] += 1
+        tile['frames_dropped'] += dropped
+        total = tile['frames_shown'] + tile['frames_dropped']
+        self._canvas.itemconfigure(
+            tile['title_item'],
+            text=f'{tile["title"]}  {score} pts  r{rounds}'
+                 f'{"  OVER" if is_over else ""}  '
+                 f'shown {tile["frames_shown"] / total:.0%}')
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def play_watched_game(bot_name: str, seed: str, args: Namespace,
+                      feed: BoardFeed) -> None:
+    """
+    Plays a bot's game, feeding its frames to a spectator wall
+    """
+    run_headless_game(args, bot=BOTS[bot_name](),
+                      rng=game_utils.RandomContext(seed), observers=[feed])
+
+
+def parse_args(argv: List[str]) -> Namespace:
+    parser = argparse.ArgumentParser(
+        prog='spectator.py',
+        description='Plays many bot games in the background and shows them '
+                    'in a single window.',
+    )
+    parser.add_argument('-g', '--games', type=int, default=16,
+                        help='Number of games (seeds) to watch')
+    parser.add_argument('-b', '--bot', choices=sorted(BOTS),
+                        default='greedy', help='The bot playing the games')
+    parser.add_argument('-x', '--width', type=int, default=40)
+    parser.add_argument('-y', '--height', type=int, default=30)
+    parser.add_argument('-a', '--apples', type=int, default=3)
+    parser.add_argument('-w', '--walls', type=int, default=2)
+    parser.add_argument('-r', '--rounds', type=int, default=-1)
+    parser.add_argument('-c', '--cell-size', type=int, default=CELL_SIZE,
+                        help='Size of a board cell in pixels')
+    parser.add_argument('-f', '--frame-rate', type=float, default=FRAME_RATE,
+                        help='Redraws per second')
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    run_args = parse_args(sys.argv[1:])
+    wall = SpectatorWall(cell_size=run_args.cell_size,
+                         frame_rate=run_args.frame_rate)
+    wall.watch_games(run_args.bot,
+                     [str(seed) for seed in range(run_args.games)],
+                     make_game_args(run_args.width, run_args.height,
+                                    run_args.apples, run_args.walls,
+                                    run_args.rounds))
+    wall.start()
@@ -0,0 +1,248 @@
+"""
+FILE: telemetry.py
+DESCRIPTION: streaming per-round telemetry of 'snake' games. Records are
+buffered in fixed-size column batches, which a background thread writes to
+a compact columnar file, so the game loop never waits on disk. A CSV file
+is written in the columnar format during the game too, and converted when
+the sink is closed (formatting CSV rows while the game runs would take the
+GIL from the game loop for much longer).
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import os
+import csv
+import sys
+import json
+import queue
+import struct
+import threading
+import warnings
+from array import array
+from typing import Any, BinaryIO, Dict, List, Optional, TextIO
+
+from board import Board
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+TELEMETRY_MAGIC = b'PYSNAKE-TELEMETRY\x01'
+TELEMETRY_COLUMNS = ('game', 'round', 'score', 'length', 'walls', 'apples')
+TYPECODE = 'q'
+# the columnar file a CSV file is written to until it is converted
+COLUMNAR_SUFFIX = '.columnar'
+BATCH_SIZE = 4096
+MAX_PENDING_BATCHES = 64
+
+# file layout (columnar):
+#   MAGIC | HEADER length | HEADER (JSON) | batch | batch | ...
+# a batch is its row count, followed by every column's values
+LENGTH = struct.Struct('<I')
+
+
+###############################################################################
+#                           Class & Inner Functions                           #
+###############################################################################
+class TelemetrySink:
+    """
+    A game loop observer which records a telemetry row per round. Can be
+    shared by many games (set 'game_id' before each one) and must be closed
+    to write the last batch
+    """
+
+    def __init__(self, path: str, game_id: int = 0,
+                 batch_size: int = BATCH_SIZE,
+                 file_format: Optional[str] = None) -> None:
+        """
+        Creates a new sink and starts its writer thread
+        :param path: the telemetry file to write
+        :param game_id: the value of the 'game' column
+        :param batch_size: the number of rows per batch
+        :param file_format: 'columnar' or 'csv' (by the path's extension if
+                            None), a CSV file is only written on 'close'
+        """
+        if file_format is None:
+            file_format = 'csv' if path.endswith('.csv') else 'columnar'
+        if file_format not in ('columnar', 'csv'):
+            raise ValueError(f"unknown telemetry format: {file_format}")
+        self.path = path
+        self.game_id = game_id
+        self.batch_size = max(1, batch_size)
+        self.file_format = file_format
+        # the batches (and their rows) the writer thread was too far behind
+        # to take, reported by 'close'
+        self.dropped_batches = 0
+        self.dropped_rows = 0
+
+        self.__columns = self.__new_batch()
+        self.__count = 0
+        self.__closed = False
+        # filled batches go to the writer, which hands them back when written
+        self.__pending: 'queue.Queue[Optional[Any]]' = \
+            queue.Queue(MAX_PENDING_BATCHES)
+        self.__free: 'queue.SimpleQueue[List[array]]' = queue.SimpleQueue()
+        self.__writer = threading.Thread(target=self.__write_batches)
+        self.__writer.daemon = True
+        self.__writer.start()
+
+    def __new_batch(self) -> List[array]:
+        """
+        Allocates the columns of a batch
+        """
+        return [array(TYPECODE, bytes(self.batch_size *
+                                      array(TYPECODE).itemsize))
+                for _ in TELEMETRY_COLUMNS]
+
+    def __call__(self, board: Board) -> None:
+        """
+        Records the round which has just ended
+        :param board: the game's Board
+        :return: None
+        """
+        if self.__closed:
+            return
+        index = self.__count
+        game, rounds, score, length, walls, apples = self.__columns
+        game[index] = self.game_id
+        rounds[index] = board.get_rounds()
+        score[index] = board.get_score()
+        length[index] = board.snake.get_length()
+        walls[index] = len(board.get_walls())
+        apples[index] = len(board.get_apples())
+        self.__count = index + 1
+
+        if self.__count == self.batch_size or board.is_over:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Hands the current batch to the writer thread (without waiting)
+        """
+        if self.__count == 0 or self.__closed:
+            return
+        try:
+            self.__pending.put_nowait((self.__columns, self.__count))
+        except queue.Full:
+            # never block the game loop, the batch is lost
+            self.dropped_batches += 1
+            self.dropped_rows += self.__count
+        else:
+            try:
+                self.__columns = self.__free.get_nowait()
+            except queue.Empty:
+                self.__columns = self.__new_batch()
+        self.__count = 0
+
+    def close(self) -> None:
+        """
+        Writes the last batch, and waits for the writer thread to finish (a
+        CSV file is converted from the columnar file then). Warns if batches
+        were dropped, as the file then misses some rounds
+        """
+        if self.__closed:
+            return
+        self.flush()
+        self.__closed = True
+        self.__pending.put(None)
+        self.__writer.join()
+        if self.file_format == 'csv':
+            columnar_path = self.path + COLUMNAR_SUFFIX
+            with open(self.path, 'w', newline='') as text_file:
+                write_csv(read_telemetry(columnar_path), text_file)
+            os.remove(columnar_path)
+        if self.dropped_batches:
+            warnings.warn(f"{self.path} misses {self.dropped_rows} rows: "
+                          f"{self.dropped_batches} batches were dropped "
+                          f"while the writer thread was behind",
+                          RuntimeWarning)
+
+    def __write_batches(self) -> None:
+        """
+        The writer thread: writes batches until 'close' is called
+        """
+        path = self.path + COLUMNAR_SUFFIX if self.file_format == 'csv' \
+            else self.path
+        with open(path, 'wb') as binary_file:
+            self.__write_header(binary_file)
+            self.__consume(lambda columns, count: self.__write_columns(
+                binary_file, columns, count))
+
+    def __consume(self, write: Any) -> None:
+        """
+        Writes every pending batch, and returns it to the free batches
+        """
+        while True:
+            item = self.__pending.get()
+            if item is None:
+                return
+            columns, count = item
+            write(columns, count)
+            self.__free.put(columns)
+
+    @staticmethod
+    def __write_header(binary_file: BinaryIO) -> None:
+        header = json.dumps({'columns': TELEMETRY_COLUMNS,
+                             'typecode': TYPECODE,
+                             'byteorder': sys.byteorder}).encode()
+        binary_file.write(TELEMETRY_MAGIC)
+        binary_file.write(LENGTH.pack(len(header)))
+        binary_file.write(header)
+
+    @staticmethod
+    def __write_columns(binary_file: BinaryIO, columns: List[array],
+                        count: int) -> None:
+        binary_file.write(LENGTH.pack(count))
+        for column in columns:
+            binary_file.write(memoryview(column)[:count])
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def read_telemetry(path: str) -> Dict[str, array]:
+    """
+    Reads a columnar telemetry file
+    :param path: the telemetry file
+    :return: a dictionary of column name to its values
+    """
+    with open(path, 'rb') as binary_file:
+        if binary_file.read(len(TELEMETRY_MAGIC)) != TELEMETRY_MAGIC:
+            raise ValueError(f"not a telemetry file: {path}")
+        header_length, = LENGTH.unpack(binary_file.read(LENGTH.size))
+        header = json.loads(binary_file.read(header_length))
+        columns = {name: array(header['typecode'])
+                   for name in header['columns']}
+        item_size = array(header['typecode']).itemsize
+
+        while True:
+            raw_count = binary_file.read(LENGTH.size)
+            if len(raw_count) < LENGTH.size:
+                break
+            count, = LENGTH.unpack(raw_count)
+            for name in header['columns']:
+                columns[name].frombytes(binary_file.read(count * item_size))
+
+    if header['byteorder'] != sys.byteorder:
+        for column in columns.values():
+            column.byteswap()
+    return columns
+
+
+def write_csv(columns: Dict[str, array], text_file: TextIO) -> None:
+    """
+    Writes columns (as returned by 'read_telemetry') as CSV
+    """
+    writer = csv.writer(text_file)
+    writer.writerow(list(columns))
+    writer.writerows(zip(*columns.values()))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 2:
+        # convert a columnar telemetry file to CSV
+        write_csv(read_telemetry(sys.argv[1]), sys.stdout)
+    else:
+        print("This script is part of the 'Snake' board game.\n"
+              "You should run:\n"
+              "> python game_display.py [optional arguments|--help]")
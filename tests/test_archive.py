@@ -0,0 +1,146 @@
+"""
+FILE: tests/test_archive.py
+DESCRIPTION: checks that archived games are read back with their
+headers and keys, and replay into the same final boards. A game torn by
+an interrupted writer is left out, and a single recorder records many
+games.
+run:
+> python -m pytest tests
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import os
+import sys
+from argparse import Namespace
+from typing import Callable, List
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+import game_utils  # noqa: E402
+import snake_main  # noqa: E402
+from archive import HEADER, INDEX_SUFFIX, ArchiveReader, ArchiveRecorder, \
+    ArchiveWriter, play_game  # noqa: E402
+from board import Board  # noqa: E402
+from bots import BOTS  # noqa: E402
+from headless_display import HeadlessDisplay, make_game_args  # noqa: E402
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+SEEDS = range(6)
+ROUNDS = 150
+BOT = 'greedy'
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def play_bot_game(board: Board, args: Namespace,
+                  observers: List[Callable[[Board], None]]) -> None:
+    """
+    Plays a headless game of the bot on a board
+    """
+    bot = BOTS[BOT]()
+    snake_main.main_loop(HeadlessDisplay(lambda: bot(board)), args,
+                         board=board, observers=observers)
+
+
+def test_archive_round_trip(tmp_path) -> None:
+    path = str(tmp_path / 'games.arc')
+    args = make_game_args(width=20, height=20, apples=3, walls=2,
+                          rounds=ROUNDS)
+    games = [play_game((BOT, str(seed), args)) for seed in SEEDS]
+    with ArchiveWriter(path) as writer:
+        for header, keys in games:
+            writer.append(header, keys)
+
+    with ArchiveReader(path) as reader:
+        assert len(reader) == len(games)
+        for game, (header, keys) in enumerate(games):
+            assert reader.get_header(game) == header._replace(
+                keys_length=len(keys))
+            board = reader.replay(game)
+            assert (board.get_score(), board.get_rounds()) == \
+                (header.score, header.rounds)
+        assert [game for game, _ in reader.iter_headers()] == \
+            list(range(len(games)))
+
+
+def test_archive_recorder_records_many_games(tmp_path) -> None:
+    path = str(tmp_path / 'games.arc')
+    args = make_game_args(width=20, height=20, apples=3, walls=2,
+                          rounds=ROUNDS)
+    with ArchiveWriter(path) as writer:
+        recorder = ArchiveRecorder(writer, args)
+        for seed in SEEDS:
+            board = Board(rng=game_utils.RandomContext(str(seed)), width=20,
+                          height=20)
+            play_bot_game(board, args, [recorder])
+        # the last game was appended already
+        with pytest.raises(ValueError):
+            recorder(board)
+    with ArchiveReader(path) as reader:
+        assert len(reader) == len(SEEDS)
+        for game, seed in enumerate(SEEDS):
+            header, keys = play_game((BOT, str(seed), args))
+            assert reader.get_header(game) == header._replace(
+                keys_length=len(keys))
+            with reader.get_key_codes(game) as codes:
+                assert bytes(codes) == keys
+
+
+def test_archive_header_holds_large_rng_blocks(tmp_path) -> None:
+    path = str(tmp_path / 'games.arc')
+    header, keys = play_game((BOT, '0', make_game_args(
+        width=20, height=20, apples=3, walls=2, rounds=ROUNDS)))
+    header = header._replace(rng_block_size=1 << 20)
+    with ArchiveWriter(path) as writer:
+        writer.append(header, keys)
+    with ArchiveReader(path) as reader:
+        assert reader.get_header(0).rng_block_size == 1 << 20
+
+    # an archive of another layout is not appended to
+    with open(path, 'r+b') as data_file:
+        data_file.write(b'PYSNAKE-ARCHIVE\x01')
+    with pytest.raises(ValueError):
+        ArchiveWriter(path)
+
+
+def test_archive_torn_append(tmp_path) -> None:
+    path = str(tmp_path / 'games.arc')
+    args = make_game_args(width=20, height=20, apples=3, walls=2,
+                          rounds=ROUNDS)
+    games = [play_game((BOT, str(seed), args)) for seed in SEEDS]
+    with ArchiveWriter(path) as writer:
+        for header, keys in games[:3]:
+            writer.append(header, keys)
+    # a writer interrupted in the middle of appending a game's keys, and of
+    # writing the next game's offset
+    header, keys = games[3]
+    with open(path, 'ab') as data_file:
+        data_file.write(HEADER.pack(*header._replace(
+            seed=header.seed.encode(), keys_length=len(keys), cause=0)))
+        data_file.write(keys[:len(keys) // 2])
+    with open(path + INDEX_SUFFIX, 'ab') as index_file:
+        index_file.write(b'\x01\x02\x03')
+
+    with ArchiveReader(path) as reader:
+        assert len(reader) == 3
+        assert [header for _, header in reader.iter_headers()] == \
+            [reader.get_header(game) for game in range(3)]
+
+    with ArchiveWriter(path) as writer:
+        for header, keys in games[3:]:
+            writer.append(header, keys)
+    with ArchiveReader(path) as reader:
+        assert len(reader) == len(games)
+        for game, header in reader.iter_headers():
+            assert header == games[game][0]._replace(
+                keys_length=len(games[game][1]))
+            with reader.get_key_codes(game) as codes:
+                assert bytes(codes) == games[game][1]
@@ -0,0 +1,95 @@
+"""
+FILE: tests/test_checkpoint.py
+DESCRIPTION: checks that a game resumed from its last checkpoint, after a
+crash, continues exactly as the uninterrupted game.
+run:
+> python -m pytest tests
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import os
+import sys
+from argparse import Namespace
+from typing import Any, Callable, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+import checkpoint  # noqa: E402
+import game_utils  # noqa: E402
+import snake_main  # noqa: E402
+from board import Board  # noqa: E402
+from bots import BOTS  # noqa: E402
+from headless_display import HeadlessDisplay, make_game_args  # noqa: E402
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+BOT = 'greedy'
+# a seed the bot survives past the crash with
+SEED = '6'
+CHECKPOINT_INTERVAL = 50
+CRASH_ROUND = 237
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def play_bot_game(board: Board, args: Namespace,
+                  observers: List[Callable[[Board], None]],
+                  is_resumed: bool = False) -> None:
+    """
+    Plays a headless game of the bot on a board
+    """
+    bot = BOTS[BOT]()
+    snake_main.main_loop(HeadlessDisplay(lambda: bot(board)), args,
+                         board=board, observers=observers,
+                         is_resumed=is_resumed)
+
+
+def record_fingerprints() -> Tuple[List[Tuple[int, int, int]],
+                                  Callable[[Board], Any]]:
+    """
+    Returns a list, and an observer appending (round, hash, score) to it
+    """
+    fingerprints: List[Tuple[int, int, int]] = []
+    return fingerprints, lambda board: fingerprints.append(
+        (board.get_rounds(), board.get_zobrist_hash(), board.get_score()))
+
+
+def test_checkpoint_resumes_the_game(tmp_path) -> None:
+    args = make_game_args(width=30, height=25, apples=6, walls=4,
+                          rounds=600)
+    fingerprints, record = record_fingerprints()
+    play_bot_game(Board(rng=game_utils.RandomContext(SEED), width=30,
+                        height=25), args, [record])
+    expected = {fingerprint[0]: fingerprint for fingerprint in fingerprints}
+    assert max(expected) > CRASH_ROUND
+
+    class Crash(Exception):
+        pass
+
+    def crash(board: Board) -> None:
+        if board.get_rounds() == CRASH_ROUND:
+            raise Crash
+
+    path = str(tmp_path / 'game.ckpt')
+    checkpointer = checkpoint.Checkpointer(path, args, CHECKPOINT_INTERVAL,
+                                           {'bot': BOT, 'seed': SEED})
+    try:
+        play_bot_game(Board(rng=game_utils.RandomContext(SEED), width=30,
+                            height=25), args, [checkpointer, crash])
+    except Crash:
+        pass
+    checkpointer.close()
+
+    board, resumed_args, metadata = checkpoint.load_checkpoint(path)
+    assert board.get_rounds() == CRASH_ROUND - \
+        CRASH_ROUND % CHECKPOINT_INTERVAL
+    assert metadata == {'bot': BOT, 'seed': SEED}
+    resumed, record = record_fingerprints()
+    play_bot_game(board, resumed_args, [record], is_resumed=True)
+    assert resumed[-1][0] == max(expected)
+    assert resumed == [expected[fingerprint[0]] for fingerprint in resumed]
@@ -0,0 +1,57 @@
+"""
+FILE: tests/test_equivalence.py
+DESCRIPTION: runs seeds through the equivalence harness (many of them against
+the full-scan baseline rules), and checks that it finds a divergence.
+run:
+> python -m pytest tests
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import os
+import sys
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+import equivalence  # noqa: E402
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+SEEDS = range(6)
+ROUNDS = 150
+# the incremental rule checks diverge from full scans in rare rounds only
+BASELINE_SEEDS = range(200)
+BASELINE_ROUNDS = 300
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def divergent_engine(case: equivalence.Case) -> \
+        List[equivalence.RoundFingerprint]:
+    """
+    Plays a case by the reference rules, but reports a wrong first score
+    """
+    fingerprints = equivalence.reference_engine(case)
+    fingerprints[0] = fingerprints[0]._replace(score=-1)
+    return fingerprints
+
+
+def test_snapshot_engine_matches_reference() -> None:
+    assert equivalence.check_engines('snapshot', SEEDS, ROUNDS,
+                                     workers=1) == []
+
+
+def test_reference_matches_baseline() -> None:
+    assert equivalence.check_engines('baseline', BASELINE_SEEDS,
+                                     BASELINE_ROUNDS, workers=1) == []
+
+
+def test_divergence_is_found() -> None:
+    divergences = equivalence.check_engines(
+        f'{__name__}:divergent_engine', SEEDS[:2], ROUNDS, workers=1)
+    assert [divergence.round for divergence in divergences] == [0, 0]
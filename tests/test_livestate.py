@@ -0,0 +1,112 @@
+"""
+FILE: tests/test_livestate.py
+DESCRIPTION: checks that the live export of a game, which writes only the
+cells that changed, holds the board of every round.
+run:
+> python -m pytest tests
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import os
+import sys
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+import game_utils  # noqa: E402
+from board import Board  # noqa: E402
+from bots import BOTS  # noqa: E402
+from headless_display import make_game_args, run_headless_game  # noqa: E402
+from livestate import LiveStateExporter, LiveStateReader  # noqa: E402
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+BOT = 'greedy'
+SEEDS = ['1', '3']
+ROUNDS = 300
+WIDTH = 30
+HEIGHT = 25
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def get_cells(board: Board) -> bytes:
+    """
+    Returns the cell codes of a board, computed from all of its cells (rows
+    from the top)
+    """
+    cells = bytearray(board.width * board.height)
+
+    def set_code(location: Tuple[int, int], code: int) -> None:
+        col, row = location
+        if board.is_coord_in_board_boundaries(location):
+            cells[(board.height - 1 - row) * board.width + col] = code
+
+    for apple in board.get_apples():
+        set_code(apple.get_location(), game_utils.CELL_APPLE)
+    if not board.is_debug:
+        for location in board.snake.get_snake_cells_locations():
+            set_code(location, game_utils.CELL_SNAKE)
+        set_code(board.snake.get_head_location(), game_utils.CELL_HEAD)
+    for wall in board.get_walls():
+        for cell in wall.wall_cells:
+            set_code(cell.get_location(), game_utils.CELL_WALL)
+    return bytes(cells)
+
+
+def test_export_matches_board() -> None:
+    exporter = LiveStateExporter()
+    rounds: List[int] = []
+    try:
+        for is_fill in (False, True):
+            args = make_game_args(width=WIDTH, height=HEIGHT, apples=8,
+                                  walls=6, rounds=ROUNDS, fill=is_fill)
+            for seed in SEEDS:
+                reader = None
+
+                def check_export(board: Board) -> None:
+                    nonlocal reader
+                    exporter(board)
+                    if reader is None:
+                        reader = LiveStateReader(exporter.name)
+                    header, cells = reader.read()
+                    assert header.round == board.get_rounds()
+                    assert cells == get_cells(board), board.get_rounds()
+                    rounds.append(header.round)
+
+                # each game is exported over the last one
+                try:
+                    run_headless_game(args, bot=BOTS[BOT](),
+                                      rng=game_utils.RandomContext(seed),
+                                      observers=[check_export])
+                finally:
+                    if reader is not None:
+                        reader.close()
+    finally:
+        exporter.close()
+    # the games are long
+    assert len(rounds) > 2 * len(SEEDS) * ROUNDS * 3 // 4
+
+
+def test_export_after_set_state() -> None:
+    args = make_game_args(width=WIDTH, height=HEIGHT, apples=8, walls=6,
+                          rounds=200)
+    states: List[Dict[str, Any]] = []
+    board = run_headless_game(
+        args, bot=BOTS[BOT](), rng=game_utils.RandomContext('4'),
+        observers=[lambda observed: states.append(observed.get_state())])
+    exporter = LiveStateExporter()
+    try:
+        exporter(board)
+        with LiveStateReader(exporter.name) as reader:
+            # back to an earlier round of the same board
+            board.set_state(states[len(states) // 2])
+            exporter(board)
+            assert reader.read()[1] == get_cells(board)
+    finally:
+        exporter.close()
@@ -0,0 +1,87 @@
+"""
+FILE: tests/test_placement.py
+DESCRIPTION: checks that the walls and apples added to a board, one at a
+time or filled in batches, never overlap each other or the snake.
+run:
+> python -m pytest tests
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import os
+import sys
+from typing import Any, Dict, List, Set, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+import game_utils  # noqa: E402
+from board import Board  # noqa: E402
+from bots import BOTS  # noqa: E402
+from headless_display import make_game_args, run_headless_game  # noqa: E402
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+BOT = 'greedy'
+SEEDS = [str(seed) for seed in range(6)]
+ROUNDS = 300
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def get_entity_cells(board: Board, ids: Set[int]) -> \
+        List[Tuple[int, int]]:
+    """
+    Returns the cells of the board's walls and apples whose id is in 'ids'
+    """
+    return [cell.get_location() for wall in board.get_walls()
+            if id(wall) in ids for cell in wall.wall_cells] + \
+        [apple.get_location() for apple in board.get_apples()
+         if id(apple) in ids]
+
+
+def test_fill_never_overlaps() -> None:
+    for is_debug in (False, True):
+        for seed in SEEDS:
+            board = Board(is_debug=is_debug,
+                          rng=game_utils.RandomContext(seed),
+                          width=20, height=20)
+            # more than fit, so many candidates are rejected
+            board.fill_walls(200)
+            board.fill_apples(200)
+            cells = get_entity_cells(
+                board, {id(entity) for entity in
+                        board.get_walls() + board.get_apples()})
+            assert len(cells) == len(set(cells))
+            if not is_debug:
+                assert not set(cells) & \
+                    board.snake.get_snake_cells_locations()
+
+
+def test_added_entities_never_overlap() -> None:
+    for is_fill in (False, True):
+        args = make_game_args(width=30, height=25, apples=20, walls=15,
+                              rounds=ROUNDS, fill=is_fill)
+        for seed in SEEDS:
+            # (kept, so that their ids are not reused)
+            placed: Dict[int, Any] = {}
+
+            def check_new_entities(board: Board) -> None:
+                entities = board.get_walls() + board.get_apples()
+                new_ids = {id(entity) for entity in entities} - placed.keys()
+                placed.update((id(entity), entity) for entity in entities)
+                new_cells = get_entity_cells(board, new_ids)
+                other_cells = get_entity_cells(
+                    board, {id(entity) for entity in entities} - new_ids)
+                # (walls may have moved onto other walls and apples since)
+                assert len(new_cells) == len(set(new_cells))
+                assert not set(new_cells) & set(other_cells)
+                assert not set(new_cells) & \
+                    board.snake.get_snake_cells_locations()
+
+            run_headless_game(args, bot=BOTS[BOT](),
+                              rng=game_utils.RandomContext(seed),
+                              observers=[check_new_entities])
@@ -0,0 +1,61 @@
+"""
+FILE: tests/test_replay.py
+DESCRIPTION: checks that seeking a replay rebuilds the board of the live
+game in every round, on both sides of its keyframes.
+run:
+> python -m pytest tests
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import json
+import os
+import sys
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+import game_utils  # noqa: E402
+from board import Board  # noqa: E402
+from bots import BOTS  # noqa: E402
+from headless_display import make_game_args, run_headless_game  # noqa: E402
+from replay import ReplayReader, ReplayRecorder  # noqa: E402
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+BOT = 'greedy'
+SEEDS = ['4', '6']
+ROUNDS = 400
+KEYFRAME_INTERVAL = 25
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def get_state(board: Board) -> Dict[str, Any]:
+    """
+    Returns a board's state as it is stored (tuples become lists)
+    """
+    return json.loads(json.dumps(board.get_state()))
+
+
+def test_seek_rebuilds_every_round(tmp_path) -> None:
+    args = make_game_args(width=30, height=25, apples=6, walls=4,
+                          rounds=ROUNDS)
+    for seed in SEEDS:
+        path = str(tmp_path / f'{seed}.replay')
+        states: List[Dict[str, Any]] = []
+        run_headless_game(
+            args, bot=BOTS[BOT](), rng=game_utils.RandomContext(seed),
+            observers=[ReplayRecorder(path, args, KEYFRAME_INTERVAL),
+                       lambda board: states.append(get_state(board))])
+        # the game outlives a few keyframes
+        assert len(states) > 4 * KEYFRAME_INTERVAL
+
+        with ReplayReader(path) as reader:
+            assert reader.get_rounds() == len(states) - 1
+            for round_num, state in enumerate(states):
+                assert get_state(reader.seek(round_num)) == state, round_num
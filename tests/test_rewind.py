@@ -0,0 +1,87 @@
+"""
+FILE: tests/test_rewind.py
+DESCRIPTION: checks that seeking the rewind buffer rebuilds the board of the
+live game in every round it holds, on both sides of its snapshots, while the
+game goes on.
+run:
+> python -m pytest tests
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import json
+import os
+import sys
+from typing import Any, Dict, List
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+import game_utils  # noqa: E402
+from board import Board  # noqa: E402
+from bots import BOTS  # noqa: E402
+from headless_display import make_game_args, run_headless_game  # noqa: E402
+from rewind import RewindBuffer  # noqa: E402
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+BOT = 'greedy'
+SEEDS = ['4', '6']
+ROUNDS = 300
+CAPACITY = 40
+SNAPSHOT_INTERVAL = 8
+CHECK_INTERVAL = 45
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def get_state(board: Board) -> Dict[str, Any]:
+    """
+    Returns a board's state as plain data (tuples become lists)
+    """
+    return json.loads(json.dumps(board.get_state()))
+
+
+def check_buffer(rewind: RewindBuffer,
+                 states: List[Dict[str, Any]]) -> None:
+    """
+    Checks every round the buffer holds against the live game's states
+    """
+    first_round, last_round = rewind.get_first_round(), \
+        rewind.get_last_round()
+    assert last_round == len(states) - 1
+    assert last_round - first_round >= min(last_round, CAPACITY)
+    for round_num in range(first_round, last_round + 1):
+        assert get_state(rewind.seek(round_num)) == states[round_num], \
+            round_num
+
+    with pytest.raises(ValueError):
+        rewind.seek(first_round - 1)
+    with pytest.raises(ValueError):
+        rewind.seek(last_round + 1)
+
+
+def test_seek_rebuilds_every_round() -> None:
+    args = make_game_args(width=30, height=25, apples=6, walls=4,
+                          rounds=ROUNDS)
+    for seed in SEEDS:
+        rewind = RewindBuffer(args, CAPACITY, SNAPSHOT_INTERVAL)
+        states: List[Dict[str, Any]] = []
+
+        def observe(board: Board) -> None:
+            states.append(get_state(board))
+            # the buffer is checked as it drops its oldest rounds, too
+            if board.get_rounds() % CHECK_INTERVAL == 0:
+                check_buffer(rewind, states)
+
+        run_headless_game(args, bot=BOTS[BOT](),
+                          rng=game_utils.RandomContext(seed),
+                          observers=[rewind, observe])
+        # the game outlives the buffer's capacity
+        assert len(states) > 2 * CAPACITY
+        check_buffer(rewind, states)
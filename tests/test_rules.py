@@ -0,0 +1,135 @@
+"""
+FILE: tests/test_rules.py
+DESCRIPTION: checks that the end-of-round rule checks, which only look at the
+cells that changed, give the results of full scans of every snake cell, wall
+and apple (how the rules used to be checked) in every round of bot games.
+run:
+> python -m pytest tests
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import os
+import sys
+from typing import List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+import game_utils  # noqa: E402
+import snake_main  # noqa: E402
+from board import Board  # noqa: E402
+from bots import BOTS  # noqa: E402
+from headless_display import make_game_args, run_headless_game  # noqa: E402
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+BOT = 'greedy'
+SEEDS = [str(seed) for seed in range(12)]
+ROUNDS = 600
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def scan_snake_wall_collision(board: Board) -> \
+        Tuple[bool, Optional[Tuple[int, int]]]:
+    """
+    Checks every wall against the snake
+    """
+    for wall in board.get_walls():
+        collision, location = board.snake.is_collided(wall.wall_cells)
+        if collision:
+            return collision, location
+    return False, None
+
+
+def scan_crushed_apples(board: Board) -> List[Tuple[int, int]]:
+    """
+    Returns the locations of the apples left after checking every apple
+    against every wall, removing while iterating
+    """
+    apples = list(board.get_apples())
+    for apple in apples:
+        for wall in board.get_walls():
+            if apple.get_location() in wall.get_wall_cells_locations() and \
+                    apple in apples:
+                apples.remove(apple)
+    return [apple.get_location() for apple in apples]
+
+
+def scan_apple_at_head(board: Board) -> Optional[Tuple[int, int]]:
+    """
+    Returns the location of the apple the snake's head is on, checking every
+    apple
+    """
+    for apple in board.get_apples():
+        if board.snake.compare_to_head(apple.get_location()):
+            return apple.get_location()
+    return None
+
+
+def scan_snake_out_boundaries(board: Board) -> bool:
+    """
+    Checks every snake cell against the board's boundaries
+    """
+    return any(not board.is_coord_in_board_boundaries(cell.get_location())
+               for cell in board.snake.get_snake_cells())
+
+
+def test_checks_match_full_scans(monkeypatch) -> None:
+    cut_rounds: List[int] = []
+    crushed_rounds: List[int] = []
+    is_snake_cut_by_wall = snake_main.is_snake_cut_by_wall
+    interaction_walls_apples = snake_main.interaction_walls_apples
+    interaction_snake_apples = snake_main.interaction_snake_apples
+
+    def checked_is_snake_cut_by_wall(board: Board) -> \
+            Tuple[bool, Optional[Tuple[int, int]]]:
+        expected = scan_snake_wall_collision(board)
+        result = is_snake_cut_by_wall(board)
+        assert result == expected, board.get_rounds()
+        if result[0] and not board.snake.compare_to_head(result[1]):
+            cut_rounds.append(board.get_rounds())
+        return result
+
+    def checked_interaction_walls_apples(board: Board) -> None:
+        expected = scan_crushed_apples(board)
+        apples_count = len(board.get_apples())
+        interaction_walls_apples(board)
+        assert [apple.get_location() for apple in board.get_apples()] == \
+            expected, board.get_rounds()
+        if len(expected) < apples_count:
+            crushed_rounds.append(board.get_rounds())
+
+    def checked_interaction_snake_apples(board: Board) -> None:
+        apple = board.get_apple_at(board.snake.get_head_location())
+        assert (apple and apple.get_location()) == \
+            scan_apple_at_head(board), board.get_rounds()
+        interaction_snake_apples(board)
+
+    def check_snake_out_boundaries(board: Board) -> None:
+        assert board.is_snake_out_boundaries() == \
+            scan_snake_out_boundaries(board), board.get_rounds()
+
+    monkeypatch.setattr(snake_main, 'is_snake_cut_by_wall',
+                        checked_is_snake_cut_by_wall)
+    monkeypatch.setattr(snake_main, 'interaction_walls_apples',
+                        checked_interaction_walls_apples)
+    monkeypatch.setattr(snake_main, 'interaction_snake_apples',
+                        checked_interaction_snake_apples)
+
+    args = make_game_args(width=30, height=25, apples=8, walls=6,
+                          rounds=ROUNDS)
+    for seed in SEEDS:
+        run_headless_game(args, bot=BOTS[BOT](),
+                          rng=game_utils.RandomContext(seed),
+                          observers=[check_snake_out_boundaries])
+
+    # the games cut tails late, in rounds where the walls moved, and crushed
+    # apples, also ones skipped in the round a wall moved onto them
+    assert max(cut_rounds) > ROUNDS // 2
+    assert any(round_num % 2 == 0 for round_num in cut_rounds)
+    assert any(round_num % 2 == 1 for round_num in crushed_rounds)
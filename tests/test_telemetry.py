@@ -0,0 +1,83 @@
+"""
+FILE: tests/test_telemetry.py
+DESCRIPTION: checks that the telemetry files hold a row per round, and that
+the rows dropped while the writer thread was behind are reported.
+run:
+> python -m pytest tests
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import csv
+import os
+import sys
+import threading
+import warnings
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+import game_utils  # noqa: E402
+import telemetry  # noqa: E402
+from headless_display import make_game_args, run_headless_game  # noqa: E402
+from telemetry import TelemetrySink, read_telemetry  # noqa: E402
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+ROUNDS = 300
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def play_game(sink: TelemetrySink) -> None:
+    # debug mode keeps the game alive for the requested number of rounds
+    run_headless_game(make_game_args(width=30, height=30, apples=5, walls=3,
+                                     rounds=ROUNDS, debug=True),
+                      rng=game_utils.RandomContext(0), observers=[sink])
+
+
+def test_every_round_is_written(tmp_path) -> None:
+    columnar = TelemetrySink(str(tmp_path / 'telemetry.bin'), batch_size=64)
+    text = TelemetrySink(str(tmp_path / 'telemetry.csv'), batch_size=64)
+    play_game(columnar)
+    play_game(text)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        columnar.close()
+        text.close()
+
+    columns = read_telemetry(columnar.path)
+    assert list(columns['round']) == list(range(ROUNDS + 1))
+    with open(text.path, newline='') as text_file:
+        rows = list(csv.reader(text_file))
+    assert rows[0] == list(telemetry.TELEMETRY_COLUMNS)
+    assert rows[1:] == [[str(value) for value in row]
+                        for row in zip(*columns.values())]
+
+
+def test_dropped_rows_are_reported(tmp_path, monkeypatch) -> None:
+    # the writer thread is stalled until the game is over
+    release = threading.Event()
+    write_columns = TelemetrySink._TelemetrySink__write_columns
+
+    def stalled_write_columns(*args) -> None:
+        release.wait()
+        write_columns(*args)
+
+    monkeypatch.setattr(TelemetrySink, '_TelemetrySink__write_columns',
+                        staticmethod(stalled_write_columns))
+    monkeypatch.setattr(telemetry, 'MAX_PENDING_BATCHES', 2)
+    sink = TelemetrySink(str(tmp_path / 'telemetry.bin'), batch_size=16)
+    play_game(sink)
+    release.set()
+    with pytest.warns(RuntimeWarning, match=f'{sink.dropped_rows} rows'):
+        sink.close()
+
+    assert sink.dropped_batches > 0
+    rounds = read_telemetry(sink.path)['round']
+    assert len(rounds) == ROUNDS + 1 - sink.dropped_rows
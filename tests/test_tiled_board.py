@@ -0,0 +1,78 @@
+"""
+FILE: tests/test_tiled_board.py
+DESCRIPTION: checks that a board indexing its walls and apples by tiles
+plays exactly as the reference engine, and finds the same walls and apples
+in a region as a scan of all of them.
+run:
+> python -m pytest tests
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import os
+import sys
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+import board as board_module  # noqa: E402
+import equivalence  # noqa: E402
+import game_utils  # noqa: E402
+import snake_main  # noqa: E402
+from board import Board  # noqa: E402
+from headless_display import HeadlessDisplay  # noqa: E402
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+SEEDS = range(6)
+ROUNDS = 150
+# (min x, min y, max x, max y) of the regions looked up in the tile index
+AREAS = [(0, 0, 8, 8), (5, 3, 30, 12), (-4, -4, 3, 40), (16, 16, 17, 17)]
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def is_in_area(location: Tuple[int, int],
+               area: Tuple[int, int, int, int]) -> bool:
+    return area[0] <= location[0] < area[2] and \
+        area[1] <= location[1] < area[3]
+
+
+def check_areas(board: Board) -> None:
+    """
+    Compares the walls and apples the tile index finds in the AREAS with a
+    scan of all of them
+    """
+    for area in AREAS:
+        assert {wall for wall in board.get_walls_in_area(area)
+                if any(is_in_area(cell.get_location(), area)
+                       for cell in wall.wall_cells)} == \
+            {wall for wall in board.get_walls()
+             if any(is_in_area(cell.get_location(), area)
+                    for cell in wall.wall_cells)}
+        assert {apple for apple in board.get_apples_in_area(area)
+                if is_in_area(apple.get_location(), area)} == \
+            {apple for apple in board.get_apples()
+             if is_in_area(apple.get_location(), area)}
+
+
+def test_tiled_board_matches_reference(monkeypatch) -> None:
+    cases = [equivalence.make_case(seed, ROUNDS) for seed in SEEDS]
+    expected = [equivalence.reference_engine(case) for case in cases]
+    # every board is tiled, however small
+    monkeypatch.setattr(board_module, 'TILED_BOARD_AREA', 0)
+    for case, case_expected in zip(cases, expected):
+        fingerprints: List[equivalence.RoundFingerprint] = []
+        board = Board(is_debug=case.args.debug,
+                      rng=game_utils.RandomContext(case.seed),
+                      width=case.args.width, height=case.args.height)
+        snake_main.main_loop(
+            HeadlessDisplay(equivalence.make_key_source(case.keys)),
+            case.args, board=board, observers=[
+                check_areas, lambda observed: fingerprints.append(
+                    equivalence.get_fingerprint(observed))])
+        assert fingerprints == case_expected
@@ -0,0 +1,64 @@
+"""
+FILE: tests/test_zobrist.py
+DESCRIPTION: checks that the Zobrist hash the board maintains incrementally
+equals the hash computed from scratch in every round of bot games.
+run:
+> python -m pytest tests
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import os
+import sys
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+import game_utils  # noqa: E402
+import zobrist  # noqa: E402
+from board import Board  # noqa: E402
+from bots import BOTS  # noqa: E402
+from headless_display import make_game_args, run_headless_game  # noqa: E402
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+BOTS_TO_CHECK = ['greedy', 'scripted']
+SEEDS = [str(seed) for seed in range(8)]
+ROUNDS = 500
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def test_hash_matches_board_hash() -> None:
+    hashes: List[int] = []
+
+    def check_hash(board: Board) -> None:
+        assert board.get_zobrist_hash() == zobrist.board_hash(board), \
+            board.get_rounds()
+        hashes.append(board.get_zobrist_hash())
+
+    args = make_game_args(width=30, height=25, apples=8, walls=6,
+                          rounds=ROUNDS)
+    for bot_name in BOTS_TO_CHECK:
+        for seed in SEEDS:
+            run_headless_game(args, bot=BOTS[bot_name](),
+                              rng=game_utils.RandomContext(seed),
+                              observers=[check_hash])
+
+    # the games played many distinct positions
+    assert len(set(hashes)) > len(hashes) // 2
+
+
+def test_hash_after_set_state() -> None:
+    args = make_game_args(width=30, height=25, apples=8, walls=6,
+                          rounds=200)
+    board = run_headless_game(args, bot=BOTS['greedy'](),
+                              rng=game_utils.RandomContext('1'))
+    restored = Board(width=30, height=25)
+    restored.set_state(board.get_state())
+    assert restored.get_zobrist_hash() == board.get_zobrist_hash() == \
+        zobrist.board_hash(board)
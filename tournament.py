@@ -0,0 +1,231 @@
+"""
+FILE: tournament.py
+DESCRIPTION: a tournament harness for 'snake' bots. Runs every
+bot x seed x board config game across a process pool, caches the results on
+disk, and prints leaderboards with confidence intervals.
+run:
+> python tournament.py [optional arguments|--help]
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+import sys
+import json
+import math
+import sqlite3
+import argparse
+import statistics
+from argparse import Namespace
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Tuple
+
+import game_utils
+from bots import BOTS
+from headless_display import make_game_args, run_headless_game
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+CACHE_PATH = 'tournament_cache.sqlite'
+SEEDS = 20
+ROUNDS = 2000
+
+# z-value of a two-sided 95% confidence interval
+CONFIDENCE_Z = 1.96
+
+GameConfig = namedtuple('GameConfig',
+                        ['width', 'height', 'apples', 'walls', 'rounds'])
+GameResult = namedtuple('GameResult', ['score', 'rounds', 'length'])
+
+DEFAULT_CONFIGS = [
+    GameConfig(40, 30, 3, 2, ROUNDS),
+    GameConfig(50, 50, 10, 10, ROUNDS)
+]
+
+# (bot name, seed, config)
+Match = Tuple[str, str, GameConfig]
+
+
+###############################################################################
+#                           Class & Inner Functions                           #
+###############################################################################
+class ResultCache:
+    """
+    An on-disk cache of game results keyed by (bot, bot version, seed,
+    config)
+    """
+
+    def __init__(self, path: str = CACHE_PATH) -> None:
+        self.__connection = sqlite3.connect(path)
+        self.__connection.execute(
+            'CREATE TABLE IF NOT EXISTS results ('
+            'bot TEXT, version TEXT, seed TEXT, config TEXT, '
+            'score INTEGER, rounds INTEGER, length INTEGER, '
+            'PRIMARY KEY (bot, version, seed, config))')
+
+    @staticmethod
+    def __key(match: Match) -> Tuple[str, str, str, str]:
+        bot_name, seed, config = match
+        return bot_name, BOTS[bot_name].VERSION, seed, json.dumps(config)
+
+    def get_many(self, matches: Iterable[Match]) -> Dict[Match, GameResult]:
+        """
+        Returns the cached results of the given matches (missing ones are
+        not included)
+        """
+        results = {}
+        for match in matches:
+            row = self.__connection.execute(
+                'SELECT score, rounds, length FROM results WHERE bot = ? '
+                'AND version = ? AND seed = ? AND config = ?',
+                self.__key(match)).fetchone()
+            if row is not None:
+                results[match] = GameResult(*row)
+        return results
+
+    def put_many(self, results: Dict[Match, GameResult]) -> None:
+        """
+        Stores the given results
+        """
+        with self.__connection:
+            self.__connection.executemany(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [self.__key(match) + tuple(result)
+                 for match, result in results.items()])
+
+    def close(self) -> None:
+        """
+        Closes the cache
+        """
+        self.__connection.close()
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def get_config_args(config: GameConfig) -> Namespace:
+    """
+    Returns the game loop's arguments of a config
+    """
+    return make_game_args(width=config.width, height=config.height,
+                          apples=config.apples, walls=config.walls,
+                          rounds=config.rounds)
+
+
+def play_match(match: Match) -> GameResult:
+    """
+    Plays a single game of a bot, as 'game_display.py --seed' would
+    :param match: (bot name, seed, config)
+    :return: the game's result
+    """
+    bot_name, seed, config = match
+    board = run_headless_game(get_config_args(config),
+                              bot=BOTS[bot_name](),
+                              rng=game_utils.RandomContext(seed))
+    return GameResult(board.get_score(), board.get_rounds(),
+                      board.snake.get_length())
+
+
+def run_tournament(bot_names: List[str], seeds: List[str],
+                   configs: List[GameConfig], cache: ResultCache,
+                   workers: int = 0) -> Dict[Match, GameResult]:
+    """
+    Plays every bot x seed x config game which is not cached yet
+    :param workers: the number of processes (0 for one per CPU)
+    :return: the results of all the games
+    """
+    matches = [(bot_name, seed, config) for config in configs
+               for bot_name in bot_names for seed in seeds]
+    results = cache.get_many(matches)
+    missing = [match for match in matches if match not in results]
+
+    if missing:
+        with ProcessPoolExecutor(max_workers=workers or None) as executor:
+            chunk_size = max(1, len(missing) // (8 * (workers or 4)))
+            new_results = dict(zip(missing, executor.map(
+                play_match, missing, chunksize=chunk_size)))
+        cache.put_many(new_results)
+        results.update(new_results)
+
+    return results
+
+
+def confidence_interval(values: List[float]) -> float:
+    """
+    Returns the half-width of the (normal approximation) 95% confidence
+    interval of the values' mean
+    """
+    if len(values) < 2:
+        return math.inf
+    return CONFIDENCE_Z * statistics.stdev(values) / math.sqrt(len(values))
+
+
+def print_leaderboards(results: Dict[Match, GameResult],
+                       bot_names: List[str],
+                       configs: List[GameConfig]) -> None:
+    """
+    Prints a leaderboard (by mean score) per config
+    """
+    for config in configs:
+        print(f'\n{config}')
+        print(f'{"bot":<10} {"games":>6} {"score":>8} {"± 95%":>7} '
+              f'{"rounds":>8} {"length":>7}')
+        rows = []
+        for bot_name in bot_names:
+            games = [result for (name, _, game_config), result in
+                     results.items()
+                     if name == bot_name and game_config == config]
+            scores = [game.score for game in games]
+            rows.append((statistics.mean(scores), bot_name, len(games),
+                         confidence_interval(scores),
+                         statistics.mean(game.rounds for game in games),
+                         statistics.mean(game.length for game in games)))
+        for score, bot_name, count, interval, rounds, length in \
+                sorted(rows, reverse=True):
+            print(f'{bot_name:<10} {count:>6} {score:>8.1f} {interval:>7.1f} '
+                  f'{rounds:>8.0f} {length:>7.1f}')
+
+
+def parse_config(value: str) -> GameConfig:
+    """
+    Parses a 'width,height,apples,walls,rounds' config
+    """
+    try:
+        return GameConfig(*(int(item) for item in value.split(',')))
+    except (TypeError, ValueError):
+        raise argparse.ArgumentTypeError(
+            f"expected 'width,height,apples,walls,rounds', got '{value}'")
+
+
+def parse_args(argv: List[str]) -> Namespace:
+    parser = argparse.ArgumentParser(
+        prog='tournament.py',
+        description='Runs a tournament between "Snake" bots.',
+    )
+    parser.add_argument('-b', '--bots', nargs='+', choices=sorted(BOTS),
+                        default=sorted(BOTS), help='Bots to compare')
+    parser.add_argument('-n', '--seeds', type=int, default=SEEDS,
+                        help='Number of seeds (0 to n-1) per bot and config')
+    parser.add_argument('-c', '--config', type=parse_config, action='append',
+                        help='Board config "width,height,apples,walls,'
+                             'rounds" (can be used multiple times)')
+    parser.add_argument('-j', '--workers', type=int, default=0,
+                        help='Number of worker processes (0 for one per CPU)')
+    parser.add_argument('--cache', default=CACHE_PATH,
+                        help='Path of the results cache')
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    configs = args.config or DEFAULT_CONFIGS
+    seeds = [str(seed) for seed in range(args.seeds)]
+    cache = ResultCache(args.cache)
+    try:
+        results = run_tournament(args.bots, seeds, configs, cache,
+                                 args.workers)
+    finally:
+        cache.close()
+    print_leaderboards(results, args.bots, configs)
@@ -6,10 +6,16 @@ DESCRIPTION: a 'Wall' class used for a 'snake' game.
 #                                   Imports                                   #
 ###############################################################################
 import game_utils
-from typing import List, Set, Tuple
+from typing import Any, List, Set, Tuple
 from board_cell import BoardCell
 
 
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+WALL_COLOR = "blue"
+
+
 ###############################################################################
 #                           Class & Inner Functions                           #
 ###############################################################################
@@ -20,7 +26,7 @@ class Wall(BoardCell):
     """
 
     def __init__(self, center_cell_col_value: int, center_cell_row_value: int,
-                 direction: str, color: str = "blue") -> None:
+                 direction: str, color: str = WALL_COLOR) -> None:
         super().__init__(center_cell_col_value, center_cell_row_value, color)
         self.direction: str = direction
         self.length: int = 3
@@ -33,6 +39,12 @@ class Wall(BoardCell):
         """
         return self.wall_cells
 
+    def get_wall_cells_locations_list(self) -> List[Tuple[int, int]]:
+        """
+        Returns the wall cells' locations, in order (tail to head)
+        """
+        return [cell.get_location() for cell in self.wall_cells]
+
     def get_wall_cells_locations(self) -> Set[Tuple[int, int]]:
         """
         Returns the list of all the wall cells locations
@@ -42,6 +54,26 @@ class Wall(BoardCell):
             wall_cells_locations_set.add(cell.get_location())
         return wall_cells_locations_set
 
+    def get_state(self) -> List[Any]:
+        """
+        Returns the wall's full state as plain data
+        """
+        return [self.column, self.row, self.direction,
+                [cell.get_location() for cell in self.wall_cells]]
+
+    @classmethod
+    def from_state(cls, state: List[Any]) -> 'Wall':
+        """
+        Creates a wall from a state returned by 'get_state'
+        :param state: a state returned by 'get_state'
+        :return: a new Wall
+        """
+        column, row, direction, cells = state
+        wall = cls(column, row, direction)
+        wall.wall_cells = [BoardCell(col, row, wall.color)
+                           for col, row in cells]
+        return wall
+
     # endregion get & set methods
     # region action methods
     def create_wall_cells(self) -> List[BoardCell]:
@@ -0,0 +1,150 @@
+"""
+FILE: zobrist.py
+DESCRIPTION: Zobrist hashing of 'snake' board states. The key of every
+(kind, location, ...) feature is derived from a fixed seed by a 64-bit mixing
+function, so hashes agree between processes, engines and networked peers
+without sharing a table.
+"""
+###############################################################################
+#                                   Imports                                   #
+###############################################################################
+from typing import Any, List, Tuple
+
+import game_utils
+from board_cell import BoardCell
+
+
+###############################################################################
+#                                  Constants                                  #
+###############################################################################
+MASK = (1 << 64) - 1
+SEED = 0x5EED5A4E5EED5A4E
+
+# feature kinds
+SNAKE_HEAD = 1
+SNAKE_BODY = 2
+WALL = 3
+APPLE = 4
+DIRECTION = 5
+GROWTH = 6
+
+DIRECTION_INDEX = {direction: index for index, direction in
+                   enumerate(game_utils.DIRECTIONS)}
+
+
+###############################################################################
+#                                  Functions                                  #
+###############################################################################
+def _mix(value: int) -> int:
+    """
+    The 'splitmix64' finalizer
+    """
+    value = (value + 0x9E3779B97F4A7C15) & MASK
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK
+    return value ^ (value >> 31)
+
+
+def zobrist_key(*values: int) -> int:
+    """
+    Returns the 64-bit key of a feature
+    :param values: the feature's kind followed by its integer values
+    :return: the key
+    """
+    key = SEED
+    for value in values:
+        key = _mix(key ^ (value & MASK))
+    return key
+
+
+def direction_key(direction: str) -> int:
+    """
+    Returns the key of the snake's direction
+    """
+    return zobrist_key(DIRECTION, DIRECTION_INDEX.get(direction, -1))
+
+
+def growth_key(cells_to_be_added: int) -> int:
+    """
+    Returns the key of the snake's pending growth
+    """
+    return zobrist_key(GROWTH, cells_to_be_added)
+
+
+def wall_cell_key(location: Tuple[int, int], direction: str) -> int:
+    """
+    Returns the key of a wall cell (walls with another direction differ)
+    """
+    return zobrist_key(WALL, location[0], location[1],
+                       DIRECTION_INDEX.get(direction, -1))
+
+
+def apple_key(location: Tuple[int, int]) -> int:
+    """
+    Returns the key of an apple
+    """
+    return zobrist_key(APPLE, location[0], location[1])
+
+
+def snake_head_key(location: Tuple[int, int]) -> int:
+    """
+    Returns the key of the snake's head
+    """
+    return zobrist_key(SNAKE_HEAD, location[0], location[1])
+
+
+def snake_body_key(location: Tuple[int, int],
+                   next_location: Tuple[int, int]) -> int:
+    """
+    Returns the key of a snake body cell. The cell is keyed together with
+    the step to the next cell (towards the head), so the hash covers the
+    order of the body and not only its cells
+    """
+    return zobrist_key(SNAKE_BODY, location[0], location[1],
+                       next_location[0] - location[0],
+                       next_location[1] - location[1])
+
+
+def snake_cells_hash(cells: List[BoardCell]) -> int:
+    """
+    Returns the hash of a list of snake cells (tail to head)
+    """
+    return snake_tail_hash(cells, len(cells))
+
+
+def snake_tail_hash(cells: List[BoardCell], count: int) -> int:
+    """
+    Returns the hash of the first 'count' cells (from the tail) of a list of
+    snake cells, as they are keyed in the whole list's hash
+    """
+    value = 0
+    for index in range(min(count, len(cells))):
+        if index < len(cells) - 1:
+            value ^= snake_body_key(cells[index].get_location(),
+                                    cells[index + 1].get_location())
+        else:
+            value ^= snake_head_key(cells[index].get_location())
+    return value
+
+
+def board_hash(board: Any) -> int:
+    """
+    Computes the hash of a board from scratch (the board maintains the same
+    value incrementally, see 'Board.get_zobrist_hash')
+    :param board: a Board
+    :return: the board's 64-bit hash
+    """
+    value = snake_cells_hash(board.snake.get_snake_cells())
+    value ^= direction_key(board.snake.direction)
+    value ^= growth_key(board.snake.cells_to_be_added)
+    for wall in board.get_walls():
+        for cell in wall.wall_cells:
+            value ^= wall_cell_key(cell.get_location(), wall.direction)
+    for apple in board.get_apples():
+        value ^= apple_key(apple.get_location())
+    return value
+
+
+if __name__ == "__main__":
+    print("This script is part of the 'Snake' board game.\nYou should run:\n"
+          "> python game_display.py [optional arguments|--help]")